@@ -56,6 +56,11 @@ SETTINGS = {
     'liteclient_timeout': Setting(None, 3, 'Liteclient default timeout'),
     'console_timeout': Setting(None, 3, 'Validator console default timeout'),
     'fift_timeout': Setting(None, 3, 'Fift default timeout'),
+    'blockScanner': Setting(None, False, 'Scan new blocks to count tps and blocks per second. Restart mytoncore to apply this setting'),
+    'blockScannerWorkers': Setting(None, 2, 'Number of concurrent lite-client requests of the block scanner'),
+    'schedulerWorkers': Setting(None, 6, 'Number of threads running periodic tasks of mytoncore, one of them is kept for elections, complaints and slashing, so at least 2. Restart mytoncore to apply this setting'),
+    'transaction_cache_size': Setting(None, 64, 'Max size of the local transactions cache in MB, 0 to disable the cache'),
+    'round_archive_days': Setting(None, 30, 'Number of days to keep saved elections, complaints and validators load of past rounds'),
     'useDefaultCustomOverlays': Setting(None, True, 'Participate in default custom overlays node eligible to'),
     'defaultCustomOverlaysUrl': Setting(None, 'https://ton-blockchain.github.io/fallback_custom_overlays.json', 'Default custom overlays config url'),
     'debug': Setting(None, False, 'Debug mtc console mode. Prints Traceback on errors'),
@@ -4,6 +4,7 @@ import requests
 
 from modules.module import MtcModule
 from mypylib.mypylib import get_timestamp, print_table, color_print
+from mytoncore.async_mytoncore import AsyncMyTonCore
 from mytoncore.utils import get_hostname, signed_int_to_hex64
 from mytonctrl.console_cmd import add_command, check_usage_one_arg, check_usage_two_args
 from mytonctrl.utils import timestamp2utcdatetime
@@ -196,6 +197,7 @@ class AlertBotModule(MtcModule):
         self.chat_id = None
         self.last_db_check = 0
         self.initial_sync = None
+        self.async_ton = AsyncMyTonCore(ton)
 
     def send_message(self, text: str, silent: bool = False, disable_web_page_preview: bool = False):
         if self.token is None:
@@ -300,15 +302,20 @@ Severity: <code>{alert.severity}</code>
         self.inited = True
 
     def get_alert_from_db(self, alert_name: str):
-        if 'alerts' not in self.ton.local.db:
-            self.ton.local.db['alerts'] = {}
-        if alert_name not in self.ton.local.db['alerts']:
-            self.ton.local.db['alerts'][alert_name] = {'sent': 0, 'enabled': True, 'active': False, 'resolved_sent': 0}
-        return self.ton.local.db['alerts'][alert_name]
+        alerts = self.ton.get_state('alerts')
+        alert = alerts.get(alert_name)
+        if alert is None:
+            alert = {'sent': 0, 'enabled': True, 'active': False, 'resolved_sent': 0}
+            alerts[alert_name] = alert
+        return alert
+
+    def save_alert(self, alert_name: str, alert: dict):
+        self.ton.get_state('alerts')[alert_name] = alert
 
     def set_alert_sent(self, alert_name: str):
         alert = self.get_alert_from_db(alert_name)
         alert['sent'] = int(time.time())
+        self.save_alert(alert_name, alert)
 
     def get_alert_sent(self, alert_name: str):
         alert = self.get_alert_from_db(alert_name)
@@ -321,7 +328,7 @@ Severity: <code>{alert.severity}</code>
     def set_alert_enabled(self, alert_name: str, enabled: bool):
         alert = self.get_alert_from_db(alert_name)
         alert['enabled'] = enabled
-        self.ton.local.save()
+        self.save_alert(alert_name, alert)
 
     def _set_alert_active(self, alert_name: str, active: bool):
         alert = self.get_alert_from_db(alert_name)
@@ -329,6 +336,7 @@ Severity: <code>{alert.severity}</code>
             alert['active'] = active
             if not active:
                 alert['resolved_sent'] = int(time.time())
+            self.save_alert(alert_name, alert)
 
     def _is_alert_active(self, alert_name: str) -> bool:
         return self.get_alert_from_db(alert_name).get('active', False)
@@ -588,19 +596,22 @@ Full bot documentation <a href="https://docs.ton.org/v3/guidelines/nodes/mainten
         if not self.inited or self.token != self.ton.local.db.get("BotToken") or self.chat_id != self.ton.local.db.get("ChatId"):
             self.init()
 
-        self.local.try_function(self.check_db_usage)
-        self.local.try_function(self.check_validator_wallet_balance)
-        self.local.try_function(self.check_efficiency)  # todo: alert if validator is going to be slashed
-        self.local.try_function(self.check_validator_working)
-        self.local.try_function(self.check_zero_blocks_created)
-        self.local.try_function(self.check_sync)
-        self.local.try_function(self.check_slashed)
-        self.local.try_function(self.check_adnl_connection_failed)
-        self.local.try_function(self.check_stake_sent)
-        self.local.try_function(self.check_stake_returned)
-        self.local.try_function(self.check_voting)
-        self.local.try_function(self.check_initial_sync)
-        self.local.try_function(self.check_online_collators)
+        # checks are independent, run them concurrently
+        self.async_ton.run_functions([
+            self.check_db_usage,
+            self.check_validator_wallet_balance,
+            self.check_efficiency,  # todo: alert if validator is going to be slashed
+            self.check_validator_working,
+            self.check_zero_blocks_created,
+            self.check_sync,
+            self.check_slashed,
+            self.check_adnl_connection_failed,
+            self.check_stake_sent,
+            self.check_stake_returned,
+            self.check_voting,
+            self.check_initial_sync,
+            self.check_online_collators,
+        ])
 
     def add_console_commands(self, console):
         add_command(self.local, console, "enable_alert", self.enable_alert)
@@ -18,6 +18,7 @@ class CollatorModule(MtcModule):
     def add_collator_to_vc(self, adnl_addr: str, shard: str):
         self.local.add_log("start add_collator_to_vc function", "debug")
         result = self.ton.validatorConsole.Run(f"add-collator {adnl_addr} {shard}")
+        self.ton.invalidate_validator_config()
         return result
 
     @staticmethod
@@ -102,6 +103,7 @@ class CollatorModule(MtcModule):
                 workchain = int(c['shard']['workchain'])
                 shard_int = int(c['shard']['shard'])
                 res = self.ton.validatorConsole.Run(f"del-collator {adnl_hex} {workchain} {shard_int}")
+                self.ton.invalidate_validator_config()
                 if 'success' not in res.lower():
                     errors.append(res.strip())
             if errors:
@@ -117,6 +119,7 @@ class CollatorModule(MtcModule):
         shard_int = int(shard_id['shard'])
 
         res = self.ton.validatorConsole.Run(f"del-collator {adnl_addr} {workchain} {shard_int}")
+        self.ton.invalidate_validator_config()
         if 'successfully removed collator' not in res.lower():
             raise Exception(f'Failed to disable collator: del-collator query failed: {res}')
         color_print("stop_collator - {green}OK{endc}")
@@ -165,7 +168,7 @@ class CollatorModule(MtcModule):
 
     def print_collation_validators_whitelist(self, args: list = None):
         result = self.ton.validatorConsole.Run('collator-whitelist-show')
-        result = result.split('conn ready')[1].strip()
+        result = result.split('conn ready')[-1].strip()
         print(result)
 
     @classmethod
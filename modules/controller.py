@@ -143,6 +143,7 @@ class ControllerModule(MtcModule):
         user_controllers = self.ton.local.db.get("user_controllers")
         if user_controllers is not None and controller_addr in user_controllers:
             user_controllers.remove(controller_addr)
+            self.ton.local.db["user_controllers"] = user_controllers
         self.ton.local.save()
 
     def stop_controller(self, args):
@@ -175,6 +176,7 @@ class ControllerModule(MtcModule):
         stop_controllers_list = self.ton.local.db.get("stop_controllers_list")
         if stop_controllers_list is not None and controller_addr in stop_controllers_list:
             stop_controllers_list.remove(controller_addr)
+            self.ton.local.db["stop_controllers_list"] = stop_controllers_list
         self.ton.local.save()
 
     def add_controller(self, args):
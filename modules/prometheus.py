@@ -1,4 +1,6 @@
 from modules.module import MtcModule
+from mytoncore.async_mytoncore import AsyncMyTonCore
+from mytoncore.scheduler import HISTOGRAM_BUCKETS
 import dataclasses
 import requests
 
@@ -38,6 +40,8 @@ METRICS = {
     'validator_groups_shard': Metric('validator_active_groups_shard', 'Number of shardchain validation groups validator participates in', 'gauge'),
     'ls_queries_ok': Metric('validator_ls_queries_ok', 'Number of Liteserver successful queries', 'gauge'),
     'ls_queries_err': Metric('validator_ls_queries_err', 'Number of Liteserver failed queries', 'gauge'),
+    'net_recv': Metric('validator_net_recv_bytes_per_second', 'Bytes received by the node per second for the last minute', 'gauge'),
+    'net_sent': Metric('validator_net_sent_bytes_per_second', 'Bytes sent by the node per second for the last minute', 'gauge'),
 }
 
 
@@ -48,6 +52,7 @@ class PrometheusModule(MtcModule):
 
     def __init__(self, ton, local, *args, **kwargs):
         super().__init__(ton, local, *args, **kwargs)
+        self.async_ton = AsyncMyTonCore(ton, max_workers=3)
 
     def get_validator_status_metrics(self, result: list):
         status = self.ton.GetValidatorStatus()
@@ -101,6 +106,34 @@ class PrometheusModule(MtcModule):
             result.append(METRICS['validated_shard_ok'].to_format(stats['validated']['shard']['ok']))
             result.append(METRICS['validated_shard_err'].to_format(stats['validated']['shard']['error']))
 
+    def get_network_metrics(self, result: list):
+        recv = self.ton.get_statistics_rate("net.bytesRecv", 60)
+        sent = self.ton.get_statistics_rate("net.bytesSent", 60)
+        if recv is not None and sent is not None:
+            result.append(METRICS['net_recv'].to_format(round(recv)))
+            result.append(METRICS['net_sent'].to_format(round(sent)))
+
+    def get_scheduler_metrics(self, result: list):
+        stats = self.ton.get_state("statistics").get("scheduler")
+        if not stats:
+            return
+        lines = [
+            '# HELP mytoncore_task_duration_seconds Run time of mytoncore periodic tasks',
+            '# TYPE mytoncore_task_duration_seconds histogram',
+        ]
+        for name, task in stats.items():
+            count = 0
+            for bound, value in zip(list(HISTOGRAM_BUCKETS) + ['+Inf'], task['buckets']):
+                count += value
+                lines.append(f'mytoncore_task_duration_seconds_bucket{{task="{name}",le="{bound}"}} {count}')
+            lines.append(f'mytoncore_task_duration_seconds_sum{{task="{name}"}} {task["total_time"]}')
+            lines.append(f'mytoncore_task_duration_seconds_count{{task="{name}"}} {task["runs"]}')
+        lines.append('# HELP mytoncore_task_skipped Number of runs of mytoncore periodic tasks skipped after their deadline')
+        lines.append('# TYPE mytoncore_task_skipped counter')
+        for name, task in stats.items():
+            lines.append(f'mytoncore_task_skipped{{task="{name}"}} {task["skipped"]}')
+        result.append('\n' + '\n'.join(lines) + '\n')
+
     def push_metrics(self):
         if not self.ton.using_prometheus():
             return
@@ -109,9 +142,13 @@ class PrometheusModule(MtcModule):
         if url is None:
             raise Exception('Prometheus url is not set')
         metrics = []
-        self.local.try_function(self.get_validator_status_metrics, args=[metrics])
-        self.local.try_function(self.get_validator_validation_metrics, args=[metrics])
-        self.local.try_function(self.get_node_stats_metrics, args=[metrics])
+        self.async_ton.run_functions([
+            lambda: self.get_validator_status_metrics(metrics),
+            lambda: self.get_validator_validation_metrics(metrics),
+            lambda: self.get_node_stats_metrics(metrics),
+            lambda: self.get_network_metrics(metrics),
+            lambda: self.get_scheduler_metrics(metrics),
+        ])
         requests.post(url, data='\n'.join(metrics).encode(), timeout=3)
 
     def add_console_commands(self, console):
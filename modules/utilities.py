@@ -1,15 +1,28 @@
 import json
 import random
+import re
 import subprocess
 import time
 
 import requests
 
-from mypylib.mypylib import color_print, print_table, color_text, timeago, bcolors
+from mypylib.mypylib import color_print, print_table, color_text, timeago, bcolors, b2mb
 from modules.module import MtcModule
 from mytonctrl.console_cmd import add_command, check_usage_one_arg, check_usage_two_args
 
 
+def print_row(row, widths, header=False):
+    line = ""
+    for item, width in zip(row, widths):
+        text = str(item)
+        visible = re.sub(r'\x1b\[[0-9;]*m', '', text)
+        line += text + ' ' * max(width - len(visible), 2)
+    line = line.rstrip()
+    if header:
+        line = color_text("{blue}{bold}" + line + "{endc}")
+    print(line)
+
+
 class UtilitiesModule(MtcModule):
 
     description = ''
@@ -37,13 +50,16 @@ class UtilitiesModule(MtcModule):
     # end define
 
     def get_history_table(self, addr, limit):
-        addr = self.ton.get_destination_addr(addr)
-        account = self.ton.GetAccount(addr)
-        history = self.ton.GetAccountHistory(account, limit)
         table = list()
         typeText = color_text("{red}{bold}{endc}")
         table += [["Time", typeText, "Coins", "From/To"]]
-        for message in history:
+        table += list(self.iter_history_rows(addr, limit))
+        return table
+
+    def iter_history_rows(self, addr, limit):
+        addr = self.ton.get_destination_addr(addr)
+        account = self.ton.GetAccount(addr)
+        for message in self.ton.iter_account_history_pages(account, limit):
             if message.srcAddr is None:
                 continue
             srcAddrFull = f"{message.srcWorkchain}:{message.srcAddr}"
@@ -57,16 +73,18 @@ class UtilitiesModule(MtcModule):
             fromto = self.ton.AddrFull2AddrB64(fromto)
             # datetime = timestamp2datetime(message.time, "%Y.%m.%d %H:%M:%S")
             datetime = timeago(message.time)
-            table += [[datetime, type, message.value, fromto]]
-        return table
+            yield [datetime, type, message.value, fromto]
 
     def view_account_history(self, args):
         if not check_usage_two_args("vah", args):
             return
         addr = args[0]
         limit = int(args[1])
-        table = self.get_history_table(addr, limit)
-        print_table(table)
+        # rows are printed as pages of the history arrive, so columns have fixed widths
+        widths = [16, 5, 16, 48]
+        print_row(["Time", "", "Coins", "From/To"], widths, header=True)
+        for row in self.iter_history_rows(addr, limit):
+            print_row(row, widths)
 
     def create_new_bookmark(self, args):
         if not check_usage_two_args("nb", args):
@@ -367,6 +385,25 @@ class UtilitiesModule(MtcModule):
         print(json.dumps(pool_data, indent=4))
     # end define
 
+    def print_cache_stats(self, args):
+        function_stats = self.ton.get_function_cache_stats()
+        cache = self.ton.get_transaction_cache()
+        transaction_stats = cache.get_stats() if cache else None
+        if "--json" in args:
+            data = {"function_cache": function_stats, "transaction_cache": transaction_stats}
+            print(json.dumps(data, indent=2))
+            return
+        table = list()
+        table += [["Cache", "Entries", "Size", "Hits", "Misses", "Evictions"]]
+        entries = "{0}/{1}".format(function_stats["size"], function_stats["max_size"])
+        table += [["Functions", entries, "-", function_stats["hits"], function_stats["misses"], function_stats["evictions"]]]
+        if transaction_stats:
+            entries = "{0} ({1} accounts)".format(transaction_stats["transactions"], transaction_stats["addresses"])
+            size = "{0}/{1} MB".format(b2mb(transaction_stats["size"]), b2mb(transaction_stats["max_size"]))
+            table += [["Transactions", entries, size, transaction_stats["hits"], transaction_stats["misses"], transaction_stats["evictions"]]]
+        print_table(table)
+    # end define
+
     def add_console_commands(self, console):
         add_command(self.local, console, "vas", self.view_account_status)
         add_command(self.local, console, "vah", self.view_account_history)
@@ -379,3 +416,4 @@ class UtilitiesModule(MtcModule):
         add_command(self.local, console, "vl", self.print_validator_list)
         add_command(self.local, console, "cl", self.print_complaints_list)
         add_command(self.local, console, "get_pool_data", self.get_pool_data)
+        add_command(self.local, console, "cache_stats", self.print_cache_stats)
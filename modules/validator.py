@@ -254,7 +254,7 @@ class ValidatorModule(MtcModule):
             print(json.dumps(self.get_collators_list(), indent=2))
         else:
             result = self.ton.validatorConsole.Run('show-collators-list')
-            result = result.split('conn ready')[1].strip()
+            result = result.split('conn ready')[-1].strip()
             if 'collators list is empty' in result:
                 print("No collators found")
                 return
@@ -0,0 +1,104 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AsyncMyTonCore:
+	"""
+	Asyncio facade over MyTonCore. Blocking getters are run in a thread
+	executor, each of their lite-client and console commands still starts
+	its own process, so independent lookups can be gathered and finish in
+	the time of the slowest one. Concurrent calls of the same getter share
+	one fetch through the function buffer.
+	"""
+
+	def __init__(self, ton, max_workers=8):
+		self.ton = ton
+		self.local = ton.local
+		self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="async_mytoncore")
+	#end define
+
+	async def run(self, func, *args, **kwargs):
+		loop = asyncio.get_running_loop()
+		return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+	#end define
+
+	async def try_function(self, func, *args):
+		return await self.run(self.local.try_function, func, args=list(args))
+	#end define
+
+	async def gather(self, *coros, return_exceptions=False):
+		return await asyncio.gather(*coros, return_exceptions=return_exceptions)
+	#end define
+
+	def run_functions(self, funcs):
+		"""Run functions concurrently from synchronous code, errors are logged by try_function"""
+		async def run_all():
+			return await self.gather(*[self.try_function(func) for func in funcs])
+		return asyncio.run(run_all())
+	#end define
+
+	def close(self):
+		self.executor.shutdown(wait=False)
+	#end define
+
+	async def GetValidatorStatus(self, no_cache=False):
+		return await self.run(self.ton.GetValidatorStatus, no_cache=no_cache)
+	#end define
+
+	async def GetConfig(self, configId):
+		return await self.run(self.ton.GetConfig, configId)
+	#end define
+
+	async def GetConfig15(self):
+		return await self.run(self.ton.GetConfig15)
+	#end define
+
+	async def GetConfig17(self):
+		return await self.run(self.ton.GetConfig17)
+	#end define
+
+	async def GetConfig32(self):
+		return await self.run(self.ton.GetConfig32)
+	#end define
+
+	async def GetConfig34(self, no_cache=False):
+		return await self.run(self.ton.GetConfig34, no_cache=no_cache)
+	#end define
+
+	async def GetConfig36(self):
+		return await self.run(self.ton.GetConfig36)
+	#end define
+
+	async def GetAccount(self, inputAddr):
+		return await self.run(self.ton.GetAccount, inputAddr)
+	#end define
+
+	async def GetSeqno(self, wallet):
+		return await self.run(self.ton.GetSeqno, wallet)
+	#end define
+
+	async def GetLastBlock(self):
+		return await self.run(self.ton.GetLastBlock)
+	#end define
+
+	async def GetShards(self, block=None):
+		return await self.run(self.ton.GetShards, block)
+	#end define
+
+	async def GetValidatorConfig(self):
+		return await self.run(self.ton.GetValidatorConfig)
+	#end define
+
+	async def GetValidatorsLoad(self, start, end, saveCompFiles=False):
+		return await self.run(self.ton.GetValidatorsLoad, start, end, saveCompFiles)
+	#end define
+
+	async def GetValidatorsList(self, past=False, fast=False, start=None, end=None):
+		return await self.run(self.ton.GetValidatorsList, past=past, fast=fast, start=start, end=end)
+	#end define
+
+	async def GetOnlineValidators(self):
+		return await self.run(self.ton.GetOnlineValidators)
+	#end define
+#end class
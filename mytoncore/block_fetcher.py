@@ -0,0 +1,190 @@
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from mytoncore.models import Block
+
+
+MASTERCHAIN_SHARD = "8000000000000000"
+
+
+def get_new_shard_blocks(prev_shards, shards):
+	"""
+	Shardchain blocks committed by a masterchain block: prev_shards is
+	{shard id: top block seqno} of the previous masterchain block, shards is
+	GetShards() of this one. Returns Block or (workchain, shardchain, seqno)
+	of the blocks which are not known by their hashes yet.
+	"""
+	result = list()
+	for shard in shards:
+		top_block = shard["block"]
+		prev_seqno = prev_shards.get(shard["id"])
+		if prev_seqno is None:
+			# a new shard after split or merge
+			result.append(top_block)
+			continue
+		for seqno in range(prev_seqno + 1, top_block.seqno):
+			result.append((top_block.workchain, top_block.shardchain, seqno))
+		if top_block.seqno > prev_seqno:
+			result.append(top_block)
+	return result
+#end define
+
+
+def get_top_seqnos(shards):
+	return {shard["id"]: shard["block"].seqno for shard in shards}
+#end define
+
+
+class BlockRangeFetcher:
+	"""
+	Fetches blocks of a masterchain seqno range: masterchain blocks, the
+	shardchain blocks they commit, their transactions and messages.
+	Lite-client requests are run by a pool of workers spread over known
+	lite-servers (local.db["liteServers"]) with at most `per_server`
+	requests to each one. fetch() streams results while the next blocks are
+	being fetched, at most `window` blocks are requested ahead of the caller.
+	"""
+
+	def __init__(self, ton, per_server=2, max_workers=None, window=None):
+		self.ton = ton
+		self.local = ton.local
+		self.per_server = per_server
+		servers = self.local.db.get("liteServers") or list()
+		# None is a lite-server chosen by LiteClient (the local one if it is synchronized)
+		self.busy = {str(index): 0 for index in servers} if servers else {None: 0}
+		self.condition = threading.Condition()
+		self.max_workers = max_workers or per_server * len(self.busy)
+		self.window = window or self.max_workers * 4
+		self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="block_fetcher")
+	#end define
+
+	def call(self, func, *args):
+		"""Run a MyTonCore lite-client getter on the least busy lite-server"""
+		with self.condition:
+			while True:
+				server = min(self.busy, key=self.busy.get)
+				if self.busy[server] < self.per_server:
+					break
+				self.condition.wait()
+			self.busy[server] += 1
+		kwargs = dict()
+		if server is not None:
+			kwargs["index"] = server
+		try:
+			return func(*args, **kwargs)
+		finally:
+			with self.condition:
+				self.busy[server] -= 1
+				self.condition.notify()
+	#end define
+
+	def fetch(self, start, end, messages=True, ordered=True, shards=None):
+		"""
+		Yield dicts of blocks of masterchain blocks [start, end] and shardchain
+		blocks committed by them: seqno (masterchain seqno), block,
+		transactions, messages (if requested) and shards ({shard id: top
+		block seqno}, masterchain blocks only). Blocks of a masterchain
+		block follow it in ordered mode and come as they are fetched
+		otherwise. shards is {shard id: top block seqno} of the masterchain
+		block start-1, it is fetched if not given.
+		"""
+		if shards is None:
+			shards = get_top_seqnos(self.get_masterchain_block(start - 1)[1])
+		seqnos = iter(range(start, end + 1))
+		masterchain_futures = deque()
+		pending = deque() if ordered else set()
+		try:
+			while True:
+				# masterchain blocks are requested ahead, their shards are needed to find the next blocks
+				while len(masterchain_futures) < self.max_workers:
+					seqno = next(seqnos, None)
+					if seqno is None:
+						break
+					masterchain_futures.append((seqno, self.executor.submit(self.get_masterchain_block, seqno)))
+				if masterchain_futures and len(pending) < self.window:
+					seqno, future = masterchain_futures.popleft()
+					block, block_shards = future.result()
+					items = [block] + get_new_shard_blocks(shards, block_shards)
+					shards = get_top_seqnos(block_shards)
+					for index, item in enumerate(items):
+						future = self.executor.submit(self.get_block_data, seqno, item, shards if index == 0 else None)
+						if messages:
+							future = self.add_messages(future)
+						if ordered:
+							pending.append(future)
+						else:
+							pending.add(future)
+					continue
+				if not pending:
+					break
+				if ordered:
+					yield pending.popleft().result()
+				else:
+					done, _ = wait(pending, return_when=FIRST_COMPLETED)
+					for future in done:
+						pending.remove(future)
+						yield future.result()
+			#end while
+		finally:
+			for _, future in masterchain_futures:
+				future.cancel()
+			for future in pending:
+				future.cancel()
+	#end define
+
+	def get_masterchain_block(self, seqno):
+		block = self.call(self.ton.GetBlock, -1, MASTERCHAIN_SHARD, seqno)
+		shards = self.call(self.ton.GetShards, block)
+		return block, shards
+	#end define
+
+	def get_block_data(self, seqno, block, shards=None):
+		if not isinstance(block, Block):
+			block = self.call(self.ton.GetBlock, *block)
+		transactions = self.call(self.ton.GetTransactions, block)
+		data = {"seqno": seqno, "block": block, "transactions": transactions}
+		if shards is not None:
+			data["shards"] = shards
+		return data
+	#end define
+
+	def add_messages(self, block_future):
+		"""Future of the block data with messages of its transactions fetched in parallel"""
+		result = Future()
+		def on_block(future):
+			if not result.set_running_or_notify_cancel():
+				return # the caller stopped fetching
+			try:
+				data = future.result()
+			except BaseException as ex:
+				result.set_exception(ex)
+				return
+			futures = [self.executor.submit(self.call, self.ton.GetTrans, trans) for trans in data["transactions"]]
+			counter = [len(futures)]
+			lock = threading.Lock()
+			def on_trans(_):
+				with lock:
+					counter[0] -= 1
+					if counter[0] > 0:
+						return
+				try:
+					data["messages"] = [message for future in futures for message in future.result()]
+				except BaseException as ex:
+					result.set_exception(ex)
+					return
+				result.set_result(data)
+			if not futures:
+				data["messages"] = list()
+				result.set_result(data)
+			for future in futures:
+				future.add_done_callback(on_trans)
+		#end define
+		block_future.add_done_callback(on_block)
+		return result
+	#end define
+
+	def close(self):
+		self.executor.shutdown(wait=False)
+	#end define
+#end class
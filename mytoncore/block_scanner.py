@@ -0,0 +1,77 @@
+from mytoncore.block_fetcher import BlockRangeFetcher
+from mypylib.mypylib import get_timestamp
+
+
+class BlockScanner:
+	"""
+	Follows new masterchain blocks and counts them, the shardchain blocks they
+	commit and transactions of all of them. Shardchain blocks are found by the
+	difference of shard top blocks of neighbour masterchain blocks.
+	Blocks are fetched by BlockRangeFetcher in batches of `batch_size`
+	masterchain blocks with `max_workers` concurrent lite-client requests,
+	the next batch is not requested before the previous one is counted, so
+	requests do not pile up when the lite-server is slower than the network.
+	The last counted block and counters are kept in local.db, after a restart
+	the scan resumes from that block. A scanner which is behind catches up
+	batch by batch and writes counters to the statistics store only when it
+	reaches the last block, so rates of windows longer than the lag stay
+	right. Blocks older than `max_gap` are skipped.
+	"""
+
+	db_key = "blockScannerState"
+
+	def __init__(self, ton, max_workers=2, batch_size=10, max_gap=600):
+		self.ton = ton
+		self.local = ton.local
+		self.batch_size = batch_size
+		self.max_gap = max_gap
+		self.fetcher = BlockRangeFetcher(ton, max_workers=max_workers)
+		state = self.local.db.get(self.db_key) or dict()
+		self.seqno = state.get("seqno") # last counted masterchain block
+		self.shards = state.get("shards", dict()) # shard id -> seqno of its top block in self.seqno
+		self.blocks = state.get("blocks", 0)
+		self.transactions = state.get("transactions", 0)
+	#end define
+
+	def scan(self):
+		"""Count new blocks up to the last masterchain block"""
+		last_block = self.ton.GetLastBlock()
+		if last_block is None:
+			return
+		last_seqno = last_block.seqno
+		if self.seqno is None or last_seqno - self.seqno > self.max_gap:
+			self.local.add_log("BlockScanner: start from masterchain block {seqno}".format(seqno=last_seqno), "debug")
+			self.seqno = last_seqno - 1
+			self.shards = dict()
+		while self.seqno < last_seqno:
+			self.scan_batch(min(last_seqno, self.seqno + self.batch_size))
+			self.save_state()
+		self.local.buffer.statistics_store.add_many({
+			"scanner.blocks": self.blocks,
+			"scanner.transactions": self.transactions
+		}, get_timestamp())
+	#end define
+
+	def scan_batch(self, end):
+		blocks = 0
+		transactions = 0
+		shards = self.shards
+		for data in self.fetcher.fetch(self.seqno + 1, end, messages=False, shards=self.shards):
+			blocks += 1
+			transactions += len(data["transactions"])
+			shards = data.get("shards", shards)
+		self.seqno = end
+		self.shards = shards
+		self.blocks += blocks
+		self.transactions += transactions
+	#end define
+
+	def save_state(self):
+		self.local.db[self.db_key] = {
+			"seqno": self.seqno,
+			"shards": self.shards,
+			"blocks": self.blocks,
+			"transactions": self.transactions
+		}
+	#end define
+#end class
@@ -0,0 +1,169 @@
+import os
+import threading
+from array import array
+
+from mytoncore.models import ValidatorsLoad
+
+
+class EfficiencyTracker:
+	"""
+	Blocks created/expected by validators of a round, accumulated from
+	`checkloadall` over the time passed since the previous update.
+	Counters are stored in <work dir>/efficiency/<election id>.bin: validators
+	count followed by fixed size records of doubles — record end time and
+	cumulative master created, work created, master expected and work
+	expected columns. The first record holds zeros at the round start and
+	updates closer than checkpoint_interval overwrite the last record, so
+	the load of a window is the difference of two records.
+	"""
+
+	checkpoint_interval = 300
+	max_lag = 300 # the newest record may be older than the requested end by this
+	max_rounds = 3 # number of round files to keep
+
+	def __init__(self, local):
+		self.local = local
+		self.lock = threading.Lock()
+	#end define
+
+	def get_dir(self):
+		return os.path.join(self.local.buffer.my_work_dir, "efficiency")
+	#end define
+
+	def get_path(self, election_id):
+		return os.path.join(self.get_dir(), "{}.bin".format(election_id))
+	#end define
+
+	def get_last_time(self, election_id):
+		"""End time of the accumulated counters or None if the round is not tracked"""
+		path = self.get_path(election_id)
+		if not os.path.isfile(path):
+			return None
+		with open(path, "rb") as file:
+			count, records = self.read_header(file)
+			if records == 0:
+				return None
+			return self.read_time(file, count, records - 1)
+	#end define
+
+	def add(self, election_id, count, start, end, load):
+		"""Add ValidatorsLoad of the window [start, end] to the round counters"""
+		with self.lock:
+			path = self.get_path(election_id)
+			if not os.path.isfile(path):
+				self.create(path, election_id, count)
+			with open(path, "r+b") as file:
+				count, records = self.read_header(file)
+				last = self.read_record(file, count, records - 1)
+				if last[0] != start:
+					raise Exception("EfficiencyTracker error: window starts at {start}, counters end at {end}".format(start=start, end=int(last[0])))
+				for vid, i in load.positions.items():
+					if vid >= count:
+						continue
+					last[1 + vid] += load.master_created[i]
+					last[1 + count + vid] += load.work_created[i]
+					last[1 + 2*count + vid] += load.master_expected[i]
+					last[1 + 3*count + vid] += load.work_expected[i]
+				last[0] = end
+				index = records
+				if records > 1 and end - self.read_time(file, count, records - 2) < self.checkpoint_interval:
+					index = records - 1
+				file.seek(self.get_offset(count, index))
+				file.write(last.tobytes())
+			#end with
+		#end with
+	#end define
+
+	def create(self, path, election_id, count):
+		os.makedirs(self.get_dir(), exist_ok=True)
+		record = array('d', [0]) * (1 + 4*count)
+		record[0] = election_id
+		with open(path, "wb") as file:
+			file.write(array('q', [count]).tobytes())
+			file.write(record.tobytes())
+		self.remove_old_rounds()
+	#end define
+
+	def remove_old_rounds(self):
+		names = [name for name in os.listdir(self.get_dir()) if name.endswith(".bin")]
+		names.sort(key=lambda name: int(name[:-4]))
+		for name in names[:-self.max_rounds]:
+			os.remove(os.path.join(self.get_dir(), name))
+	#end define
+
+	def get_load(self, election_id, start, end):
+		"""
+		ValidatorsLoad of the window [start, end] from the round counters,
+		None if the counters do not cover the window
+		"""
+		path = self.get_path(election_id)
+		if not os.path.isfile(path):
+			return None
+		with open(path, "rb") as file:
+			count, records = self.read_header(file)
+			end_index = self.find_record(file, count, records, end) - 1
+			if end_index < 0 or end - self.read_time(file, count, end_index) > self.max_lag:
+				return None
+			start_index = self.find_record(file, count, records, start - 1)
+			if start_index >= end_index or self.read_time(file, count, start_index) - start > self.checkpoint_interval:
+				return None
+			first = self.read_record(file, count, start_index)
+			last = self.read_record(file, count, end_index)
+		#end with
+
+		load = ValidatorsLoad()
+		for vid in range(count):
+			load.add(vid, None,
+				last[1 + vid] - first[1 + vid],
+				last[1 + count + vid] - first[1 + count + vid],
+				last[1 + 2*count + vid] - first[1 + 2*count + vid],
+				last[1 + 3*count + vid] - first[1 + 3*count + vid])
+		return load
+	#end define
+
+	def find_record(self, file, count, records, timestamp):
+		# index of the first record which ends after timestamp
+		low, high = 0, records
+		while low < high:
+			middle = (low + high) // 2
+			if self.read_time(file, count, middle) <= timestamp:
+				low = middle + 1
+			else:
+				high = middle
+		return low
+	#end define
+
+	def read_header(self, file):
+		file.seek(0, os.SEEK_END)
+		size = file.tell()
+		file.seek(0)
+		count = array('q')
+		count.fromfile(file, 1)
+		count = count[0]
+		# a record being appended by the daemon is not counted
+		records = (size - 8) // self.get_record_size(count)
+		return count, records
+	#end define
+
+	def get_record_size(self, count):
+		return (1 + 4*count) * 8
+	#end define
+
+	def get_offset(self, count, index):
+		return 8 + index * self.get_record_size(count)
+	#end define
+
+	def read_time(self, file, count, index):
+		file.seek(self.get_offset(count, index))
+		buff = array('d')
+		buff.fromfile(file, 1)
+		return buff[0]
+	#end define
+
+	def read_record(self, file, count, index):
+		file.seek(self.get_offset(count, index))
+		record = array('d')
+		record.fromfile(file, 1 + 4*count)
+		return record
+	#end define
+#end class
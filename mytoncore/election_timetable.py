@@ -0,0 +1,74 @@
+ELECTIONS = "elections"
+FREEZE = "freeze"
+
+BOUNDARY_DELAY = 15 # seconds for the elector to pass a boundary
+
+
+class ElectionTimetable:
+	"""
+	Phases of validator rounds from config 15 and config 34. A round begins
+	with the freeze of the previous round stakes (stakeHeldFor seconds),
+	when complaints are created and voted, and holds the elections of the
+	next round (from electionsStartBefore to electionsEndBefore before its
+	end). Tasks of a phase poll within its windows and sleep until the next
+	window or wake outside of them. The next round is estimated with
+	validatorsElectedFor until config 34 is read again.
+	"""
+
+	def __init__(self):
+		self.rounds = list() # (startWorkTime, endWorkTime) of the current and the next round
+		self.config15 = None
+		self.participate_before_end = None
+	#end define
+
+	def update(self, config15, config34, participate_before_end=None):
+		start = config34["startWorkTime"]
+		end = config34["endWorkTime"]
+		self.config15 = config15
+		self.participate_before_end = participate_before_end
+		self.rounds = [(start, end), (end, end + config15["validatorsElectedFor"])]
+	#end define
+
+	def get_windows(self, phase):
+		windows = list()
+		for start, end in self.rounds:
+			if phase == ELECTIONS:
+				windows.append((end - self.config15["electionsStartBefore"], end - self.config15["electionsEndBefore"]))
+			elif phase == FREEZE:
+				windows.append((start, start + self.config15["stakeHeldFor"]))
+		return windows
+	#end define
+
+	def get_wakes(self, phase):
+		"""Starts of the phase windows and other boundaries the tasks of the phase act on"""
+		wakes = [start for start, _ in self.get_windows(phase)]
+		if phase == ELECTIONS:
+			for start, end in self.rounds:
+				wakes.append(start) # pools and controllers update the validator set
+				wakes.append(start + self.config15["stakeHeldFor"]) # stake of the previous round is returned
+				if self.participate_before_end:
+					wakes.append(end - self.participate_before_end)
+		return sorted(set(wake + BOUNDARY_DELAY for wake in wakes))
+	#end define
+
+	def get_next_run(self, phase, now, period):
+		"""Next run of a task of the phase, None before the timetable is read"""
+		if not self.rounds:
+			return None
+		times = [wake for wake in self.get_wakes(phase) if wake > now]
+		for start, end in self.get_windows(phase):
+			if start <= now < end:
+				times.append(now + period)
+		if not times:
+			return None # the timetable is outdated
+		return min(times)
+	#end define
+
+	def get_next_refresh(self, now, period):
+		"""The timetable is read again at every boundary, config 34 changes at the start of a round"""
+		if not self.rounds:
+			return None
+		times = [wake for phase in (ELECTIONS, FREEZE) for wake in self.get_wakes(phase) if wake > now]
+		return min(times + [now + period])
+	#end define
+#end class
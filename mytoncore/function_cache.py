@@ -0,0 +1,182 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheEntry:
+	def __init__(self, data, seqno):
+		self.time = time.time()
+		self.data = data
+		self.seqno = seqno
+	#end define
+#end class
+
+
+class Flight:
+	"""Fetch of a key which is in progress, other callers wait for its result"""
+
+	def __init__(self):
+		self.owner = threading.get_ident()
+		self.event = threading.Event()
+		self.done = False
+		self.data = None
+		self.error = None
+	#end define
+#end class
+
+
+class FunctionCache:
+	"""
+	Bounded LRU cache for MyTonCore getters.
+	An entry stored with a block seqno (masterchain or key block) is valid
+	while that seqno does not change, up to max_age seconds. Entries without
+	seqno expire by the timeout given on lookup.
+	fetch() deduplicates concurrent misses of the same key (single-flight).
+	"""
+
+	def __init__(self, max_size=1000, max_age=600, wait_timeout=60):
+		self.max_size = max_size
+		self.max_age = max_age
+		self.wait_timeout = wait_timeout
+		self.entries = OrderedDict()
+		self.flights = dict()
+		self.lock = threading.Lock()
+		self.thread_state = threading.local()
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+		self.keys_stats = OrderedDict() # name -> counters
+	#end define
+
+	def fetch(self, name, func, timeout, seqno=None):
+		"""Return cached data or call func, only one thread fetches a key at a time"""
+		with self.lock:
+			entry = self.entries.get(name)
+			if entry is not None and self.is_valid(entry, timeout, seqno):
+				self.entries.move_to_end(name)
+				self.count(name, "hits")
+				return entry.data
+			flight = self.flights.get(name)
+			if flight is None or flight.owner == threading.get_ident():
+				flight = Flight()
+				self.flights[name] = flight
+				self.count(name, "misses")
+				leader = True
+			else:
+				leader = False
+		#end with
+
+		if not leader:
+			return self.wait_flight(name, flight, func)
+		start = time.time()
+		try:
+			flight.data = func()
+			flight.done = True
+		except Exception as ex:
+			flight.error = ex
+			raise
+		finally:
+			with self.lock:
+				if flight.done:
+					self.store(name, flight.data, seqno)
+				if self.flights.get(name) is flight:
+					del self.flights[name]
+				self.count(name, "fetches", time.time() - start)
+			flight.event.set()
+		return flight.data
+	#end define
+
+	def wait_flight(self, name, flight, func):
+		start = time.time()
+		finished = flight.event.wait(self.wait_timeout)
+		with self.lock:
+			self.count(name, "waits", time.time() - start)
+		if not finished:
+			# the fetching thread is stuck, do not wait any longer
+			return func()
+		if flight.error is not None:
+			raise flight.error
+		return flight.data
+	#end define
+
+	def get(self, name, timeout, seqno=None):
+		with self.lock:
+			entry = self.entries.get(name)
+			if entry is not None and self.is_valid(entry, timeout, seqno):
+				self.entries.move_to_end(name)
+				self.count(name, "hits")
+				return entry.data
+			self.count(name, "misses")
+		#end with
+
+		# Remember the seqno seen before fetching, the fetched data is
+		# at least that fresh
+		self.get_pending_seqnos()[name] = seqno
+	#end define
+
+	def set(self, name, data, seqno=None):
+		pending_seqno = self.get_pending_seqnos().pop(name, seqno)
+		if pending_seqno is None or seqno is None:
+			seqno = None
+		else:
+			seqno = min(pending_seqno, seqno)
+		with self.lock:
+			self.store(name, data, seqno)
+	#end define
+
+	def store(self, name, data, seqno):
+		self.entries[name] = CacheEntry(data, seqno)
+		self.entries.move_to_end(name)
+		while len(self.entries) > self.max_size:
+			self.entries.popitem(last=False)
+			self.evictions += 1
+	#end define
+
+	def is_valid(self, entry, timeout, seqno):
+		age = time.time() - entry.time
+		if seqno is not None and entry.seqno is not None:
+			return entry.seqno == seqno and age < self.max_age
+		return age <= timeout
+	#end define
+
+	def invalidate(self, name):
+		with self.lock:
+			self.entries.pop(name, None)
+	#end define
+
+	def get_pending_seqnos(self):
+		if not hasattr(self.thread_state, "seqnos"):
+			self.thread_state.seqnos = dict()
+		return self.thread_state.seqnos
+	#end define
+
+	def count(self, name, counter, duration=None):
+		if counter == "hits":
+			self.hits += 1
+		elif counter == "misses":
+			self.misses += 1
+		stats = self.keys_stats.get(name)
+		if stats is None:
+			stats = {"hits": 0, "misses": 0, "fetches": 0, "fetch_time": 0, "waits": 0, "wait_time": 0}
+			self.keys_stats[name] = stats
+		self.keys_stats.move_to_end(name)
+		stats[counter] += 1
+		if duration is not None:
+			time_counter = "fetch_time" if counter == "fetches" else "wait_time"
+			stats[time_counter] = round(stats[time_counter] + duration, 3)
+		while len(self.keys_stats) > self.max_size:
+			self.keys_stats.popitem(last=False)
+	#end define
+
+	def get_stats(self):
+		with self.lock:
+			result = dict()
+			result["size"] = len(self.entries)
+			result["max_size"] = self.max_size
+			result["hits"] = self.hits
+			result["misses"] = self.misses
+			result["evictions"] = self.evictions
+			result["keys"] = {name: dict(stats) for name, stats in self.keys_stats.items()}
+		return result
+	#end define
+#end class
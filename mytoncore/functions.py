@@ -8,19 +8,23 @@ import time
 import json
 import requests
 import subprocess
+from functools import partial
 
 from mypylib import MyPyClass
 from mytoncore.mytoncore import MyTonCore
+from mytoncore.timeseries import TimeSeriesStore, CounterRing
+from mytoncore.block_scanner import BlockScanner
+from mytoncore.sharded_db import ShardedDb, read_db_files
+from mytoncore.scheduler import Scheduler, CRITICAL, BACKGROUND
+from mytoncore.election_timetable import ElectionTimetable, ELECTIONS, FREEZE
 from mytonctrl.utils import fix_git_config
 from mypylib.mypylib import (
-    b2mb,
     get_timestamp,
     get_internet_interface_name,
     get_git_hash,
     get_load_avg,
-    thr_sleep,
 )
-from mytoncore.telemetry import GetMemoryInfo, GetSwapInfo, GetUname, GetValidatorProcessInfo, get_db_stats, get_cpu_name, is_host_virtual, get_validator_disk_name, get_pings_values
+from mytoncore.telemetry import DISK_COUNTERS, NETWORK_COUNTERS, CalculateDiskStatistics, CalculateNetworkStatistics, read_disks_counters, read_network_counters, GetMemoryInfo, GetSwapInfo, GetUname, GetValidatorProcessInfo, get_db_stats, get_cpu_name, is_host_virtual, get_validator_disk_name, get_pings_values
 from mytoninstaller.node_args import get_node_args
 
 
@@ -35,16 +39,9 @@ def Init(local):
     local.run()
 
     # statistics
-    local.buffer.blocksData = dict()
-    local.buffer.transData = dict()
-    local.buffer.network = [None]*15*6
-    local.buffer.diskio = [None]*15*6
-
-    # scan blocks
-    local.buffer.masterBlocksList = list()
-    local.buffer.prevShardsBlock = dict()
-    local.buffer.blocksNum = 0
-    local.buffer.transNum = 0
+    local.buffer.network = None  # CounterRing, created on the first read
+    local.buffer.diskio = None
+    local.buffer.statistics_store = TimeSeriesStore(local.buffer.my_work_dir + "statistics/", writable=True)
 # end define
 
 
@@ -127,95 +124,68 @@ def Elections(local, ton):
 def Statistics(local):
     ReadNetworkData(local)
     SaveNetworkStatistics(local)
-    # ReadTransData(local, scanner)
     SaveTransStatistics(local)
     ReadDiskData(local)
     SaveDiskStatistics(local)
 # end define
 
 
+STATISTICS_AGES = [1*6-1, 5*6-1, 15*6-1]  # samples back for 1, 5 and 15 minutes
+
+
 def ReadDiskData(local):
     timestamp = get_timestamp()
     disks = GetDisksList()
-    buff = psutil.disk_io_counters(perdisk=True)
-    data = dict()
-    for name in disks:
-        data[name] = dict()
-        data[name]["timestamp"] = timestamp
-        data[name]["busyTime"] = buff[name].busy_time
-        data[name]["readBytes"] = buff[name].read_bytes
-        data[name]["writeBytes"] = buff[name].write_bytes
-        data[name]["readCount"] = buff[name].read_count
-        data[name]["writeCount"] = buff[name].write_count
-    # end for
+    counters = read_disks_counters()
+    ring = local.buffer.diskio
+    if ring is None or ring.rows != disks:
+        ring = CounterRing(15*6, disks, DISK_COUNTERS)
+        local.buffer.diskio = ring
+    rows = [counters.get(name, [0] * len(DISK_COUNTERS)) for name in disks]
+    ring.append(timestamp, [value for row in rows for value in row])
+
+    values = dict()
+    for name, row in zip(disks, rows):
+        for key, value in zip(DISK_COUNTERS, row):
+            values[f"disk.{name}.{key}"] = value
+    local.buffer.statistics_store.add_many(values, timestamp)
+# end define
+
 
-    local.buffer.diskio.pop(0)
-    local.buffer.diskio.append(data)
+def GetWindowDiffs(ring):
+    # diffs for 1, 5 and 15 minutes, shorter windows are used until the ring is filled
+    diffs = [ring.get_diff(age) for age in STATISTICS_AGES]
+    if diffs[1] is None:
+        diffs[1] = diffs[0]
+    if diffs[2] is None:
+        diffs[2] = diffs[1]
+    return diffs
 # end define
 
 
 def SaveDiskStatistics(local):
-    data = local.buffer.diskio
-    data = data[::-1]
-    zerodata = data[0]
-    buff1 = data[1*6-1]
-    buff5 = data[5*6-1]
-    buff15 = data[15*6-1]
-    if buff5 is None:
-        buff5 = buff1
-    if buff15 is None:
-        buff15 = buff5
-    # end if
+    ring = local.buffer.diskio
+    latest = ring.get_latest()
+    diffs = GetWindowDiffs(ring)
+    columns = len(DISK_COUNTERS)
 
     disksLoadAvg = dict()
     disksLoadPercentAvg = dict()
     iopsAvg = dict()
-    disks = GetDisksList()
-    for name in disks:
-        if zerodata[name]["busyTime"] == 0:
+    for row, name in enumerate(ring.rows):
+        if latest[row*columns] == 0:  # busy time
             continue
-        diskLoad1, diskLoadPercent1, iops1 = CalculateDiskStatistics(
-            zerodata, buff1, name)
-        diskLoad5, diskLoadPercent5, iops5 = CalculateDiskStatistics(
-            zerodata, buff5, name)
-        diskLoad15, diskLoadPercent15, iops15 = CalculateDiskStatistics(
-            zerodata, buff15, name)
-        disksLoadAvg[name] = [diskLoad1, diskLoad5, diskLoad15]
-        disksLoadPercentAvg[name] = [diskLoadPercent1,
-                                     diskLoadPercent5, diskLoadPercent15]
-        iopsAvg[name] = [iops1, iops5, iops15]
-    # end fore
+        results = [CalculateDiskStatistics(diff, row*columns) for diff in diffs]
+        disksLoadAvg[name] = [item[0] for item in results]
+        disksLoadPercentAvg[name] = [item[1] for item in results]
+        iopsAvg[name] = [item[2] for item in results]
+    # end for
 
     # save statistics
-    statistics = local.db.get("statistics", dict())
+    statistics = local.buffer.state_store.get_table("statistics")
     statistics["disksLoadAvg"] = disksLoadAvg
     statistics["disksLoadPercentAvg"] = disksLoadPercentAvg
     statistics["iopsAvg"] = iopsAvg
-    local.db["statistics"] = statistics
-# end define
-
-
-def CalculateDiskStatistics(zerodata, data, name):
-    if data is None:
-        return None, None, None
-    data = data[name]
-    zerodata = zerodata[name]
-    timeDiff = zerodata["timestamp"] - data["timestamp"]
-    busyTimeDiff = zerodata["busyTime"] - data["busyTime"]
-    diskReadDiff = zerodata["readBytes"] - data["readBytes"]
-    diskWriteDiff = zerodata["writeBytes"] - data["writeBytes"]
-    diskReadCountDiff = zerodata["readCount"] - data["readCount"]
-    diskWriteCountDiff = zerodata["writeCount"] - data["writeCount"]
-    diskLoadPercent = busyTimeDiff / 1000 / timeDiff * \
-        100  # /1000 - to second, *100 - to percent
-    diskLoadPercent = round(diskLoadPercent, 2)
-    diskRead = diskReadDiff / timeDiff
-    diskWrite = diskWriteDiff / timeDiff
-    diskReadCount = diskReadCountDiff / timeDiff
-    diskWriteCount = diskWriteCountDiff / timeDiff
-    diskLoad = b2mb(diskRead + diskWrite)
-    iops = round(diskReadCount + diskWriteCount, 2)
-    return diskLoad, diskLoadPercent, iops
 # end define
 
 
@@ -235,64 +205,30 @@ def GetDisksList():
 def ReadNetworkData(local):
     timestamp = get_timestamp()
     interfaceName = get_internet_interface_name()
-    buff = psutil.net_io_counters(pernic=True)
-    buff = buff[interfaceName]
-    data = dict()
-    data["timestamp"] = timestamp
-    data["bytesRecv"] = buff.bytes_recv
-    data["bytesSent"] = buff.bytes_sent
-    data["packetsSent"] = buff.packets_sent
-    data["packetsRecv"] = buff.packets_recv
-
-    local.buffer.network.pop(0)
-    local.buffer.network.append(data)
+    counters = read_network_counters()[interfaceName]
+    ring = local.buffer.network
+    if ring is None or ring.rows != [interfaceName]:
+        ring = CounterRing(15*6, [interfaceName], NETWORK_COUNTERS)
+        local.buffer.network = ring
+    ring.append(timestamp, counters)
+
+    values = dict()
+    for key, value in zip(NETWORK_COUNTERS, counters):
+        values[f"net.{key}"] = value
+    local.buffer.statistics_store.add_many(values, timestamp)
 # end define
 
 
 def SaveNetworkStatistics(local):
-    data = local.buffer.network
-    data = data[::-1]
-    zerodata = data[0]
-    buff1 = data[1*6-1]
-    buff5 = data[5*6-1]
-    buff15 = data[15*6-1]
-    if buff5 is None:
-        buff5 = buff1
-    if buff15 is None:
-        buff15 = buff5
-    # end if
-
-    netLoadAvg = dict()
-    ppsAvg = dict()
-    networkLoadAvg1, ppsAvg1 = CalculateNetworkStatistics(zerodata, buff1)
-    networkLoadAvg5, ppsAvg5 = CalculateNetworkStatistics(zerodata, buff5)
-    networkLoadAvg15, ppsAvg15 = CalculateNetworkStatistics(zerodata, buff15)
-    netLoadAvg = [networkLoadAvg1, networkLoadAvg5, networkLoadAvg15]
-    ppsAvg = [ppsAvg1, ppsAvg5, ppsAvg15]
+    diffs = GetWindowDiffs(local.buffer.network)
+    results = [CalculateNetworkStatistics(diff) for diff in diffs]
+    netLoadAvg = [item[0] for item in results]
+    ppsAvg = [item[1] for item in results]
 
     # save statistics
-    statistics = local.db.get("statistics", dict())
+    statistics = local.buffer.state_store.get_table("statistics")
     statistics["netLoadAvg"] = netLoadAvg
     statistics["ppsAvg"] = ppsAvg
-    local.db["statistics"] = statistics
-# end define
-
-
-def CalculateNetworkStatistics(zerodata, data):
-    if data is None:
-        return None, None
-    timeDiff = zerodata["timestamp"] - data["timestamp"]
-    bytesRecvDiff = zerodata["bytesRecv"] - data["bytesRecv"]
-    bytesSentDiff = zerodata["bytesSent"] - data["bytesSent"]
-    packetsRecvDiff = zerodata["packetsRecv"] - data["packetsRecv"]
-    packetsSentDiff = zerodata["packetsSent"] - data["packetsSent"]
-    bitesRecvAvg = bytesRecvDiff / timeDiff * 8
-    bitesSentAvg = bytesSentDiff / timeDiff * 8
-    packetsRecvAvg = packetsRecvDiff / timeDiff
-    packetsSentAvg = packetsSentDiff / timeDiff
-    netLoadAvg = b2mb(bitesRecvAvg + bitesSentAvg)
-    ppsAvg = round(packetsRecvAvg + packetsSentAvg, 2)
-    return netLoadAvg, ppsAvg
 # end define
 
 
@@ -331,60 +267,47 @@ def save_node_statistics(local, ton):
         for k in status['total.ls_queries_error'].split():
             if k.startswith('TOTAL'):
                 data['ls_queries']['error'] = int(k.split(':')[1])
-    statistics = local.db.get("statistics", dict())
+    values = dict()
+    for name in ["collated_blocks", "validated_blocks"]:
+        for chain in data.get(name, dict()):
+            values[f"node.{name}.{chain}.ok"] = data[name][chain]["ok"]
+            values[f"node.{name}.{chain}.error"] = data[name][chain]["error"]
+    for name in ["ext_msg_check", "ls_queries"]:
+        for key, value in data.get(name, dict()).items():
+            values[f"node.{name}.{key}"] = value
+    local.buffer.statistics_store.add_many(values, data['timestamp'])
+
+    statistics = ton.get_state("statistics")
+    node_statistics = statistics.get('node', [])
 
     # if time.time() - int(status.start_time) <= 60:  # was node restart <60 sec ago, resetting node statistics
-    #     statistics['node'] = []
-
-    if 'node' not in statistics:
-        statistics['node'] = []
+    #     node_statistics = []
 
-    if statistics['node']:
-        if int(status.start_time) > statistics['node'][-1]['timestamp']:
+    if node_statistics:
+        if int(status.start_time) > node_statistics[-1]['timestamp']:
             # node was restarted, reset node statistics
-            statistics['node'] = []
+            node_statistics = []
 
-    # statistics['node']: [stats_from_election_id, stats_from_prev_min, stats_now]
+    # node_statistics: [stats_from_election_id, stats_from_prev_min, stats_now]
 
     election_id = ton.GetConfig34(no_cache=True)['startWorkTime']
-    if len(statistics['node']) == 0:
-        statistics['node'] = [None, data]
-    elif len(statistics['node']) < 3:
-        statistics['node'].append(data)
-    elif len(statistics['node']) == 3:
-        if statistics['node'][0] is None:
+    if len(node_statistics) == 0:
+        node_statistics = [None, data]
+    elif len(node_statistics) < 3:
+        node_statistics.append(data)
+    elif len(node_statistics) == 3:
+        if node_statistics[0] is None:
             if 0 < data['timestamp'] - election_id < 90:
-                statistics['node'][0] = data
-        elif statistics['node'][0]['timestamp'] < election_id:
-            statistics['node'][0] = data
-        temp = statistics.get('node', []) + [data]
-        temp.pop(1)
-        statistics['node'] = temp
-    local.db["statistics"] = statistics
-    local.save()
-
-
-def ReadTransData(local, scanner):
-    transData = local.buffer.transData
-    SetToTimeData(transData, scanner.transNum)
-    ShortTimeData(transData)
-# end define
-
-
-def SetToTimeData(timeDataList, data):
-    timenow = int(time.time())
-    timeDataList[timenow] = data
-# end define
+                node_statistics[0] = data
+        elif node_statistics[0]['timestamp'] < election_id:
+            node_statistics[0] = data
+        node_statistics = node_statistics + [data]
+        node_statistics.pop(1)
+    statistics['node'] = node_statistics
 
 
-def ShortTimeData(data, max=120, diff=20):
-    if len(data) < max:
-        return
-    buff = data.copy()
-    data.clear()
-    keys = sorted(buff.keys(), reverse=True)
-    for item in keys[:max-diff]:
-        data[item] = buff[item]
+def ScanBlocks(local, scanner):
+    scanner.scan()
 # end define
 
 
@@ -394,47 +317,26 @@ def SaveTransStatistics(local):
     tps15 = GetTps(local, 60*15)
 
     # save statistics
-    statistics = local.db.get("statistics", dict())
+    statistics = local.buffer.state_store.get_table("statistics")
     statistics["tpsAvg"] = [tps1, tps5, tps15]
-    local.db["statistics"] = statistics
 # end define
 
 
-def GetDataPerSecond(data, timediff):
-    if len(data) == 0:
-        return
-    timenow = sorted(data.keys())[-1]
-    now = data.get(timenow)
-    prev = GetItemFromTimeData(data, timenow-timediff)
-    if prev is None:
-        return
-    diff = now - prev
-    result = diff / timediff
-    result = round(result, 2)
-    return result
-# end define
-
-
-def GetItemFromTimeData(data, timeneed):
-    if timeneed in data:
-        result = data.get(timeneed)
-    else:
-        result = data[min(data.keys(), key=lambda k: abs(k-timeneed))]
-    return result
+def GetTps(local, timediff):
+    return GetRate(local, "scanner.transactions", timediff)
 # end define
 
 
-def GetTps(local, timediff):
-    data = local.buffer.transData
-    tps = GetDataPerSecond(data, timediff)
-    return tps
+def GetBps(local, timediff):
+    return GetRate(local, "scanner.blocks", timediff)
 # end define
 
 
-def GetBps(local, timediff):
-    data = local.buffer.blocksData
-    bps = GetDataPerSecond(data, timediff)
-    return bps
+def GetRate(local, name, timediff):
+    rate = local.buffer.statistics_store.get_rate(name, timediff)
+    if rate is None:
+        return
+    return round(rate, 2)
 # end define
 
 
@@ -448,6 +350,13 @@ def GetBlockTimeAvg(local, timediff):
 # end define
 
 
+def track_efficiency(local, ton):
+    if not ton.using_validator():
+        return
+    ton.update_efficiency_tracker()
+# end define
+
+
 def Offers(local, ton):
     save_offers = ton.GetSaveOffers()
     if save_offers:
@@ -693,7 +602,7 @@ def backup_mytoncore_logs(local: MyPyClass, ton: MyTonCore):
 
 def check_mytoncore_db(local: MyPyClass, ton: MyTonCore):
     try:
-        local.read_db(local.buffer.db_path)
+        read_db_files(local.buffer.db_path)
         backup_path = local.buffer.db_path + ".backup"
         if not os.path.isfile(backup_path) or time.time() - os.path.getmtime(backup_path) > 3600*6:
             ton.create_self_db_backup()
@@ -707,49 +616,74 @@ def check_mytoncore_db(local: MyPyClass, ton: MyTonCore):
 def General(local):
     local.add_log("start General function", "debug")
     ton = MyTonCore(local)
-    # scanner = Dict()
-    # scanner.Run()
 
-    # Start threads
-    local.start_cycle(Statistics, sec=10, args=(local, ))
-    local.start_cycle(Telemetry, sec=60, args=(local, ton, ))
-    local.start_cycle(OverlayTelemetry, sec=7200, args=(local, ton, ))
-    local.start_cycle(backup_mytoncore_logs, sec=3600*4, args=(local, ton, ))
-    local.start_cycle(check_mytoncore_db, sec=600, args=(local, ton, ))
+    # Periodic tasks, a task is skipped when it could not start before its deadline
+    scheduler = Scheduler(local, max_workers=int(local.db.get("schedulerWorkers", 6)))
+    local.buffer.scheduler = scheduler
+    scheduler.add(Statistics, 10, args=(local, ), deadline=5)
+    if local.db.get("blockScanner"):
+        scanner = BlockScanner(ton, max_workers=local.db.get("blockScannerWorkers", 2))
+        scheduler.add(ScanBlocks, 5, args=(local, scanner, ), deadline=5)
+    scheduler.add(Telemetry, 60, args=(local, ton, ), priority=BACKGROUND, deadline=30)
+    scheduler.add(OverlayTelemetry, 7200, args=(local, ton, ), priority=BACKGROUND)
+    scheduler.add(backup_mytoncore_logs, 3600*4, args=(local, ton, ), priority=BACKGROUND)
+    scheduler.add(check_mytoncore_db, 600, args=(local, ton, ))
+    scheduler.add(save_scheduler_stats, 60, args=(ton, scheduler, ), priority=BACKGROUND, deadline=30)
 
     if local.db.get("onlyNode"):  # mytoncore service works only for telemetry
-        thr_sleep()
+        scheduler.run()
         return
 
-    local.start_cycle(Elections, sec=600, args=(local, ton, ))
-    local.start_cycle(Offers, sec=600, args=(local, ton, ))
-    local.start_cycle(save_past_events, sec=300, args=(local, ton, ))
+    # Elections, complaints and slashing poll only within their election phases
+    timetable = ElectionTimetable()
+    elections = scheduler.add(Elections, 600, args=(local, ton, ), priority=CRITICAL, planner=partial(timetable.get_next_run, ELECTIONS))
+    scheduler.add(Offers, 600, args=(local, ton, ))
+    scheduler.add(save_past_events, 300, args=(local, ton, ))
+    scheduler.add(track_efficiency, 120, args=(local, ton, ))
 
     t = 600
     if ton.GetNetworkName() != 'mainnet':
         t = 60
-    local.start_cycle(Complaints, sec=t, args=(local, ton, ))
-    local.start_cycle(Slashing, sec=t, args=(local, ton, ))
+    complaints = scheduler.add(Complaints, t, args=(local, ton, ), priority=CRITICAL, planner=partial(timetable.get_next_run, FREEZE))
+    slashing = scheduler.add(Slashing, t, args=(local, ton, ), priority=CRITICAL, planner=partial(timetable.get_next_run, FREEZE))
+    tasks = {elections: ELECTIONS, complaints: FREEZE, slashing: FREEZE}
+    scheduler.add(update_election_timetable, 3600, args=(local, ton, timetable, scheduler, tasks), priority=CRITICAL, planner=timetable.get_next_refresh)
 
-    local.start_cycle(ScanLiteServers, sec=60, args=(local, ton,))
+    scheduler.add(ScanLiteServers, 60, args=(local, ton,))
 
-    local.start_cycle(save_node_statistics, sec=60, args=(local, ton, ))
+    scheduler.add(save_node_statistics, 60, args=(local, ton, ), deadline=30)
 
     from modules.custom_overlays import CustomOverlayModule
-    local.start_cycle(CustomOverlayModule(ton, local).custom_overlays, sec=60, args=())
+    scheduler.add(CustomOverlayModule(ton, local).custom_overlays, 60)
 
     from modules.alert_bot import AlertBotModule
-    local.start_cycle(AlertBotModule(ton, local).check_status, sec=60, args=())
+    scheduler.add(AlertBotModule(ton, local).check_status, 60)
 
     from modules.prometheus import PrometheusModule
-    local.start_cycle(PrometheusModule(ton, local).push_metrics, sec=30, args=())
+    scheduler.add(PrometheusModule(ton, local).push_metrics, 30, deadline=15)
 
     if ton.in_initial_sync():
-        local.start_cycle(check_initial_sync, sec=120, args=(local, ton))
+        scheduler.add(check_initial_sync, 120, args=(local, ton))
+
+    scheduler.add(gc_import, 600, args=(local, ton), priority=BACKGROUND)
+
+    scheduler.run()
+# end define
+
+
+def update_election_timetable(local, ton, timetable, scheduler, tasks):
+    timetable.update(ton.GetConfig15(), ton.GetConfig34(no_cache=True), local.db.get("participateBeforeEnd"))
+    now = get_timestamp()
+    for task, phase in tasks.items():
+        next_run = timetable.get_next_run(phase, now, task.period)
+        if next_run is not None:
+            scheduler.wake(task, next_run)
+# end define
 
-    local.start_cycle(gc_import, sec=600, args=(local, ton))
 
-    thr_sleep()
+def save_scheduler_stats(ton, scheduler):
+    statistics = ton.get_state("statistics")
+    statistics["scheduler"] = scheduler.get_stats()
 # end define
 
 
@@ -757,6 +691,7 @@ def mytoncore():
     from mypylib.mypylib import MyPyClass
 
     local = MyPyClass('mytoncore.py')
+    ShardedDb(local).install()
     print('Local DB path:', local.buffer.db_path)
     Init(local)
     General(local)
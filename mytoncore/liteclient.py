@@ -13,17 +13,40 @@ class LiteClient:
 	#end define
 
 	def Run(self, cmd, **kwargs):
+		return self.run_batch([cmd], **kwargs)
+	#end define
+
+	def run_batch(self, cmds, **kwargs):
+		"""
+		Run several commands in one lite-client process, returns their joined output.
+		lite-client runs `--cmd` commands one after another, each one when
+		the previous query is answered, and stops at the first failed one.
+		"""
 		index = kwargs.get("index")
 		liteclient_timeout = self.local.db.liteclient_timeout if self.local.db.liteclient_timeout else 3
 		timeout = kwargs.get("timeout", liteclient_timeout)
 		useLocalLiteServer = kwargs.get("useLocalLiteServer", True)
+		args = self.get_args(index, useLocalLiteServer)
+		for cmd in cmds:
+			args += ["--cmd", cmd]
+
+		process = subprocess.run(args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=timeout)
+		output = process.stdout.decode("utf-8", errors='surrogateescape')
+		err = process.stderr.decode("utf-8", errors='surrogateescape')
+		if len(err) > 0:
+			self.local.add_log("args: {args}".format(args=args), "error")
+			raise Exception("LiteClient error: {err}".format(err=err))
+		return output
+	#end define
+
+	def get_args(self, index, useLocalLiteServer):
 		validator_status = self.ton.GetValidatorStatus()
-		args = [self.appPath, "--global-config", self.configPath, "--verbosity", "0", "--cmd", cmd]
+		args = [self.appPath, "--global-config", self.configPath, "--verbosity", "0"]
 		if index is not None:
 			index = str(index)
 			args += ["-i", index]
 		elif useLocalLiteServer and self.pubkeyPath and validator_status.out_of_sync is not None and validator_status.out_of_sync < 20:
-			args = [self.appPath, "--addr", self.addr, "--pub", self.pubkeyPath, "--verbosity", "0", "--cmd", cmd]
+			args = [self.appPath, "--addr", self.addr, "--pub", self.pubkeyPath, "--verbosity", "0"]
 		else:
 			liteServers = self.local.db.get("liteServers")
 			if liteServers is not None and len(liteServers):
@@ -31,13 +54,6 @@ class LiteClient:
 				index = str(index)
 				args += ["-i", index]
 		#end if
-
-		process = subprocess.run(args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=timeout)
-		output = process.stdout.decode("utf-8", errors='surrogateescape')
-		err = process.stderr.decode("utf-8", errors='surrogateescape')
-		if len(err) > 0:
-			self.local.add_log("args: {args}".format(args=args), "error")
-			raise Exception("LiteClient error: {err}".format(err=err))
-		return output
+		return args
 	#end define
 #end class
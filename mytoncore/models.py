@@ -1,4 +1,9 @@
 import os
+import json
+from array import array
+from collections.abc import Mapping
+
+from mytoncore.utils import b642hex
 
 
 class Wallet:
@@ -166,3 +171,154 @@ class Pool:
 		os.remove(self.addrFilePath)
 	#end define
 #end class
+
+
+class ValidatorConfig:
+	"""Parsed `getconfig` output of validator-engine-console with lookup indexes"""
+
+	def __init__(self, text):
+		self.text = text
+		self.data = json.loads(text)
+		self.adnl_ids = set() # hex adnl addresses
+		self.validator_keys = list() # validator keys sorted by (election_date, expire_at)
+		self.dht_ids = list() # hex dht ids
+		for item in self.data.get("adnl", list()):
+			self.adnl_ids.add(b642hex(item["id"]).upper())
+		for item in self.data.get("validators", list()):
+			key = dict()
+			key["id"] = b642hex(item["id"]).upper()
+			key["election_date"] = item.get("election_date")
+			key["expire_at"] = item.get("expire_at")
+			self.validator_keys.append(key)
+		self.validator_keys.sort(key=lambda key: (key["election_date"] or 0, key["expire_at"] or 0))
+		for item in self.data.get("dht", list()):
+			self.dht_ids.append(b642hex(item["id"]).upper())
+	#end define
+
+	def get_validator_key(self, election_date):
+		for key in self.validator_keys:
+			if key["election_date"] == election_date:
+				return key["id"]
+	#end define
+
+	def get_active_validator_key(self, timestamp):
+		# the newest key that is valid now
+		for key in reversed(self.validator_keys):
+			if key["election_date"] is None or key["expire_at"] is None:
+				continue
+			if key["election_date"] < timestamp < key["expire_at"]:
+				return key["id"]
+	#end define
+#end class
+
+
+class ValidatorsLoad(Mapping):
+	"""
+	Parsed `checkloadall` output of lite-client, stored by columns.
+	Row i of every column belongs to validator ids[i], positions maps
+	validator id to its row. As a mapping it returns rows as dicts keyed
+	by validator id, in the format used before.
+	"""
+
+	online_efficiency = 10 # validator with greater efficiency is online
+
+	def __init__(self, text=""):
+		self.ids = array('q')
+		self.pubkeys = list()
+		self.master_created = array('d')
+		self.work_created = array('d')
+		self.master_expected = array('d')
+		self.work_expected = array('d')
+		self.mr = array('d')
+		self.wr = array('d')
+		self.efficiency = array('d')
+		self.complaints = dict() # validator id -> saved complaint file info
+		self.positions = dict() # validator id -> row
+		self.parse(text)
+	#end define
+
+	def parse(self, text):
+		lines = text.split('\n')
+		for index, line in enumerate(lines):
+			if "pubkey" not in line or "val" not in line:
+				continue
+			buff = line.split(' ')
+			vid = int(buff[1].replace('#', '').replace(':', ''))
+			master_created, work_created = buff[6].replace('(', '').replace(')', '').split(',')
+			master_expected, work_expected = buff[8].replace('(', '').replace(')', '').split(',')
+			self.add(vid, buff[3].replace(',', ''), float(master_created), float(work_created), float(master_expected), float(work_expected))
+			# complaint file is saved two lines below
+			if index + 2 < len(lines) and "COMPLAINT_SAVED" in lines[index + 2]:
+				buff = lines[index + 2].split('\t')
+				self.complaints[vid] = {"var1": buff[1], "var2": buff[2], "fileName": buff[3]}
+		#end for
+	#end define
+
+	def add(self, vid, pubkey, master_created, work_created, master_expected, work_expected):
+		mr = master_created / master_expected if master_expected != 0 else 0
+		wr = work_created / work_expected if work_expected != 0 else 0
+		if master_expected > 0:  # show only masterchain efficiency for masterchain validator
+			r = mr
+		else:
+			r = (mr + wr) / 2
+		self.positions[vid] = len(self.ids)
+		self.ids.append(vid)
+		self.pubkeys.append(pubkey)
+		self.master_created.append(master_created)
+		self.work_created.append(work_created)
+		self.master_expected.append(master_expected)
+		self.work_expected.append(work_expected)
+		self.mr.append(mr)
+		self.wr.append(wr)
+		self.efficiency.append(round(r * 100, 2))
+	#end define
+
+	def is_online(self, i):
+		return self.efficiency[i] > self.online_efficiency
+	#end define
+
+	def get_online_count(self):
+		threshold = self.online_efficiency
+		return sum(1 for efficiency in self.efficiency if efficiency > threshold)
+	#end define
+
+	def get_efficiency_percentile(self, percent):
+		"""Efficiency percentile with linear interpolation between rows"""
+		if len(self.efficiency) == 0:
+			return None
+		values = sorted(self.efficiency)
+		pos = (len(values) - 1) * percent / 100
+		low = int(pos)
+		high = min(low + 1, len(values) - 1)
+		return values[low] + (values[high] - values[low]) * (pos - low)
+	#end define
+
+	def get_row(self, i):
+		vid = self.ids[i]
+		item = dict()
+		item["id"] = vid
+		item["pubkey"] = self.pubkeys[i]
+		item["masterBlocksCreated"] = self.master_created[i]
+		item["workBlocksCreated"] = self.work_created[i]
+		item["masterBlocksExpected"] = self.master_expected[i]
+		item["workBlocksExpected"] = self.work_expected[i]
+		item["mr"] = self.mr[i]
+		item["wr"] = self.wr[i]
+		item["efficiency"] = self.efficiency[i]
+		item["online"] = self.is_online(i)
+		item.update(self.complaints.get(vid, dict()))
+		return item
+	#end define
+
+	def __getitem__(self, vid):
+		return self.get_row(self.positions[vid])
+	#end define
+
+	def __iter__(self):
+		return iter(self.positions)
+	#end define
+
+	def __len__(self):
+		return len(self.positions)
+	#end define
+#end class
@@ -10,6 +10,7 @@ import subprocess
 import requests
 from fastcrc import crc16
 from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
 
 from modules import MODES
 from modules.btc_teleport import BtcTeleportModule
@@ -17,6 +18,15 @@ from mytoncore.utils import xhex2hex, ng2g, get_package_resource_path
 from mytoncore.liteclient import LiteClient
 from mytoncore.validator_console import ValidatorConsole
 from mytoncore.fift import Fift
+from mytoncore.function_cache import FunctionCache
+from mytoncore.efficiency_tracker import EfficiencyTracker
+from mytoncore.timeseries import TimeSeriesStore
+from mytoncore.telemetry import DISK_COUNTERS, NETWORK_COUNTERS, CalculateDiskStatistics, CalculateNetworkStatistics
+from mytoncore.transaction_cache import TransactionCache
+from mytoncore.state_store import StateStore
+from mytoncore.sharded_db import ShardedDb, read_db_files
+from mytoncore.round_archive import ROUND_ARCHIVES
+from mytoncore.parsers import parse_tvm_stack, parse_tlb, parse_dump, parse_account_state, split_config_params, DumpNode
 from mytoncore.models import (
     Wallet,
     Account,
@@ -24,6 +34,8 @@ from mytoncore.models import (
     Trans,
     Message,
     Pool,
+    ValidatorConfig,
+    ValidatorsLoad,
 )
 
 from mypylib.mypylib import (
@@ -34,6 +46,10 @@ from mypylib.mypylib import (
 )
 
 
+STATISTICS_WINDOWS = [60, 5*60, 15*60] # 1, 5 and 15 minute averages
+STATISTICS_MAX_AGE = 120 # older data of the statistics store means the daemon does not sample it
+
+
 class MyTonCore():
 	def __init__(self, local):
 		self.local = local
@@ -44,11 +60,29 @@ class MyTonCore():
 		self.tempDir: str
 		self.nodeName: str
 
+		if self.local.buffer.get("sharded_db") is None:
+			ShardedDb(self.local).install()
+		if self.local.buffer.get("function_cache") is None:
+			self.local.buffer.function_cache = FunctionCache()
+		self.function_cache = self.local.buffer.function_cache
+		self.efficiency_tracker = EfficiencyTracker(self.local)
+		if self.local.buffer.get("statistics_store") is None:
+			# mytoncore daemon creates writable store on start, others only read it
+			self.local.buffer.statistics_store = TimeSeriesStore(self.local.buffer.my_work_dir + "statistics/")
+		self.statistics_store = self.local.buffer.statistics_store
+		if self.local.buffer.get("state_store") is None:
+			self.local.buffer.state_store = StateStore(self.local.buffer.my_work_dir + "state.db")
+		self.state_store = self.local.buffer.state_store
+
 		self.liteClient = LiteClient(self.local)
 		self.validatorConsole = ValidatorConsole(self.local)
 		self.fift = Fift(self.local)
 
 		self.Refresh()
+		if self.state_store.migrate(self.local.db):
+			self.local.add_log("State moved from local.db to " + self.state_store.path, "info")
+			self.local.save()
+		self.migrate_round_archives()
 
 		os.makedirs(self.walletsDir, exist_ok=True)
 		os.makedirs(self.contractsDir, exist_ok=True)
@@ -110,6 +144,9 @@ class MyTonCore():
 				self.local.add_log("Restoring the configuration file", "info")
 				args = ["cp", backup_path, mconfig_path]
 				subprocess.run(args)
+				if os.path.isdir(backup_path + ".d"):
+					subprocess.run(["rm", "-rf", mconfig_path + ".d"])
+					subprocess.run(["cp", "-r", backup_path + ".d", mconfig_path + ".d"])
 				self.dbFile = mconfig_path
 				self.Refresh()
 		elif not os.path.isfile(backup_path) or time.time() - os.path.getmtime(backup_path) > 3600:
@@ -122,13 +159,20 @@ class MyTonCore():
 		backup_path = mconfig_path + ".backup"
 		backup_tmp_path = backup_path + '.tmp'
 		subprocess.run(["cp", mconfig_path, backup_tmp_path])
+		if os.path.isdir(mconfig_path + ".d"):
+			# sections of the db in separate files
+			subprocess.run(["rm", "-rf", backup_tmp_path + ".d"])
+			subprocess.run(["cp", "-r", mconfig_path + ".d", backup_tmp_path + ".d"])
 		try:
-			with open(backup_tmp_path, "r") as file:
-				json.load(file)
+			read_db_files(backup_tmp_path)
+			if os.path.isdir(backup_tmp_path + ".d"):
+				subprocess.run(["rm", "-rf", backup_path + ".d"])
+				os.rename(backup_tmp_path + ".d", backup_path + ".d")
 			os.rename(backup_tmp_path, backup_path)  # atomic opetation
 		except Exception:
 			self.local.add_log("Could not update backup, backup_tmp file is broken", "warning")
 			os.remove(backup_tmp_path)
+			subprocess.run(["rm", "-rf", backup_tmp_path + ".d"])
 
 	def GetVarFromWorkerOutput(self, text, search):
 		if ':' not in search:
@@ -183,33 +227,24 @@ class MyTonCore():
 		account = Account(workchain, addr)
 		cmd = "getaccount {inputAddr}".format(inputAddr=inputAddr)
 		result = self.liteClient.Run(cmd)
-		storage = self.GetVarFromWorkerOutput(result, "storage")
-		if storage is None:
+		fields = parse_account_state(result)
+		if fields is None:
 			return account
-		addr = self.GetVarFromWorkerOutput(result, "addr")
-		workchain = self.GetVar(addr, "workchain_id")
-		address = self.GetVar(addr, "address")
+		workchain = self.GetVar(fields["addr"], "workchain_id")
+		address = self.GetVar(fields["addr"], "address")
 		addrFull = "{}:{}".format(workchain, xhex2hex(address))
-		balance = self.GetVarFromWorkerOutput(storage, "balance")
-		grams = self.GetVarFromWorkerOutput(balance, "grams")
-		value = self.GetVarFromWorkerOutput(grams, "value")
-		state = self.GetVarFromWorkerOutput(storage, "state")
-		code_buff = self.GetVarFromWorkerOutput(state, "code")
-		data_buff = self.GetVarFromWorkerOutput(state, "data")
-		code = self.GetVarFromWorkerOutput(code_buff, "value")
-		data = self.GetVarFromWorkerOutput(data_buff, "value")
-		code = self.GetBody(code)
-		data = self.GetBody(data)
+		value = fields["value"]
+		code = self.GetBody(fields["code"])
 		codeHash = self.GetCodeHash(code)
-		status = parse(state, "account_", '\n')
+		status = parse(fields["state"], "account_", '\n')
 		account.workchain = int(workchain)
 		account.addr = xhex2hex(address)
 		account.addrB64 = self.AddrFull2AddrB64(addrFull)
 		account.addrFull = addrFull
 		account.status = status
 		account.balance = ng2g(value)
-		account.lt = parse(result, "lt = ", ' ')
-		account.hash = parse(result, "hash = ", '\n')
+		account.lt = fields["lt"]
+		account.hash = fields["hash"]
 		account.codeHash = codeHash
 		return account
 	#end define
@@ -224,25 +259,151 @@ class MyTonCore():
 
 	def GetAccountHistory(self, account, limit):
 		self.local.add_log("start GetAccountHistory function", "debug")
+		return list(self.iter_account_history_pages(account, limit))
+	#end define
+
+	def iter_account_history_pages(self, account, limit):
+		"""
+		Yield messages of whole pages of 10 account transactions, from the
+		last one, until there are at least `limit` messages
+		"""
+		# small histories fit into one page, do not request the next one
+		page_size = max(10, min(limit, 50))
+		transactions = self.iter_account_transactions(account, page_size=page_size, prefetch=limit > page_size)
+		count = 0
+		try:
+			for index, transaction in enumerate(transactions, 1):
+				yield from transaction["messages"]
+				count += len(transaction["messages"])
+				if index % 10 == 0 and count >= limit:
+					return
+		finally:
+			transactions.close()
+	#end define
+
+	def iter_account_history(self, account, since_lt=None, until_time=None, page_size=50, prefetch=True):
+		"""
+		Yield messages of the account transactions from the last one,
+		stops at the transaction with lt <= since_lt or older than until_time.
+		"""
+		transactions = self.iter_account_transactions(account, page_size, prefetch)
+		try:
+			for transaction in transactions:
+				if since_lt is not None and transaction["lt"] <= since_lt:
+					return
+				for message in transaction["messages"]:
+					if until_time is not None and message.time < until_time:
+						return
+					yield message
+		finally:
+			transactions.close()
+	#end define
+
+	def iter_account_transactions(self, account, page_size=50, prefetch=True):
+		"""
+		Yield the account transactions from the last one.
+		Pages of `page_size` transactions are requested by lasttransdump,
+		the next page is fetched in background while the current one is consumed.
+		Transactions are cached on disk, only new ones are fetched again.
+		"""
+		if account.lt is None or int(account.lt) == 0:
+			return
 		addr = f"{account.workchain}:{account.addr}"
-		lt = account.lt
-		transHash = account.hash
-		history = list()
-		while True:
-			data, lt, transHash = self.LastTransDump(addr, lt, transHash)
-			history += data
-			if lt is None or len(history) >= limit:
-				return history
+		def fetch(lt, transHash):
+			return self.iter_transactions(addr, lt, transHash, page_size, prefetch)
+		cache = self.get_transaction_cache()
+		if cache is None:
+			transactions = fetch(int(account.lt), account.hash)
+		else:
+			transactions = cache.iter_transactions(addr, int(account.lt), account.hash, fetch)
+		try:
+			yield from transactions
+		finally:
+			transactions.close()
+	#end define
+
+	def iter_transactions(self, addr, lt, transHash, page_size, prefetch=True):
+		"""Yield transactions from (lt, transHash) back, get_last_transactions() pages are prefetched"""
+		executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="account_history")
+		try:
+			future = None
+			while lt is not None:
+				if future is None:
+					data, lt, transHash = self.get_last_transactions(addr, lt, transHash, page_size)
+				else:
+					data, lt, transHash = future.result()
+				future = None
+				if prefetch and lt is not None:
+					future = executor.submit(self.get_last_transactions, addr, lt, transHash, page_size)
+				yield from data
+		finally:
+			executor.shutdown(wait=False)
+	#end define
+
+	def get_state(self, name):
+		"""Dict view of a StateStore table, name is the local.db section it replaced"""
+		return self.state_store.get_table(name)
+	#end define
+
+	def get_round_archive(self, name):
+		"""Archive of rounds, name is the local.db section it replaced"""
+		days = self.local.db.get("round_archive_days", 30)
+		directory, archive_class = ROUND_ARCHIVES[name]
+		return archive_class(self.local.buffer.my_work_dir + "rounds/" + directory, int(days) * 86400)
+	#end define
+
+	def migrate_round_archives(self):
+		for name in ROUND_ARCHIVES:
+			table = self.get_state(name)
+			if not table:
+				continue
+			archive = self.get_round_archive(name)
+			for key, value in table.items():
+				try:
+					archive[key] = value
+				except Exception as ex:
+					# the row stays in the table and is retried on the next start
+					self.local.add_log("Failed to archive round {key} of {name}: {ex}".format(key=key, name=name, ex=ex), "warning")
+					continue
+				del table[key]
+	#end define
+
+	def get_transaction_cache(self):
+		size = self.local.db.get("transaction_cache_size", 64) # MB
+		if not size:
+			return None
+		if self.local.buffer.get("transaction_cache") is None:
+			self.local.buffer.transaction_cache = TransactionCache(self.local.buffer.my_work_dir + "transactions.db")
+		cache = self.local.buffer.transaction_cache
+		cache.max_size = int(size) * 1024 * 1024
+		return cache
 	#end define
 
 	def LastTransDump(self, addr, lt, transHash, count=10):
 		history = list()
+		transactions, prevTransLt, prevTransHash = self.get_last_transactions(addr, lt, transHash, count)
+		for transaction in transactions:
+			history += transaction["messages"]
+		if prevTransLt is not None:
+			prevTransLt = str(prevTransLt)
+		return history, prevTransLt, prevTransHash
+	#end define
+
+	def get_last_transactions(self, addr, lt, transHash, count=10):
+		"""
+		Up to `count` transactions from (lt, transHash) back as dicts of lt, hash,
+		prev_lt, prev_hash, block and parsed messages,
+		and (lt, hash) of the previous transaction (None after the first one)
+		"""
+		transactions = list()
 		cmd = f"lasttransdump {addr} {lt} {transHash} {count}"
 		result = self.liteClient.Run(cmd)
 		data = self.Result2Dict(result)
 		prevTrans = self.GetKeyFromDict(data, "previous transaction")
 		prevTransLt = self.GetVar(prevTrans, "lt")
 		prevTransHash = self.GetVar(prevTrans, "hash")
+		if prevTransLt is not None:
+			prevTransLt = int(prevTransLt)
 		for key, item in data.items():
 			if "transaction #" not in key:
 				continue
@@ -255,43 +416,61 @@ class MyTonCore():
 			messages = self.GetMessagesFromTransaction(item)
 			transData = dict()
 			transData["type"] = type
-			transData["trans"] = Trans(Block(block_str))
+			transData["trans"] = Trans(Block(block_str), lt=parse(key, " lt:", ' '))
 			transData["time"] = time
 			#transData["outmsg"] = outmsg
 			transData["total_fees"] = total_fees
-			history += self.ParsMessages(messages, transData)
-		return history, prevTransLt, prevTransHash
+			transaction = dict()
+			transaction["lt"] = int(transData["trans"].lt)
+			# hash of a transaction is known from the next (newer) one
+			transaction["hash"] = transactions[-1]["prev_hash"] if transactions else transHash
+			transaction["prev_lt"] = int(parse(key, "prev_trans_lt:", ' ')) or None
+			transaction["prev_hash"] = parse(key, "prev_trans_hash:x", ' ')
+			transaction["block"] = transData["trans"].block
+			transaction["messages"] = self.ParsMessages(messages, transData)
+			transactions.append(transaction)
+		#end for
+		if transactions:
+			# the last one is linked by the lite-client
+			transactions[-1]["prev_lt"] = prevTransLt
+			transactions[-1]["prev_hash"] = prevTransHash
+		return transactions, prevTransLt, prevTransHash
 	#end define
 
 	def ParsMessages(self, messages, transData):
 		history = list()
 		#for item in messages:
 		for data in messages:
-			ihr_disabled = self.GetVarFromDict(data, "message.ihr_disabled")
-			bounce = self.GetVarFromDict(data, "message.bounce")
-			bounced = self.GetVarFromDict(data, "message.bounced")
+			# resolve common parts of the paths once
+			message = self.GetItemFromDict(data, "message")
+			info = self.GetItemFromDict(message, "info")
+
+			ihr_disabled = self.GetVarFromDict(message, "ihr_disabled")
+			bounce = self.GetVarFromDict(message, "bounce")
+			bounced = self.GetVarFromDict(message, "bounced")
 
-			srcWorkchain = self.GetVarFromDict(data, "message.info.src.workchain_id")
-			address = self.GetVarFromDict(data, "message.info.src.address")
+			src = self.GetItemFromDict(info, "src")
+			srcWorkchain = self.GetVarFromDict(src, "workchain_id")
+			address = self.GetVarFromDict(src, "address")
 			srcAddr = xhex2hex(address)
 			#if address:
 			#	src = "{}:{}".format(workchain, xhex2hex(address))
 			#end if
 
-			destWorkchain = self.GetVarFromDict(data, "message.info.dest.workchain_id")
-			address = self.GetVarFromDict(data, "message.info.dest.address")
+			dest = self.GetItemFromDict(info, "dest")
+			destWorkchain = self.GetVarFromDict(dest, "workchain_id")
+			address = self.GetVarFromDict(dest, "address")
 			destAddr = xhex2hex(address)
 			#if address:
 			#	dest = "{}:{}".format(workchain, xhex2hex(address))
 			#end if
 
-			grams = self.GetVarFromDict(data, "message.info.value.grams.value")
-			ihr_fee = self.GetVarFromDict(data, "message.info.ihr_fee.value")
-			fwd_fee = self.GetVarFromDict(data, "message.info.fwd_fee.value")
-			# import_fee = self.GetVarFromDict(data, "message.info.import_fee.value")
+			grams = self.GetVarFromDict(info, "value.grams.value")
+			ihr_fee = self.GetVarFromDict(info, "ihr_fee.value")
+			fwd_fee = self.GetVarFromDict(info, "fwd_fee.value")
+			# import_fee = self.GetVarFromDict(info, "import_fee.value")
 
-			#body = self.GetVarFromDict(data, "message.body.value")
-			message = self.GetItemFromDict(data, "message")
+			#body = self.GetVarFromDict(message, "body.value")
 			body = self.GetItemFromDict(message, "body")
 			value = self.GetItemFromDict(body, "value")
 			body = self.GetBodyFromDict(value)
@@ -480,7 +659,6 @@ class MyTonCore():
 	def SetWalletVersion(self, addrB64, version):
 		walletsVersionList = self.GetWalletsVersionList()
 		walletsVersionList[addrB64] = version
-		self.local.save()
 	#end define
 
 	def GetVersionFromCodeHash(self, inputHash):
@@ -513,55 +691,40 @@ class MyTonCore():
 	#end define
 
 	def GetWalletsVersionList(self):
-		bname = "walletsVersionList"
-		walletsVersionList = self.local.db.get(bname)
-		if walletsVersionList is None:
-			walletsVersionList = dict()
-			self.local.db[bname] = walletsVersionList
-		return walletsVersionList
+		return self.get_state("walletsVersionList")
 	#end define
 
 	def GetFullConfigAddr(self):
-		# Get buffer
 		bname = "fullConfigAddr"
-		buff = self.GetFunctionBuffer(bname, timeout=60)
-		if buff:
-			return buff
-		#end if
+		return self.buffered_call(bname, self.fetch_full_config_addr, timeout=60, scope="key")
+	#end define
 
+	def fetch_full_config_addr(self):
 		self.local.add_log("start GetFullConfigAddr function", "debug")
 		result = self.liteClient.Run("getconfig 0")
 		configAddr_hex = self.GetVarFromWorkerOutput(result, "config_addr:x")
 		fullConfigAddr = "-1:{configAddr_hex}".format(configAddr_hex=configAddr_hex)
-
-		# Set buffer
-		self.SetFunctionBuffer(bname, fullConfigAddr)
 		return fullConfigAddr
 	#end define
 
 	def GetFullElectorAddr(self):
-		# Get buffer
 		bname = "fullElectorAddr"
-		buff = self.GetFunctionBuffer(bname, timeout=60)
-		if buff:
-			return buff
-		#end if
+		return self.buffered_call(bname, self.fetch_full_elector_addr, timeout=60, scope="key")
+	#end define
 
+	def fetch_full_elector_addr(self):
 		# Get data
 		self.local.add_log("start GetFullElectorAddr function", "debug")
 		result = self.liteClient.Run("getconfig 1")
 		electorAddr_hex = self.GetVarFromWorkerOutput(result, "elector_addr:x")
 		fullElectorAddr = "-1:{electorAddr_hex}".format(electorAddr_hex=electorAddr_hex)
-
-		# Set buffer
-		self.SetFunctionBuffer(bname, fullElectorAddr)
 		return fullElectorAddr
 	#end define
 
 	def GetFullMinterAddr(self):
 		# Get buffer
 		bname = "fullMinterAddr"
-		buff = self.GetFunctionBuffer(bname, timeout=60)
+		buff = self.GetFunctionBuffer(bname, timeout=60, scope="key")
 		if buff:
 			return buff
 		#end if
@@ -572,14 +735,14 @@ class MyTonCore():
 		fullMinterAddr = "-1:{minterAddr_hex}".format(minterAddr_hex=minterAddr_hex)
 
 		# Set buffer
-		self.SetFunctionBuffer(bname, fullMinterAddr)
+		self.SetFunctionBuffer(bname, fullMinterAddr, scope="key")
 		return fullMinterAddr
 	#end define
 
 	def GetFullDnsRootAddr(self):
 		# Get buffer
 		bname = "fullDnsRootAddr"
-		buff = self.GetFunctionBuffer(bname, timeout=60)
+		buff = self.GetFunctionBuffer(bname, timeout=60, scope="key")
 		if buff:
 			return buff
 		#end if
@@ -590,18 +753,16 @@ class MyTonCore():
 		fullDnsRootAddr = "-1:{dnsRootAddr_hex}".format(dnsRootAddr_hex=dnsRootAddr_hex)
 
 		# Set buffer
-		self.SetFunctionBuffer(bname, fullDnsRootAddr)
+		self.SetFunctionBuffer(bname, fullDnsRootAddr, scope="key")
 		return fullDnsRootAddr
 	#end define
 
 	def GetActiveElectionId(self, fullElectorAddr):
-		# Get buffer
 		bname = "activeElectionId"
-		buff = self.GetFunctionBuffer(bname)
-		if buff:
-			return buff
-		#end if
+		return self.buffered_call(bname, lambda: self.fetch_active_election_id(fullElectorAddr), scope="master")
+	#end define
 
+	def fetch_active_election_id(self, fullElectorAddr):
 		self.local.add_log("start GetActiveElectionId function", "debug")
 		cmd = "runmethodfull {fullElectorAddr} active_election_id".format(fullElectorAddr=fullElectorAddr)
 		result = self.liteClient.Run(cmd)
@@ -609,9 +770,6 @@ class MyTonCore():
 		activeElectionId = activeElectionId.replace(' ', '')
 		activeElectionId = parse(activeElectionId, '[', ']')
 		activeElectionId = int(activeElectionId)
-
-		# Set buffer
-		self.SetFunctionBuffer(bname, activeElectionId)
 		return activeElectionId
 	#end define
 
@@ -696,19 +854,19 @@ class MyTonCore():
 		return data
 	#end define
 
-	def GetBlock(self, workchain, shardchain, seqno):
+	def GetBlock(self, workchain, shardchain, seqno, **kwargs):
 		cmd = "byseqno {workchain}:{shardchain} {seqno}"
 		cmd = cmd.format(workchain=workchain, shardchain=shardchain, seqno=seqno)
-		result = self.liteClient.Run(cmd)
+		result = self.liteClient.Run(cmd, **kwargs)
 		block_str =  parse(result, "block header of ", ' ')
 		block = Block(block_str)
 		return block
 	#end define
 
-	def GetTransactions(self, block):
+	def GetTransactions(self, block, **kwargs):
 		transactions = list()
 		cmd = "listblocktrans {block} 999999".format(block=block)
-		result = self.liteClient.Run(cmd)
+		result = self.liteClient.Run(cmd, **kwargs)
 		lines = result.split('\n')
 		for line in lines:
 			if "transaction #" in line:
@@ -724,11 +882,11 @@ class MyTonCore():
 		return transactions
 	#end define
 
-	def GetTrans(self, trans):
+	def GetTrans(self, trans, **kwargs):
 		addr = f"{trans.block.workchain}:{trans.addr}"
 		messageList = list()
 		cmd = f"dumptrans {trans.block} {addr} {trans.lt}"
-		result = self.liteClient.Run(cmd)
+		result = self.liteClient.Run(cmd, **kwargs)
 		data = self.Result2Dict(result)
 		for key, item in data.items():
 			if "transaction is" not in key:
@@ -749,13 +907,13 @@ class MyTonCore():
 		return messageList
 	#end define
 
-	def GetShards(self, block=None):
+	def GetShards(self, block=None, **kwargs):
 		shards = list()
 		if block:
 			cmd = "allshards {block}".format(block=block)
 		else:
 			cmd = "allshards"
-		result = self.liteClient.Run(cmd)
+		result = self.liteClient.Run(cmd, **kwargs)
 		lines = result.split('\n')
 		for line in lines:
 			if "shard #" in line:
@@ -782,13 +940,13 @@ class MyTonCore():
 					result[name] = value
 
 	def GetValidatorStatus(self, no_cache=False):
-		# Get buffer
 		bname = "validator_status"
-		buff = self.GetFunctionBuffer(bname)
-		if buff and not no_cache:
-			return buff
-		#end if
+		if no_cache:
+			self.function_cache.invalidate(bname)
+		return self.buffered_call(bname, self.fetch_validator_status)
+	#end define
 
+	def fetch_validator_status(self):
 		self.local.add_log("start GetValidatorStatus function", "debug")
 		status = Dict()
 		result = None
@@ -832,9 +990,6 @@ class MyTonCore():
 		# old vars
 		status.outOfSync = status.out_of_sync
 		status.isWorking = status.is_working
-
-		# Set buffer
-		self.SetFunctionBuffer(bname, status)
 		return status
 	#end define
 
@@ -851,26 +1006,43 @@ class MyTonCore():
 	#end define
 
 	def GetConfig(self, configId):
-		# Get buffer
 		bname = "config" + str(configId)
-		buff = self.GetFunctionBuffer(bname, timeout=60)
-		if buff:
-			return buff
-		#end if
+		return self.buffered_call(bname, lambda: self.fetch_config(configId), timeout=60, scope="key")
+	#end define
 
+	def fetch_config(self, configId):
 		text = "start GetConfig function ({})".format(configId)
 		self.local.add_log(text, "debug")
 		cmd = "getconfig {configId}".format(configId=configId)
 		result = self.liteClient.Run(cmd)
+		data = self.parse_config(result)
+		return data
+	#end define
+
+	def parse_config(self, result):
 		start = result.find("ConfigParam")
 		text = result[start:]
 		data = self.Tlb2Json(text)
-
-		# Set buffer
-		self.SetFunctionBuffer(bname, data)
 		return data
 	#end define
 
+	def prefetch_configs(self, config_ids):
+		"""Fetch config params with one lite-client process and fill the function buffers"""
+		parsers = {32: self.parse_config32, 34: self.parse_config34, 36: self.parse_config36}
+		config_ids = [config_id for config_id in config_ids if not self.GetFunctionBuffer("config" + str(config_id), timeout=10, scope="key")]
+		if len(config_ids) == 0:
+			return
+		self.local.add_log("start prefetch_configs function ({})".format(config_ids), "debug")
+		cmds = ["getconfig {configId}".format(configId=config_id) for config_id in config_ids]
+		results = split_config_params(self.liteClient.run_batch(cmds))
+		for config_id in config_ids:
+			if config_id not in results:
+				continue # left to GetConfig
+			parser = parsers.get(config_id, self.parse_config)
+			data = parser(results[config_id])
+			self.SetFunctionBuffer("config" + str(config_id), data, scope="key")
+	#end define
+
 	def GetConfig15(self):
 		config = self.GetConfig(15)
 		config15 = dict()
@@ -891,16 +1063,19 @@ class MyTonCore():
 	#end define
 
 	def GetConfig32(self):
-		# Get buffer
 		bname = "config32"
-		buff = self.GetFunctionBuffer(bname, timeout=60)
-		if buff:
-			return buff
-		#end if
+		return self.buffered_call(bname, self.fetch_config32, timeout=60, scope="key")
+	#end define
 
+	def fetch_config32(self):
 		self.local.add_log("start GetConfig32 function", "debug")
-		config32 = Dict()
 		result = self.liteClient.Run("getconfig 32")
+		config32 = self.parse_config32(result)
+		return config32
+	#end define
+
+	def parse_config32(self, result):
+		config32 = Dict()
 		config32["totalValidators"] = int(parse(result, "total:", ' '))
 		config32["mainValidators"] = int(parse(result, "main:", ' '))
 		config32["startWorkTime"] = int(parse(result, "utime_since:", ' '))
@@ -921,23 +1096,25 @@ class MyTonCore():
 				buff["weight"] = validatorWeight
 				validators.append(buff)
 		config32["validators"] = validators
-
-		# Set buffer
-		self.SetFunctionBuffer(bname, config32)
 		return config32
 	#end define
 
 	def GetConfig34(self, no_cache: bool = False):
-		# Get buffer
 		bname = "config34"
-		buff = self.GetFunctionBuffer(bname, timeout=10)
-		if buff and not no_cache:
-			return buff
-		#end if
+		if no_cache:
+			self.function_cache.invalidate(bname)
+		return self.buffered_call(bname, self.fetch_config34, timeout=10, scope="key")
+	#end define
 
+	def fetch_config34(self):
 		self.local.add_log("start GetConfig34 function", "debug")
-		config34 = Dict()
 		result = self.liteClient.Run("getconfig 34")
+		config34 = self.parse_config34(result)
+		return config34
+	#end define
+
+	def parse_config34(self, result):
+		config34 = Dict()
 		config34["totalValidators"] = int(parse(result, "total:", ' '))
 		config34["mainValidators"] = int(parse(result, "main:", ' '))
 		config34["startWorkTime"] = int(parse(result, "utime_since:", ' '))
@@ -959,24 +1136,27 @@ class MyTonCore():
 				buff["weight"] = validatorWeight
 				validators.append(buff)
 		config34["validators"] = validators
-
-		# Set buffer
-		self.SetFunctionBuffer(bname, config34)
 		return config34
 	#end define
 
 	def GetConfig36(self):
-		# Get buffer
 		bname = "config36"
-		buff = self.GetFunctionBuffer(bname, timeout=60)
-		if buff:
-			return buff
-		#end if
+		return self.buffered_call(bname, self.fetch_config36, timeout=60, scope="key")
+	#end define
 
+	def fetch_config36(self):
 		self.local.add_log("start GetConfig36 function", "debug")
-		config36 = dict()
 		try:
 			result = self.liteClient.Run("getconfig 36")
+		except Exception:
+			result = ""
+		config36 = self.parse_config36(result)
+		return config36
+	#end define
+
+	def parse_config36(self, result):
+		config36 = dict()
+		try:
 			config36["totalValidators"] = int(parse(result, "total:", ' '))
 			config36["startWorkTime"] = int(parse(result, "utime_since:", ' '))
 			config36["endWorkTime"] = int(parse(result, "utime_until:", ' '))
@@ -996,9 +1176,6 @@ class MyTonCore():
 		except Exception:
 			config36["validators"] = list()
 		#end try
-
-		# Set buffer
-		self.SetFunctionBuffer(bname, config36)
 		return config36
 	#end define
 
@@ -1032,6 +1209,7 @@ class MyTonCore():
 		output = False
 		cmd = "addpermkey {key} {startWorkTime} {endWorkTime}".format(key=key, startWorkTime=startWorkTime, endWorkTime=endWorkTime)
 		result = self.validatorConsole.Run(cmd)
+		self.invalidate_validator_config()
 		if ("success" in result):
 			output = True
 		return output
@@ -1041,6 +1219,7 @@ class MyTonCore():
 		self.local.add_log("start AddKeyToTemp function", "debug")
 		output = False
 		result = self.validatorConsole.Run("addtempkey {key} {key} {endWorkTime}".format(key=key, endWorkTime=endWorkTime))
+		self.invalidate_validator_config()
 		if ("success" in result):
 			output = True
 		return output
@@ -1050,6 +1229,7 @@ class MyTonCore():
 		self.local.add_log("start AddAdnlAddrToValidator function", "debug")
 		output = False
 		result = self.validatorConsole.Run("addadnl {adnlAddr} 0".format(adnlAddr=adnlAddr))
+		self.invalidate_validator_config()
 		if ("success" in result):
 			output = True
 		return output
@@ -1064,6 +1244,7 @@ class MyTonCore():
 		self.local.add_log("start AttachAdnlAddrToValidator function", "debug")
 		output = False
 		result = self.validatorConsole.Run("addvalidatoraddr {key} {adnlAddr} {endWorkTime}".format(adnlAddr=adnlAddr, key=key, endWorkTime=endWorkTime))
+		self.invalidate_validator_config()
 		if ("success" in result):
 			output = True
 		return output
@@ -1399,7 +1580,6 @@ class MyTonCore():
 
 		# Get ADNL address
 		adnl_addr = self.GetAdnlAddr()
-		adnl_addr_bytes = bytes.fromhex(adnl_addr)
 
 		# Check wether it is too early to participate
 		if "participateBeforeEnd" in self.local.db:
@@ -1409,16 +1589,10 @@ class MyTonCore():
 				return
 		#end if
 
-		vconfig = self.GetValidatorConfig()
+		vconfig = self.get_validator_config_snapshot()
 
-		have_adnl = False
 		# Check if ADNL address is in the list
-		for a in vconfig.adnl:
-			if base64.b64decode(a.id) == adnl_addr_bytes:
-				have_adnl = True
-				break
-		#end for
-		if not have_adnl:
+		if adnl_addr.upper() not in vconfig.adnl_ids:
 			raise Exception('ADNL address is not found')
 		#end if
 
@@ -1534,14 +1708,11 @@ class MyTonCore():
 	def GetValidatorKeyByTime(self, startWorkTime, endWorkTime):
 		self.local.add_log("start GetValidatorKeyByTime function", "debug")
 		# Check temp key
-		vconfig = self.GetValidatorConfig()
-		for item in vconfig.validators:
-			if item.get("election_date") == startWorkTime:
-				validatorKey_b64 = item.get("id")
-				validatorKey = base64.b64decode(validatorKey_b64).hex()
-				validatorKey = validatorKey.upper()
-				return validatorKey
-		#end for
+		vconfig = self.get_validator_config_snapshot()
+		validatorKey = vconfig.get_validator_key(startWorkTime)
+		if validatorKey is not None:
+			return validatorKey
+		#end if
 
 		# Create temp key
 		validatorKey = self.CreateNewKey()
@@ -1817,10 +1988,30 @@ class MyTonCore():
 
 	def GetValidatorConfig(self):
 		#self.local.add_log("start GetValidatorConfig function", "debug")
+		snapshot = self.get_validator_config_snapshot()
+		# Dict() builds new containers, callers can not change the cached config
+		return Dict(snapshot.data)
+	#end define
+
+	def get_validator_config_snapshot(self):
+		bname = "validatorConfig"
+		return self.buffered_call(bname, self.fetch_validator_config, timeout=5)
+	#end define
+
+	def fetch_validator_config(self):
 		result = self.validatorConsole.Run("getconfig")
 		text = parse(result, "---------", "--------")
-		vconfig = json.loads(text)
-		return Dict(vconfig)
+
+		# Reuse the previous snapshot and its indexes if the config did not change
+		snapshot = self.local.buffer.get("validator_config_snapshot")
+		if snapshot is None or snapshot.text != text:
+			snapshot = ValidatorConfig(text)
+			self.local.buffer.validator_config_snapshot = snapshot
+		return snapshot
+	#end define
+
+	def invalidate_validator_config(self):
+		self.function_cache.invalidate("validatorConfig")
 	#end define
 
 	def GetOverlaysStats(self):
@@ -1957,22 +2148,17 @@ class MyTonCore():
 	#end define
 
 	def GetValidatorKey(self):
-		vconfig = self.GetValidatorConfig()
-		validators = sorted(vconfig["validators"], key=lambda i: i['election_date'], reverse=True)
-		for validator in validators:
-			validatorId = validator["id"]
-			key_bytes = base64.b64decode(validatorId)
-			validatorKey = key_bytes.hex().upper()
-			timestamp = get_timestamp()
-			if validator["election_date"] < timestamp < validator["expire_at"]:
-				return validatorKey
+		vconfig = self.get_validator_config_snapshot()
+		validatorKey = vconfig.get_active_validator_key(get_timestamp())
+		if validatorKey is not None:
+			return validatorKey
 		raise Exception("GetValidatorKey error: validator key not found. Are you sure you are a validator?")
 	#end define
 
 	def GetElectionEntries(self, past: bool = False):
 		# Get buffer
 		bname = "electionEntries" + str(past)
-		buff = self.GetFunctionBuffer(bname)
+		buff = self.GetFunctionBuffer(bname, scope="master")
 		if buff:
 			return buff
 		#end if
@@ -2026,7 +2212,7 @@ class MyTonCore():
 		#end for
 
 		# Set buffer
-		self.SetFunctionBuffer(bname, entries)
+		self.SetFunctionBuffer(bname, entries, scope="master")
 
 		# Save elections
 		electionId = str(electionId)
@@ -2036,16 +2222,8 @@ class MyTonCore():
 	#end define
 
 	def GetSaveElections(self):
-		timestamp = get_timestamp()
-		saveElections = self.local.db.get("saveElections")
-		if saveElections is None:
-			saveElections = dict()
-			self.local.db["saveElections"] = saveElections
-		buff = saveElections.copy()
-		for key, item in buff.items():
-			diffTime = timestamp - int(key)
-			if diffTime > 604800:
-				saveElections.pop(key)
+		saveElections = self.get_round_archive("saveElections")
+		saveElections.purge()
 		return saveElections
 	#end define
 
@@ -2114,7 +2292,7 @@ class MyTonCore():
 	def GetComplaints(self, electionId=None, past=False):
 		# Get buffer
 		bname = "complaints" + str(past)
-		buff = self.GetFunctionBuffer(bname)
+		buff = self.GetFunctionBuffer(bname, scope="master")
 		if buff:
 			return buff
 		#end if
@@ -2195,7 +2373,7 @@ class MyTonCore():
 		complaints = dict(sorted(complaints.items(), key=lambda item: (item[1]["createdTime"], item[0])))
 
 		# Set buffer
-		self.SetFunctionBuffer(bname, complaints)
+		self.SetFunctionBuffer(bname, complaints, scope="master")
 
 		# Save complaints
 		if len(complaints) > 0:
@@ -2206,29 +2384,14 @@ class MyTonCore():
 	#end define
 
 	def GetSaveComplaints(self):
-		timestamp = get_timestamp()
-		saveComplaints = self.local.db.get("saveComplaints")
-		if saveComplaints is None:
-			saveComplaints = dict()
-			self.local.db["saveComplaints"] = saveComplaints
-		buff = saveComplaints.copy()
-		for key, item in buff.items():
-			diffTime = timestamp - int(key)
-			if diffTime > 604800:
-				saveComplaints.pop(key)
+		saveComplaints = self.get_round_archive("saveComplaints")
+		saveComplaints.purge()
 		return saveComplaints
 	#end define
 
 	def GetSaveVl(self):
-		timestamp = get_timestamp()
-		save_vl = self.local.db.get("saveValidatorsLoad")
-		if save_vl is None:
-			save_vl = dict()
-			self.local.db["saveValidatorsLoad"] = save_vl
-		for key, item in list(save_vl.items()):
-			diff_time = timestamp - int(key)
-			if diff_time > 172800:  # 48 hours
-				save_vl.pop(key)
+		save_vl = self.get_round_archive("saveValidatorsLoad")
+		save_vl.purge()
 		return save_vl
 	#end define
 
@@ -2353,6 +2516,11 @@ class MyTonCore():
 		validators_load = self.GetValidatorsLoad(start, end - 60, saveCompFiles=True)
 		voted_complaints = self.GetVotedComplaints(complaints)
 		voted_complaints_pseudohashes = [complaint['pseudohash'] for complaint in voted_complaints.values()]
+		# validators with a saved complaint file by pseudohash
+		saved_complaints = dict()
+		for vid in validators_load.complaints:
+			pubkey = validators_load.pubkeys[validators_load.positions[vid]]
+			saved_complaints[pubkey + str(election_id)] = vid
 		result = {}
 		for complaint in complaints.values():
 			if complaint['pseudohash'] in voted_complaints_pseudohashes or complaint['pseudohash'] in result:
@@ -2368,25 +2536,12 @@ class MyTonCore():
 								   f"start work time ({config32.get('startWorkTime')})", "info")
 				continue
 
-			exists = False
-			vload = None
-			for item in validators_load.values():
-				if 'fileName' not in item:
-					continue
-				pubkey = item.get("pubkey")
-				if pubkey is None:
-					continue
-				pseudohash = pubkey + str(election_id)
-				if pseudohash == complaint['pseudohash']:
-					exists = True
-					vload = item
-					break
-
-			if not exists:
+			vid = saved_complaints.get(complaint['pseudohash'])
+			if vid is None:
 				self.local.add_log(f"complaint {complaint['hash_hex']} declined: complaint info was not found, probably it's wrong", "info")
 				continue
 
-			if vload["id"] >= config32['mainValidators']:
+			if vid >= config32['mainValidators']:
 				self.local.add_log(f"complaint {complaint['hash_hex']} declined: complaint created for non masterchain validator", "info")
 				continue
 
@@ -2413,13 +2568,12 @@ class MyTonCore():
 		return onlineValidators
 	#end define
 
-	def GetValidatorsLoad(self, start, end, saveCompFiles=False) -> dict:
-		# Get buffer
+	def GetValidatorsLoad(self, start, end, saveCompFiles=False) -> ValidatorsLoad:
 		bname = f"validatorsLoad{start}{end}{saveCompFiles}"
-		buff = self.GetFunctionBuffer(bname, timeout=60)
-		if buff:
-			return buff
-		#end if
+		return self.buffered_call(bname, lambda: self.fetch_validators_load(start, end, saveCompFiles), timeout=60)
+	#end define
+
+	def fetch_validators_load(self, start, end, saveCompFiles=False):
 		text = "start GetValidatorsLoad function ({}, {})".format(start, end)
 		self.local.add_log(text, "debug")
 		if saveCompFiles is True:
@@ -2428,84 +2582,15 @@ class MyTonCore():
 			filePrefix = ""
 		cmd = f"checkloadall {start} {end} {filePrefix}"
 		result = self.liteClient.Run(cmd, timeout=30)
-		lines = result.split('\n')
-		data = dict()
-		for line in lines:
-			if "val" in line and "pubkey" in line:
-				buff = line.split(' ')
-				vid = buff[1]
-				vid = vid.replace('#', '')
-				vid = vid.replace(':', '')
-				vid = int(vid)
-				pubkey = buff[3]
-				pubkey = pubkey.replace(',', '')
-				blocksCreated_buff = buff[6]
-				blocksCreated_buff = blocksCreated_buff.replace('(', '')
-				blocksCreated_buff = blocksCreated_buff.replace(')', '')
-				blocksCreated_buff = blocksCreated_buff.split(',')
-				masterBlocksCreated = float(blocksCreated_buff[0])
-				workBlocksCreated = float(blocksCreated_buff[1])
-				blocksExpected_buff = buff[8]
-				blocksExpected_buff = blocksExpected_buff.replace('(', '')
-				blocksExpected_buff = blocksExpected_buff.replace(')', '')
-				blocksExpected_buff = blocksExpected_buff.split(',')
-				masterBlocksExpected = float(blocksExpected_buff[0])
-				workBlocksExpected = float(blocksExpected_buff[1])
-				if masterBlocksExpected == 0:
-					mr = 0
-				else:
-					mr = masterBlocksCreated / masterBlocksExpected
-				if workBlocksExpected == 0:
-					wr = 0
-				else:
-					wr = workBlocksCreated / workBlocksExpected
-				if masterBlocksExpected > 0:  # show only masterchain efficiency for masterchain validator
-					r = mr
-				else:
-					r = (mr + wr) / 2
-				efficiency = round(r * 100, 2)
-				if efficiency > 10:
-					online = True
-				else:
-					online = False
-				item = dict()
-				item["id"] = vid
-				item["pubkey"] = pubkey
-				item["masterBlocksCreated"] = masterBlocksCreated
-				item["workBlocksCreated"] = workBlocksCreated
-				item["masterBlocksExpected"] = masterBlocksExpected
-				item["workBlocksExpected"] = workBlocksExpected
-				item["mr"] = mr
-				item["wr"] = wr
-				item["efficiency"] = efficiency
-				item["online"] = online
-
-				# Get complaint file
-				index = lines.index(line)
-				nextIndex = index + 2
-				if nextIndex < len(lines):
-					nextLine = lines[nextIndex]
-					if "COMPLAINT_SAVED" in nextLine:
-						buff = nextLine.split('\t')
-						item["var1"] = buff[1]
-						item["var2"] = buff[2]
-						item["fileName"] = buff[3]
-				data[vid] = item
-		#end for
-
-		# Set buffer
-		self.SetFunctionBuffer(bname, data)
-		return data
+		return ValidatorsLoad(result)
 	#end define
 
 	def GetValidatorsList(self, past=False, fast=False, start=None, end=None):
-		# Get buffer
 		bname = "validatorsList" + str(past) + str(start) + str(end)
-		buff = self.GetFunctionBuffer(bname, timeout=60)
-		if buff:
-			return buff
-		#end if
+		return self.buffered_call(bname, lambda: self.fetch_validators_list(past, fast, start, end), timeout=60)
+	#end define
 
+	def fetch_validators_list(self, past=False, fast=False, start=None, end=None):
 		config = self.GetConfig34()
 		if end is None:
 			timestamp = get_timestamp()
@@ -2525,22 +2610,27 @@ class MyTonCore():
 				return save_vl[start_str]
 		#end if
 
-		validatorsLoad = self.GetValidatorsLoad(start, end)
 		validators = config["validators"]
 		electionId = config.get("startWorkTime")
+		validatorsLoad = None
+		if not past:
+			validatorsLoad = self.efficiency_tracker.get_load(electionId, start, end)
+		if validatorsLoad is None:
+			validatorsLoad = self.GetValidatorsLoad(start, end)
 		saveElectionEntries = self.GetSaveElectionEntries(electionId)
 		for vid in range(len(validators)):
 			validator = validators[vid]
 			adnlAddr = validator["adnlAddr"]
 			if len(validatorsLoad) > 0:
-				validator["mr"] = validatorsLoad[vid]["mr"]
-				validator["wr"] = validatorsLoad[vid]["wr"]
-				validator["efficiency"] = validatorsLoad[vid]["efficiency"]
-				validator["online"] = validatorsLoad[vid]["online"]
-				validator["master_blocks_created"] = validatorsLoad[vid]["masterBlocksCreated"]
-				validator["master_blocks_expected"] = validatorsLoad[vid]["masterBlocksExpected"]
-				validator["blocks_created"] = validatorsLoad[vid]["masterBlocksCreated"] + validatorsLoad[vid]["workBlocksCreated"]
-				validator["blocks_expected"] = validatorsLoad[vid]["masterBlocksExpected"] + validatorsLoad[vid]["workBlocksExpected"]
+				i = validatorsLoad.positions[vid]
+				validator["mr"] = validatorsLoad.mr[i]
+				validator["wr"] = validatorsLoad.wr[i]
+				validator["efficiency"] = validatorsLoad.efficiency[i]
+				validator["online"] = validatorsLoad.is_online(i)
+				validator["master_blocks_created"] = validatorsLoad.master_created[i]
+				validator["master_blocks_expected"] = validatorsLoad.master_expected[i]
+				validator["blocks_created"] = validatorsLoad.master_created[i] + validatorsLoad.work_created[i]
+				validator["blocks_expected"] = validatorsLoad.master_expected[i] + validatorsLoad.work_expected[i]
 				validator["is_masterchain"] = False
 				if vid < config["mainValidators"]:
 					validator["is_masterchain"] = True
@@ -2552,14 +2642,29 @@ class MyTonCore():
 				validator["stake"] = int(validator["stake"]) if validator["stake"] else None
 		#end for
 
-		# Set buffer
-		self.SetFunctionBuffer(bname, validators)
 		if past:
 			save_vl = self.GetSaveVl()
 			save_vl[str(start)] = validators
 		return validators
 	#end define
 
+	def update_efficiency_tracker(self):
+		config = self.GetConfig34()
+		electionId = config.get("startWorkTime")
+		start = self.efficiency_tracker.get_last_time(electionId)
+		if start is None:
+			start = electionId
+		start = int(start)
+		end = get_timestamp() - 60
+		if end - start < 60:
+			return
+		validatorsLoad = self.fetch_validators_load(start, end)
+		if len(validatorsLoad) == 0:
+			self.local.add_log("update_efficiency_tracker warning: checkloadall returned no data", "warning")
+			return
+		self.efficiency_tracker.add(electionId, len(config["validators"]), start, end, validatorsLoad)
+	#end define
+
 	def CheckValidators(self, start, end):
 		self.local.add_log("start CheckValidators function", "debug")
 		electionId = start
@@ -2681,12 +2786,11 @@ class MyTonCore():
 			import socket
 			return socket.inet_ntoa(struct.pack("!i", dec))
 
-		vconfig = self.GetValidatorConfig()
+		vconfig = self.get_validator_config_snapshot()
 
-		data = {"host": int2ip(vconfig["addrs"][0]["ip"]), "port": vconfig["addrs"][0]["port"]}
+		data = {"host": int2ip(vconfig.data["addrs"][0]["ip"]), "port": vconfig.data["addrs"][0]["port"]}
 
-		dht_id = vconfig["dht"][0]["id"]
-		dht_id_hex = base64.b64decode(dht_id).hex().upper()
+		dht_id_hex = vconfig.dht_ids[0]
 
 		result = self.validatorConsole.Run(f"exportpub {dht_id_hex}")
 		pubkey = parse(result, "got public key: ", "\n")
@@ -2698,71 +2802,12 @@ class MyTonCore():
 		buff = parse(text, "result:", "\n")
 		if buff is None or "error" in buff:
 			return
-		buff = buff.replace(')', ']')
-		buff = buff.replace('(', '[')
-		buff = buff.replace(']', ' ] ')
-		buff = buff.replace('[', ' [ ')
-		buff = buff.replace('bits:', '')
-		buff = buff.replace('refs:', '')
-		buff = buff.replace('.', '')
-		buff = buff.replace(';', '')
-		arr = buff.split()
-
-		# Get good raw data
-		output = ""
-		arrLen = len(arr)
-		for i in range(arrLen):
-			item = arr[i]
-			if '{' in item or '}' in item:
-				item = f"\"{item}\""
-			# get next item
-			if i+1 < arrLen:
-				nextItem = arr[i+1]
-			else:
-				nextItem = None
-			# add item to output
-			if item == '[':
-				output += item
-			elif nextItem == ']':
-				output += item
-			elif i+1 == arrLen:
-				output += item
-			else:
-				output += item + ', '
-		#end for
-
-		data = json.loads(output)
+		data = parse_tvm_stack(buff)
 		return data
 	#end define
 
 	def Result2Dict(self, result):
-		rawAny = False
-		data = dict()
-		tabSpaces = 2
-		parenElementsList = list()
-		lines = result.split('\n')
-		for line in lines:
-			firstSpacesCount = self.GetFirstSpacesCount(line)
-			deep = firstSpacesCount // tabSpaces
-			line = line.lstrip()
-			if "raw@Any" in line:
-				rawAny = True
-			if rawAny and ')' in line:
-				rawAny = False
-			if line[:2] == "x{" and not rawAny:
-				continue
-			if deep == 0:
-				data[line] = dict()
-				parenElementsList = [line]
-			else:
-				buff = data
-				parenElementsList = parenElementsList[:deep]
-				for item in parenElementsList:
-					buff = buff[item]
-				buff[line] = dict()
-				parenElementsList.append(line)
-			#end if
-		#end for
+		data = parse_dump(result)
 		return data
 	#end define
 
@@ -2811,6 +2856,8 @@ class MyTonCore():
 	def GetKeyFromDict(self, data, search):
 		if data is None:
 			return None
+		if isinstance(data, DumpNode):
+			return data.find(search)
 		for key, item in data.items():
 			if search in key:
 				return key
@@ -2822,6 +2869,9 @@ class MyTonCore():
 	def GetItemFromDict(self, data, search):
 		if data is None:
 			return None
+		if isinstance(data, DumpNode):
+			key = data.find(search)
+			return data[key] if key is not None else None
 		for key, item in data.items():
 			if search in key:
 				return item
@@ -2831,10 +2881,9 @@ class MyTonCore():
 	#end define
 
 	def AddBookmark(self, bookmark):
-		if "bookmarks" not in self.local.db:
-			self.local.db["bookmarks"] = list()
-		#end if
-		self.local.db["bookmarks"].append(bookmark)
+		bookmarks = self.local.db.get("bookmarks", list())
+		bookmarks.append(bookmark)
+		self.local.db["bookmarks"] = bookmarks
 		self.local.save()
 	#end define
 
@@ -2852,6 +2901,7 @@ class MyTonCore():
 			bookmark_name = bookmark.get("name")
 			if name == bookmark_name:
 				bookmarks.remove(bookmark)
+				self.local.db["bookmarks"] = bookmarks
 				self.local.save()
 				return
 		raise Exception("DeleteBookmark error: Bookmark not found")
@@ -2884,12 +2934,7 @@ class MyTonCore():
 		return save_offers
 
 	def GetSaveOffers(self):
-		bname = "saveOffers"
-		save_offers = self.local.db.get(bname)
-		if save_offers is None or isinstance(save_offers, list):
-			save_offers = dict()
-			self.local.db[bname] = save_offers
-		return save_offers
+		return self.get_state("saveOffers")
 	#end define
 
 	def add_save_offer(self, offer):
@@ -2898,7 +2943,6 @@ class MyTonCore():
 		save_offers = self.GetSaveOffers()
 		if offer_hash not in save_offers:
 			save_offers[offer_hash] = [offer_pseudohash, offer.get('config', {}).get("id")]
-			self.local.save()
 	#end define
 
 	def GetVotedComplaints(self, complaints: dict):
@@ -3030,28 +3074,19 @@ class MyTonCore():
 	#en define
 
 	def GetNetLoadAvg(self, statistics=None):
-		if statistics is None:
-			statistics = self.local.db.get("statistics")
-		if statistics:
-			netLoadAvg = statistics.get("netLoadAvg")
-		else:
-			netLoadAvg = [-1, -1, -1]
-		return netLoadAvg
+		return self.GetStatistics("netLoadAvg", statistics)
 	#end define
 
 	def GetTpsAvg(self, statistics=None):
-		if statistics is None:
-			statistics = self.local.db.get("statistics")
-		if statistics:
-			tpsAvg = statistics.get("tpsAvg")
-		else:
-			tpsAvg = [-1, -1, -1]
-		return tpsAvg
+		return self.GetStatistics("tpsAvg", statistics)
 	#end define
 
 	def GetStatistics(self, name, statistics=None):
+		data = self.get_stored_statistics(name)
+		if data is not None:
+			return data
 		if statistics is None:
-			statistics = self.local.db.get("statistics")
+			statistics = self.get_state("statistics")
 		if statistics:
 			data = statistics.get(name)
 		else:
@@ -3059,41 +3094,99 @@ class MyTonCore():
 		return data
 	#end define
 
+	def get_stored_statistics(self, name):
+		"""
+		1, 5 and 15 minute averages of netLoadAvg, ppsAvg, disksLoadAvg,
+		disksLoadPercentAvg, iopsAvg and tpsAvg from the statistics store,
+		None if the store has no fresh data
+		"""
+		if name in ("netLoadAvg", "ppsAvg"):
+			windows = self.get_statistics_windows(["net." + key for key in NETWORK_COUNTERS])
+			if windows[0] is None:
+				return None
+			column = ["netLoadAvg", "ppsAvg"].index(name)
+			return [CalculateNetworkStatistics(diff)[column] for diff in windows]
+		if name in ("disksLoadAvg", "disksLoadPercentAvg", "iopsAvg"):
+			column = ["disksLoadAvg", "disksLoadPercentAvg", "iopsAvg"].index(name)
+			result = dict()
+			for disk in self.get_statistics_disks():
+				windows = self.get_statistics_windows([f"disk.{disk}.{key}" for key in DISK_COUNTERS])
+				if windows[0] is not None:
+					result[disk] = [CalculateDiskStatistics(diff, 0)[column] for diff in windows]
+			return result or None
+		if name == "tpsAvg":
+			if not self.is_statistics_fresh("scanner.transactions"):
+				return None
+			rates = [self.get_statistics_rate("scanner.transactions", window) for window in STATISTICS_WINDOWS]
+			return [round(rate, 2) if rate is not None else None for rate in rates]
+		return None
+	#end define
+
+	def get_statistics_windows(self, names):
+		"""
+		(time diff, counter diffs) of the counters for each of STATISTICS_WINDOWS,
+		a shorter window is used while the history is shorter
+		"""
+		result = list()
+		for window in STATISTICS_WINDOWS:
+			diffs = None
+			if self.is_statistics_fresh(names[0]):
+				diffs = self.get_statistics_diffs(names, window)
+			if diffs is None:
+				result.append(result[-1] if result else None)
+				continue
+			result.append((diffs[0][1], [diff[0] for diff in diffs]))
+		return result
+	#end define
+
+	def get_statistics_disks(self):
+		# disks which were busy, as the daemon skips idle ones
+		result = list()
+		for name in self.statistics_store.get_names():
+			if not name.startswith("disk.") or not name.endswith(".busyTime"):
+				continue
+			last = self.statistics_store.get_last(name)
+			if last is not None and last[1] != 0:
+				result.append(name[len("disk."):-len(".busyTime")])
+		return result
+	#end define
+
+	def is_statistics_fresh(self, name):
+		last = self.statistics_store.get_last(name)
+		return last is not None and time.time() - last[0] < STATISTICS_MAX_AGE
+	#end define
+
 	def get_node_statistics(self):
 		"""
 		:return: stats for collated/validated blocks since round beggining and stats for ls queries for the last minute
 		"""
-		stats = self.local.db.get('statistics', {}).get('node')
+		stats = self.get_state("statistics").get('node')
 		result = {}
-		if stats is not None and len(stats) == 3 and stats[0] is not None:
-			result = {
-				'collated': {
-					'ok': 0,
-					'error': 0,
-				},
-				'validated': {
-					'ok': 0,
-					'error': 0,
-				}
+		blocks = self.get_round_blocks_statistics()
+		if blocks is None and stats is not None and len(stats) == 3 and stats[0] is not None:
+			blocks = dict()
+			for name in ['collated', 'validated']:
+				for k in ['master', 'shard']:
+					for key in ['ok', 'error']:
+						blocks[(name, k, key)] = stats[2][name + '_blocks'][k][key] - stats[0][name + '_blocks'][k][key]
+		if blocks is not None:
+			for name in ['collated', 'validated']:
+				result[name] = {'ok': 0, 'error': 0}
+				for k in ['master', 'shard']:
+					result[name][k] = {
+						'ok': blocks[(name, k, 'ok')],
+						'error': blocks[(name, k, 'error')],
+					}
+					result[name]['ok'] += blocks[(name, k, 'ok')]
+					result[name]['error'] += blocks[(name, k, 'error')]
+		ls_queries = self.get_statistics_diffs(["node.ls_queries.ok", "node.ls_queries.error"], 60)
+		if ls_queries is not None:
+			result['ls_queries'] = {
+				'ok': int(ls_queries[0][0]),
+				'error': int(ls_queries[1][0]),
+				'time': ls_queries[0][1],
 			}
-			for k in ['master', 'shard']:
-				collated_ok = stats[2]['collated_blocks'][k]['ok'] - stats[0]['collated_blocks'][k]['ok']
-				collated_error = stats[2]['collated_blocks'][k]['error'] - stats[0]['collated_blocks'][k]['error']
-				validated_ok = stats[2]['validated_blocks'][k]['ok'] - stats[0]['validated_blocks'][k]['ok']
-				validated_error = stats[2]['validated_blocks'][k]['error'] - stats[0]['validated_blocks'][k]['error']
-				result['collated'][k] = {
-					'ok': collated_ok,
-					'error': collated_error,
-				}
-				result['validated'][k] = {
-					'ok': validated_ok,
-					'error': validated_error,
-				}
-				result['collated']['ok'] += collated_ok
-				result['collated']['error'] += collated_error
-				result['validated']['ok'] += validated_ok
-				result['validated']['error'] += validated_error
-		if stats is not None and len(stats) >= 2 and stats[-2] is not None and stats[-1] is not None:
+		elif stats is not None and len(stats) >= 2 and stats[-2] is not None and stats[-1] is not None:
 			result['ls_queries'] = {
 				'ok': stats[-1]['ls_queries']['ok'] - stats[-2]['ls_queries']['ok'],
 				'error': stats[-1]['ls_queries']['error'] - stats[-2]['ls_queries']['error'],
@@ -3101,6 +3194,38 @@ class MyTonCore():
 			}
 		return result
 
+	def get_round_blocks_statistics(self):
+		"""{(collated|validated, master|shard, ok|error): blocks} since the round start from the statistics store or None"""
+		keys = [(name, k, key) for name in ['collated', 'validated'] for k in ['master', 'shard'] for key in ['ok', 'error']]
+		names = ["node.{}_blocks.{}.{}".format(*item) for item in keys]
+		if not self.is_statistics_fresh(names[0]):
+			return None
+		start = self.GetConfig34()["startWorkTime"]
+		result = dict()
+		for item, name in zip(keys, names):
+			last = self.statistics_store.get_last(name)
+			first = self.statistics_store.get_value(name, start)
+			if last is None or first is None or last[1] < first[1]:
+				return None # the store is younger than the round or the node was restarted
+			result[item] = int(last[1] - first[1])
+		return result
+	#end define
+
+	def get_statistics_diffs(self, names, window):
+		"""(value diff, time diff) of each counter over the last `window` seconds or None if some is unknown"""
+		result = list()
+		for name in names:
+			diff = self.statistics_store.get_diff(name, window)
+			if diff is None:
+				return None
+			result.append(diff)
+		return result
+	#end define
+
+	def get_statistics_rate(self, name, window):
+		return self.statistics_store.get_rate(name, window)
+	#end define
+
 	def GetSettings(self, name):
 		# self.local.load_db()
 		result = self.local.db.get(name)
@@ -3167,6 +3292,7 @@ class MyTonCore():
 		MODES[name].check_enable(self)
 		current_modes = self.get_modes()
 		current_modes[name] = True
+		self.local.db['modes'] = current_modes
 		self.local.save()
 
 	def disable_mode(self, name):
@@ -3175,6 +3301,7 @@ class MyTonCore():
 			raise Exception(f'Unknown module name: {name}. Available modes: {", ".join(MODES)}')
 		MODES[name](self, self.local).check_disable()
 		current_modes[name] = False
+		self.local.db['modes'] = current_modes
 		self.local.save()
 
 	def get_mode_value(self, name):
@@ -3226,75 +3353,7 @@ class MyTonCore():
 		self.local.save()
 
 	def Tlb2Json(self, text: str):
-		# Заменить скобки
-		start = 0
-		end = len(text)
-		if '=' in text:
-			start = text.find('=')+1
-		if text[start:].startswith(' x{'):  # param has no tlb scheme, return cell value
-			end = text.rfind('}')+1
-			return {'_': text[start:end].strip()}
-		if "x{" in text:
-			end = text.find("x{")
-		text = text[start:end]
-		text = text.strip()
-		text = text.replace('(', '{')
-		text = text.replace(')', '}')
-
-		# Добавить кавычки к строкам (1 этап)
-		buff = text
-		buff = buff.replace('\r', ' ')
-		buff = buff.replace('\n', ' ')
-		buff = buff.replace('\t', ' ')
-		buff = buff.replace('{', ' ')
-		buff = buff.replace('}', ' ')
-		buff = buff.replace(':', ' ')
-
-		# Добавить кавычки к строкам (2 этап)
-		buff2 = ""
-		itemList = list()
-		for item in list(buff):
-			if item == ' ':
-				if len(buff2) > 0:
-					itemList.append(buff2)
-					buff2 = ""
-				itemList.append(item)
-			else:
-				buff2 += item
-		#end for
-
-		# Добавить кавычки к строкам (3 этап)
-		i = 0
-		for item in itemList:
-			l = len(item)
-			if item == ' ':
-				pass
-			elif item.isdigit() is False:
-				c = '"'
-				item2 = c + item + c
-				text = text[:i] + item2 + text[i+l:]
-				i += 2
-			#end if
-			i += l
-		#end for
-
-		# Обозначить тип объекта
-		text = text.replace('{"', '{"_":"')
-
-		# Расставить запятые
-		while True:
-			try:
-				data = json.loads(text)
-				break
-			except json.JSONDecodeError as err:
-				if "Expecting ',' delimiter" in err.msg:
-					text = text[:err.pos] + ',' + text[err.pos:]
-				elif "Expecting property name enclosed in double quotes" in err.msg:
-					text = text[:err.pos] + '"_":' + text[err.pos:]
-				else:
-					raise err
-		#end while
-
+		data = parse_tlb(text)
 		return data
 	#end define
 
@@ -3420,11 +3479,13 @@ class MyTonCore():
 		self.local.add_log("start PendWithdrawFromPool function", "debug")
 		pendingWithdraws = self.GetPendingWithdraws()
 		pendingWithdraws[poolAddr] = amount
+		self.local.db["pendingWithdraws"] = pendingWithdraws
 		self.local.save()
 	#end define
 
 	def HandlePendingWithdraw(self, pendingWithdraws, poolAddr):
 		amount = pendingWithdraws.pop(poolAddr)
+		self.local.db["pendingWithdraws"] = pendingWithdraws
 		self.WithdrawFromPoolProcess(poolAddr, amount)
 	#end define
 
@@ -3766,6 +3827,7 @@ class MyTonCore():
 		self.local.add_log("start PendWithdrawFromController function", "debug")
 		controllerPendingWithdraws = self.GetControllerPendingWithdraws()
 		controllerPendingWithdraws[controllerAddr] = amount
+		self.local.db["controllerPendingWithdraws"] = controllerPendingWithdraws
 		self.local.save()
 	#end define
 
@@ -3773,6 +3835,7 @@ class MyTonCore():
 		amount = controllerPendingWithdraws.get(controllerAddr)
 		self.WithdrawFromControllerProcess(controllerAddr, amount)
 		controllerPendingWithdraws.pop(controllerAddr)
+		self.local.db["controllerPendingWithdraws"] = controllerPendingWithdraws
 	#end define
 
 	def GetControllerPendingWithdraws(self):
@@ -3866,10 +3929,13 @@ class MyTonCore():
 	def set_custom_overlay(self, name: str, config: dict):
 		overlays = self.get_custom_overlays()
 		overlays[name] = config
+		self.local.db['custom_overlays'] = overlays
 		self.local.save()
 
 	def delete_custom_overlay(self, name: str):
-		del self.local.db['custom_overlays'][name]
+		overlays = self.get_custom_overlays()
+		del overlays[name]
+		self.local.db['custom_overlays'] = overlays
 		self.local.save()
 
 	def set_collator_config(self, location: str):
@@ -3905,24 +3971,45 @@ class MyTonCore():
 	def get_validator_engine_ip(self):
 		return self.validatorConsole.addr.split(':')[0]
 
-	def GetFunctionBuffer(self, name, timeout=10):
-		timestamp = get_timestamp()
-		buff = self.local.buffer.get(name)
-		if buff is None:
-			return
-		buffTime = buff.get("time")
-		diffTime = timestamp - buffTime
-		if diffTime > timeout:
-			return
-		data = buff.get("data")
-		return data
+	def GetFunctionBuffer(self, name, timeout=10, scope=None):
+		seqno = self.get_cache_seqno(scope)
+		return self.function_cache.get(name, timeout, seqno)
+	#end define
+
+	def SetFunctionBuffer(self, name, data, scope=None):
+		seqno = self.get_cache_seqno(scope)
+		self.function_cache.set(name, data, seqno)
+	#end define
+
+	def buffered_call(self, name, func, timeout=10, scope=None):
+		"""
+		Get data from the function buffer or fetch it with func.
+		Concurrent callers of the same name wait for one fetch instead of running their own
+		"""
+		seqno = self.get_cache_seqno(scope)
+		return self.function_cache.fetch(name, func, timeout, seqno)
+	#end define
+
+	def get_cache_seqno(self, scope):
+		"""
+		scope "key": data changes only in key blocks (config params),
+		scope "master": data changes with every masterchain block.
+		Returns None if the local node is not synced, then TTL is used
+		"""
+		if scope is None:
+			return None
+		status = self.GetValidatorStatus()
+		if not status.is_working or status.out_of_sync is None or status.out_of_sync >= 20:
+			return None
+		if scope == "key":
+			return status.keymasterchainblock
+		elif scope == "master":
+			return status.masterchainblock
+		raise Exception(f"get_cache_seqno error: unknown scope {scope}")
 	#end define
 
-	def SetFunctionBuffer(self, name, data):
-		buff = dict()
-		buff["time"] = get_timestamp()
-		buff["data"] = data
-		self.local.buffer[name] = buff
+	def get_function_cache_stats(self):
+		return self.function_cache.get_stats()
 	#end define
 
 	def IsTestnet(self):
@@ -0,0 +1,323 @@
+import re
+import bisect
+import json
+
+
+def parse_tvm_stack(text):
+	"""
+	Parse TVM stack dump printed by lite-client `runmethodfull`
+	(`[ 1 -2 [ C{...} ] () ]`) into nested lists.
+	Tuples and lists become lists, integers become int,
+	cells and slices (`C{...}`, `CS{...}`, `x{...}`) are kept as strings.
+	The text is split into tokens once and joined into a JSON document
+	by C-level string operations, the lists are built by the json decoder.
+	"""
+	if '(' in text or ')' in text:
+		text = text.replace('(', '[').replace(')', ']')
+	text = text.replace('[', ' [ ').replace(']', ' ] ')
+	# slice descriptions are printed as `bits: 0..267; refs: 0..0`
+	if 'bits:' in text or 'refs:' in text:
+		text = text.replace('bits:', '').replace('refs:', '')
+	if '.' in text or ';' in text:
+		text = text.replace('.', '').replace(';', '')
+	tokens = text.split()
+	if '{' in text or '}' in text:
+		tokens = ['"' + token + '"' if '{' in token or '}' in token else token for token in tokens]
+	output = ','.join(tokens).replace('[,', '[').replace(',]', ']')
+	return json.loads(output)
+#end define
+
+
+TLB_TOKEN = re.compile(r"\{[^ \r\n\t{}:]*|[}:]|[^ \r\n\t{}:]+")
+TLB_WORD = re.compile(r"[^ \r\n\t(){}:]+")
+
+
+class TlbParser:
+	"""
+	Recursive-descent parser of TL-B values printed by lite-client
+	(`(constructor field:value field:(constructor ...))`).
+	Records become dicts with the constructor name under "_" key,
+	values without a field name are also stored under "_",
+	digit-only values become int, other values are kept as strings.
+	"""
+
+	def __init__(self, text):
+		self.tokens = list()
+		for token in TLB_TOKEN.findall(text):
+			if token[0] == '{':
+				self.tokens.append(('{', None))
+				token = token[1:]
+				if not token:
+					continue
+				if not token.isdigit():
+					# name written right after the bracket is the constructor
+					self.tokens.append(('constructor', self.parse_str(token)))
+					continue
+			if token == '}' or token == ':':
+				self.tokens.append((token, None))
+			elif token.isdigit():
+				self.add_int_tokens(token)
+			else:
+				self.tokens.append(('value', self.parse_str(token)))
+		#end for
+		self.tokens.append(('end', None))
+		self.pos = 0
+	#end define
+
+	def add_int_tokens(self, token):
+		# leading zeros are separate values (`007` is read as 0, 0, 7)
+		while len(token) > 1 and token[0] == '0':
+			self.tokens.append(('value', 0))
+			token = token[1:]
+		self.tokens.append(('value', int(token)))
+	#end define
+
+	@staticmethod
+	def parse_str(token):
+		if '\\' in token or '"' in token:
+			return json.loads('"' + token + '"')
+		return token
+	#end define
+
+	def parse(self):
+		data = self.parse_value()
+		if self.tokens[self.pos][0] != 'end':
+			raise ValueError("Tlb parser error: extra data at token {pos}".format(pos=self.pos))
+		return data
+	#end define
+
+	def parse_value(self):
+		kind, value = self.tokens[self.pos]
+		self.pos += 1
+		if kind == '{':
+			return self.parse_record()
+		if kind == 'value':
+			return value
+		raise ValueError("Tlb parser error: expecting value at token {pos}".format(pos=self.pos-1))
+	#end define
+
+	def parse_record(self):
+		data = dict()
+		kind, value = self.tokens[self.pos]
+		if kind == 'constructor':
+			data['_'] = value
+			self.pos += 1
+		elif kind != '}':
+			self.parse_field(data)
+		while True:
+			kind = self.tokens[self.pos][0]
+			if kind == '}':
+				self.pos += 1
+				return data
+			if kind == 'end':
+				raise ValueError("Tlb parser error: unclosed bracket")
+			self.parse_field(data)
+	#end define
+
+	def parse_field(self, data):
+		kind, value = self.tokens[self.pos]
+		if kind == 'value' and isinstance(value, str):
+			if self.tokens[self.pos+1][0] != ':':
+				raise ValueError("Tlb parser error: expecting ':' at token {pos}".format(pos=self.pos+1))
+			self.pos += 2
+			data[value] = self.parse_value()
+		else:
+			data['_'] = self.parse_value()
+	#end define
+#end class
+
+
+def parse_tlb(text):
+	"""Parse `getconfig` param dump to dict, see TlbParser"""
+	start = 0
+	end = len(text)
+	if '=' in text:
+		start = text.find('=')+1
+	if text[start:].startswith(' x{'):  # param has no tlb scheme, return cell value
+		end = text.rfind('}')+1
+		return {'_': text[start:end].strip()}
+	if "x{" in text:
+		end = text.find("x{")
+	text = text[start:end]
+	text = text.strip()
+	if len(text) > 0 and TLB_WORD.fullmatch(text):
+		# plain value without record around it
+		return json.loads(text)
+	text = text.replace('(', '{')
+	text = text.replace(')', '}')
+	return TlbParser(text).parse()
+#end define
+
+
+class DumpNode(dict):
+	"""
+	Line of lite-client transaction/message dump (`lasttransdump`, `dumptrans`),
+	children are the following lines with deeper indent, keyed by line text.
+	Lookups of a child by a part of its line are indexed, so repeated
+	lookups of the same field do not scan the children again.
+	The tree must not be changed after parsing.
+	"""
+
+	index = None # search -> line, created on first lookup
+
+	def find(self, search):
+		"""Line of the first child which contains `search`"""
+		index = self.index
+		if index is None:
+			index = self.index = dict()
+		elif search in index:
+			return index[search]
+		for line in self:
+			if search in line:
+				break
+		else:
+			line = None
+		index[search] = line
+		return line
+	#end define
+#end class
+
+
+def parse_dump(text, tab_spaces=2):
+	"""Build DumpNode tree from indented dump text in one pass"""
+	root = DumpNode()
+	stack = [root] # path from the root to the last added node
+	raw_any = False
+	for line in text.split('\n'):
+		line_len = len(line)
+		line = line.lstrip(' ')
+		deep = (line_len - len(line)) // tab_spaces
+		line = line.lstrip()
+		if "raw@Any" in line:
+			raw_any = True
+		if raw_any and ')' in line:
+			raw_any = False
+		if line[:2] == "x{" and not raw_any:
+			continue
+		del stack[deep+1:]
+		node = DumpNode()
+		stack[-1][line] = node
+		stack.append(node)
+	#end for
+	return root
+#end define
+
+
+WORKER_OUTPUT_EVENT = re.compile(r"[()\n]")
+
+
+class WorkerOutput:
+	"""
+	Text printed by lite-client with parentheses and newlines indexed in one pass.
+	get() returns the same value as MyTonCore.GetVarFromWorkerOutput,
+	but does not scan the value char by char: the end of a value is defined
+	by the first bracket or newline after the field name.
+	"""
+
+	def __init__(self, text):
+		self.text = text
+		self.positions = list() # positions of '(', ')' and '\n'
+		self.pairs = dict() # position of '(' -> position of matching ')'
+		stack = list()
+		for match in WORKER_OUTPUT_EVENT.finditer(text):
+			pos = match.start()
+			self.positions.append(pos)
+			char = text[pos]
+			if char == '(':
+				stack.append(pos)
+			elif char == ')' and stack:
+				self.pairs[stack.pop()] = pos
+		#end for
+	#end define
+
+	def find(self, search, start=0, end=None):
+		"""Returns (start, end) of the field value inside text[start:end]"""
+		if end is None:
+			end = len(self.text)
+		if ':' not in search:
+			search += ':'
+		pos = self.text.find(search, start, end)
+		if pos < 0:
+			return None
+		value_start = pos + len(search)
+		index = bisect.bisect_left(self.positions, value_start)
+		if index == len(self.positions) or self.positions[index] >= end:
+			return value_start, end
+		pos = self.positions[index]
+		char = self.text[pos]
+		if char == '\n':
+			return value_start, pos
+		if char == ')':
+			# unbalanced bracket is not a part of the value
+			return value_start, pos
+		pair = self.pairs.get(pos)
+		if pair is None or pair >= end:
+			return value_start, end
+		return value_start, pair + 1
+	#end define
+
+	def get(self, span):
+		if span is None:
+			return None
+		return self.text[span[0]:span[1]]
+	#end define
+#end class
+
+
+def parse_account_state(text):
+	"""
+	Extract fields of `getaccount` output with one index of the text,
+	returns dict of raw field values or None if the account has no storage
+	"""
+	output = WorkerOutput(text)
+	storage = output.find("storage")
+	if storage is None:
+		return None
+	addr = output.find("addr")
+	balance = output.find("balance", *storage)
+	grams = balance and output.find("grams", *balance)
+	value = grams and output.find("value", *grams)
+	state = output.find("state", *storage)
+	code = state and output.find("code", *state)
+	data = state and output.find("data", *state)
+	result = dict()
+	result["storage"] = output.get(storage)
+	result["addr"] = output.get(addr)
+	result["value"] = output.get(value)
+	result["state"] = output.get(state)
+	result["code"] = output.get(code and output.find("value", *code))
+	result["data"] = output.get(data and output.find("value", *data))
+	result["lt"] = parse_after(text, "lt = ", ' ')
+	result["hash"] = parse_after(text, "hash = ", '\n')
+	return result
+#end define
+
+
+def parse_after(text, search, search2):
+	"""Same as mypylib parse(): text after `search` up to `search2`"""
+	pos = text.find(search)
+	if pos < 0:
+		return None
+	pos += len(search)
+	end = text.find(search2, pos)
+	if end < 0:
+		return text[pos:]
+	return text[pos:end]
+#end define
+
+
+CONFIG_PARAM_HEADER = re.compile(r"^ConfigParam\((\d+)\)", re.MULTILINE)
+
+
+def split_config_params(text):
+	"""
+	Split output of several lite-client `getconfig` commands into
+	{config id: text from its `ConfigParam(id) = ` header up to the next one}
+	"""
+	result = dict()
+	matches = list(CONFIG_PARAM_HEADER.finditer(text))
+	for index, match in enumerate(matches):
+		end = matches[index + 1].start() if index + 1 < len(matches) else len(text)
+		result[int(match.group(1))] = text[match.start():end]
+	return result
+#end define
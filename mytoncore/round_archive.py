@@ -0,0 +1,325 @@
+import os
+import mmap
+import json
+import base64
+import struct
+import time
+from abc import abstractmethod
+from collections.abc import MutableMapping
+
+from mytoncore.utils import ng2g
+from mytoncore.sharded_db import write_file
+from mypylib.mypylib import Dict, dec2hex
+
+
+ARCHIVE_HEADER = struct.Struct("<8sqI") # magic, election id, number of records
+
+
+def hex2bytes(value):
+	if value is None:
+		return bytes(32)
+	return bytes.fromhex(value)
+#end define
+
+
+def bytes2hex(value):
+	if value == bytes(32):
+		return None
+	return value.hex().upper()
+#end define
+
+
+def int2bytes(value):
+	return int(value).to_bytes(32, "big")
+#end define
+
+
+def addr2bytes(value):
+	"""Raw 36 bytes of a base64 address: flags, workchain, address and crc"""
+	if value is None:
+		return bytes(36)
+	return base64.urlsafe_b64decode(value)
+#end define
+
+
+def bytes2addr(value):
+	if value == bytes(36):
+		return None
+	return base64.urlsafe_b64encode(value).decode()
+#end define
+
+
+def g2ng(value):
+	return int(round(value * 10**9))
+#end define
+
+
+class RoundArchive(MutableMapping):
+	"""
+	Saved data of rounds, a file per election id <path>/<election id>.bin:
+	header, fixed size records and a JSON area for the fields of variable
+	length. Keys, public keys and addresses are stored as binary, amounts
+	as nanotons. A round is read (memory-mapped) only when it is requested,
+	rounds older than `max_age` are removed by purge().
+	As a mapping it returns rounds in the format of the JSON db.
+	"""
+
+	magic = None
+	record = None
+
+	def __init__(self, path, max_age):
+		self.path = path
+		self.max_age = max_age
+	#end define
+
+	def get_path(self, key):
+		return os.path.join(self.path, "{}.bin".format(int(key)))
+	#end define
+
+	def __getitem__(self, key):
+		try:
+			path = self.get_path(key)
+		except ValueError:
+			raise KeyError(key)
+		if not os.path.isfile(path):
+			raise KeyError(key)
+		try:
+			items = self.read(path)
+		except (ValueError, struct.error):
+			raise KeyError(key) # an empty or truncated file is a missing round
+		return self.build(items)
+	#end define
+
+	def read(self, path):
+		with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+			magic, election_id, count = ARCHIVE_HEADER.unpack_from(mm, 0)
+			if magic != self.magic:
+				raise Exception("RoundArchive error: {path} is not a {magic} file".format(path=path, magic=self.magic.decode()))
+			extra_offset = ARCHIVE_HEADER.size + count * self.record.size
+			items = list()
+			for i in range(count):
+				fields = self.record.unpack_from(mm, ARCHIVE_HEADER.size + i * self.record.size)
+				items.append(self.decode(election_id, fields, mm, extra_offset))
+		return items
+	#end define
+
+	def __setitem__(self, key, value):
+		election_id = int(key)
+		records = bytearray()
+		extra = bytearray()
+		items = self.split(value)
+		for item in items:
+			records += self.record.pack(*self.encode(item, extra))
+		os.makedirs(self.path, exist_ok=True)
+		header = ARCHIVE_HEADER.pack(self.magic, election_id, len(items))
+		write_file(self.get_path(election_id), header + records + extra)
+	#end define
+
+	def __delitem__(self, key):
+		if key not in self:
+			raise KeyError(key)
+		os.remove(self.get_path(key))
+	#end define
+
+	def __contains__(self, key):
+		try:
+			return os.path.isfile(self.get_path(key))
+		except ValueError:
+			return False
+	#end define
+
+	def __iter__(self):
+		if not os.path.isdir(self.path):
+			return iter(list())
+		keys = [file_name[:-4] for file_name in os.listdir(self.path) if file_name.endswith(".bin")]
+		return iter(sorted(keys, key=int))
+	#end define
+
+	def __len__(self):
+		return len(list(iter(self)))
+	#end define
+
+	def purge(self):
+		"""Remove rounds older than max_age"""
+		timestamp = int(time.time())
+		for key in list(self):
+			if timestamp - int(key) > self.max_age:
+				os.remove(self.get_path(key))
+	#end define
+
+	def add_extra(self, extra, data):
+		"""Append JSON of the fields of variable length, returns its offset and length"""
+		text = json.dumps(data).encode()
+		offset = len(extra)
+		extra += text
+		return offset, len(text)
+	#end define
+
+	def read_extra(self, mm, extra_offset, offset, length):
+		start = extra_offset + offset
+		return json.loads(mm[start:start + length])
+	#end define
+
+	def split(self, value):
+		return list(value.values())
+	#end define
+
+	@abstractmethod
+	def build(self, items):
+		"""Round in the format of the JSON db from the decoded items"""
+	#end define
+
+	@abstractmethod
+	def encode(self, item, extra):
+		"""Fields of the record of an item"""
+	#end define
+
+	@abstractmethod
+	def decode(self, election_id, fields, mm, extra_offset):
+		"""Item from the fields of its record"""
+	#end define
+#end class
+
+
+class ElectionsArchive(RoundArchive):
+	"""Election entries: {adnl: entry}"""
+
+	magic = b"MTCELEC1"
+	record = struct.Struct("<32s32s36sqd") # adnl, pubkey, wallet, stake, max factor
+
+	def build(self, items):
+		return {item["adnlAddr"]: item for item in items}
+	#end define
+
+	def encode(self, item, extra):
+		return hex2bytes(item["adnlAddr"]), hex2bytes(item["pubkey"]), addr2bytes(item["walletAddr"]), g2ng(item["stake"]), item["maxFactor"]
+	#end define
+
+	def decode(self, election_id, fields, mm, extra_offset):
+		adnl, pubkey, wallet, stake, max_factor = fields
+		item = Dict()
+		item["adnlAddr"] = bytes2hex(adnl)
+		item["pubkey"] = bytes2hex(pubkey)
+		item["stake"] = ng2g(stake)
+		item["maxFactor"] = max_factor
+		item["walletAddr_hex"] = wallet[2:34].hex().upper()
+		item["walletAddr"] = bytes2addr(wallet)
+		return item
+	#end define
+#end class
+
+
+class ValidatorsLoadArchive(RoundArchive):
+	"""Validators of a past round with their load: [validator]"""
+
+	magic = b"MTCVLOAD"
+	# adnl, pubkey, wallet, weight, stake, mr, wr, efficiency,
+	# master blocks created and expected, blocks created and expected, flags
+	record = struct.Struct("<32s32s36sqqdddddddB")
+	has_load = 1
+	online = 2
+	is_masterchain = 4
+	has_wallet = 8
+	has_stake = 16
+
+	def split(self, value):
+		return value
+	#end define
+
+	def build(self, items):
+		return items
+	#end define
+
+	def encode(self, item, extra):
+		flags = 0
+		load = [0.0] * 7
+		if "mr" in item:
+			flags |= self.has_load
+			flags |= self.online if item["online"] else 0
+			flags |= self.is_masterchain if item["is_masterchain"] else 0
+			load = [item["mr"], item["wr"], item["efficiency"], item["master_blocks_created"], item["master_blocks_expected"], item["blocks_created"], item["blocks_expected"]]
+		if "walletAddr" in item:
+			flags |= self.has_wallet
+		stake = item.get("stake")
+		if stake is not None:
+			flags |= self.has_stake
+		return [hex2bytes(item["adnlAddr"]), hex2bytes(item["pubkey"]), addr2bytes(item.get("walletAddr")), item["weight"], g2ng(stake or 0)] + load + [flags]
+	#end define
+
+	def decode(self, election_id, fields, mm, extra_offset):
+		adnl, pubkey, wallet, weight, stake = fields[:5]
+		flags = fields[-1]
+		item = Dict()
+		item["adnlAddr"] = bytes2hex(adnl)
+		item["pubkey"] = bytes2hex(pubkey)
+		item["weight"] = weight
+		if flags & self.has_load:
+			item["mr"], item["wr"], item["efficiency"] = fields[5:8]
+			item["online"] = bool(flags & self.online)
+			item["master_blocks_created"], item["master_blocks_expected"], item["blocks_created"], item["blocks_expected"] = fields[8:12]
+			item["is_masterchain"] = bool(flags & self.is_masterchain)
+		if flags & self.has_wallet:
+			item["walletAddr"] = bytes2addr(wallet)
+			item["stake"] = int(ng2g(stake)) if flags & self.has_stake else None
+		return item
+	#end define
+#end class
+
+
+class ComplaintsArchive(RoundArchive):
+	"""Complaints of a round: {hash: complaint}"""
+
+	magic = b"MTCCOMPL"
+	# hash, pubkey, adnl, reward address, vset id, created time, severity,
+	# paid, suggested fine, suggested fine part, approved percent, is passed,
+	# offset and length of JSON with description, voters and remaining weight
+	record = struct.Struct("<32s32s32s36s32sqqqqqd?II")
+
+	def build(self, items):
+		return {str(item["hash"]): item for item in items}
+	#end define
+
+	def encode(self, item, extra):
+		offset, length = self.add_extra(extra, {
+			"description": item["description"],
+			"votedValidators": item["votedValidators"],
+			"weightRemaining": item["weightRemaining"]
+		})
+		return (int2bytes(item["hash"]), hex2bytes(item["pubkey"]), hex2bytes(item["adnl"]), addr2bytes(item["rewardAddr"]),
+			int2bytes(item["vsetId"]), item["createdTime"], item["severity"], item["paid"], g2ng(item["suggestedFine"]),
+			round(item["suggestedFinePart"] * 256 / 100), item["approvedPercent"], item["isPassed"], offset, length)
+	#end define
+
+	def decode(self, election_id, fields, mm, extra_offset):
+		chash, pubkey, adnl, reward_addr, vset_id, created_time, severity, paid, suggested_fine, suggested_fine_part, approved_percent, is_passed, offset, length = fields
+		extra = self.read_extra(mm, extra_offset, offset, length)
+		item = Dict()
+		item["electionId"] = election_id
+		item["hash"] = int.from_bytes(chash, "big")
+		item["hash_hex"] = dec2hex(item["hash"])
+		item["pubkey"] = bytes2hex(pubkey)
+		item["adnl"] = bytes2hex(adnl)
+		item["description"] = extra["description"]
+		item["createdTime"] = created_time
+		item["severity"] = severity
+		item["rewardAddr"] = bytes2addr(reward_addr)
+		item["paid"] = paid
+		item["suggestedFine"] = ng2g(suggested_fine)
+		item["suggestedFinePart"] = suggested_fine_part /256 *100 # GetComplaints() gives percent of the integer field
+		item["votedValidators"] = extra["votedValidators"]
+		item["vsetId"] = int.from_bytes(vset_id, "big")
+		item["weightRemaining"] = extra["weightRemaining"]
+		item["approvedPercent"] = approved_percent
+		item["isPassed"] = is_passed
+		item["pseudohash"] = item["pubkey"] + str(election_id)
+		return item
+	#end define
+#end class
+
+
+# local.db section -> directory in <work dir>/rounds/ and archive class
+ROUND_ARCHIVES = {
+	"saveElections": ("elections", ElectionsArchive),
+	"saveComplaints": ("complaints", ComplaintsArchive),
+	"saveValidatorsLoad": ("validators_load", ValidatorsLoadArchive)
+}
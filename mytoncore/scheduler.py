@@ -0,0 +1,212 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+CRITICAL = 0
+NORMAL = 1
+BACKGROUND = 2
+
+HISTOGRAM_BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60, 300) # seconds
+
+
+class ScheduledTask:
+	"""
+	Periodic task: it is due every `period` seconds from its first run and
+	starts up to `jitter` seconds after that. A run which could not start
+	within `deadline` seconds of its due time is skipped, without deadline
+	it runs late. A `planner(now, period)` may choose the next due time
+	instead, the period is used when it returns None and bounds the retry
+	of a failed run. Run times are counted in a histogram.
+	"""
+
+	def __init__(self, name, func, args, period, priority, jitter, deadline, planner=None):
+		self.name = name
+		self.func = func
+		self.args = args
+		self.period = period
+		self.priority = priority
+		self.jitter = jitter
+		self.deadline = deadline
+		self.planner = planner
+		self.due = None
+		self.next_run = None
+		self.running = False
+		self.runs = 0
+		self.skipped = 0
+		self.errors = 0
+		self.total_time = 0
+		self.max_time = 0
+		self.buckets = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+	#end define
+
+	def set_due(self, due):
+		self.due = due
+		self.next_run = due + random.uniform(0, self.jitter)
+	#end define
+
+	def skip_missed(self, now, failed=False):
+		"""Move the due time past now, runs missed while the task was running are not repeated"""
+		if self.planner is not None:
+			due = self.planner(now, self.period)
+			if due is not None:
+				if failed:
+					due = min(due, now + self.period) # retry a failed run within the period
+				self.due = self.next_run = due # planned times are exact
+				return
+		due = self.due + self.period
+		if due < now:
+			due += (now - due) // self.period * self.period + self.period
+		self.set_due(due)
+	#end define
+
+	def add_time(self, duration):
+		self.runs += 1
+		self.total_time += duration
+		self.max_time = max(self.max_time, duration)
+		for i, bound in enumerate(HISTOGRAM_BUCKETS):
+			if duration <= bound:
+				self.buckets[i] += 1
+				break
+		else:
+			self.buckets[-1] += 1
+	#end define
+
+	def get_stats(self):
+		result = dict()
+		result["period"] = self.period
+		result["priority"] = self.priority
+		result["runs"] = self.runs
+		result["skipped"] = self.skipped
+		result["errors"] = self.errors
+		result["total_time"] = round(self.total_time, 3)
+		result["max_time"] = round(self.max_time, 3)
+		result["next_run"] = int(self.next_run)
+		result["buckets"] = list(self.buckets)
+		return result
+	#end define
+#end class
+
+
+class Scheduler:
+	"""
+	Runs periodic tasks of the mytoncore daemon on one pool of `max_workers`
+	threads. A task never overlaps with itself, due tasks start in order of
+	priority and due time. `reserved_workers` threads are kept for CRITICAL
+	tasks (elections, complaints, slashing), and BACKGROUND tasks (telemetry)
+	do not start while a CRITICAL one runs, so they give way to the critical
+	ones instead of competing for the lite-client. Jitter spreads tasks of
+	the same period so they do not wake together.
+	"""
+
+	def __init__(self, local, max_workers=6, reserved_workers=1):
+		self.local = local
+		if max_workers <= reserved_workers:
+			# without a shared worker only CRITICAL tasks would ever run
+			self.local.add_log("Scheduler: {max} workers are too few, using {min}".format(max=max_workers, min=reserved_workers + 1), "warning")
+			max_workers = reserved_workers + 1
+		self.max_workers = max_workers
+		self.reserved_workers = reserved_workers
+		self.tasks = list()
+		self.running = [0, 0, 0] # running tasks by priority
+		self.condition = threading.Condition()
+		self.executor = None
+		self.stopped = False
+	#end define
+
+	def add(self, func, period, args=(), name=None, priority=NORMAL, jitter=None, deadline=None, planner=None):
+		if name is None:
+			name = func.__name__
+		if jitter is None:
+			jitter = min(period * 0.1, 30)
+		task = ScheduledTask(name, func, args, period, priority, jitter, deadline, planner)
+		with self.condition:
+			task.set_due(time.time())
+			self.tasks.append(task)
+			self.condition.notify()
+		return task
+	#end define
+
+	def wake(self, task, at):
+		"""Run the task at `at` if it is planned later, a running task is planned again when it ends"""
+		with self.condition:
+			if task.running or at >= task.next_run:
+				return
+			task.due = task.next_run = at
+			self.condition.notify()
+	#end define
+
+	def run(self):
+		"""Start due tasks until stop() is called"""
+		self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="scheduler")
+		with self.condition:
+			while not self.stopped:
+				now = time.time()
+				task = self.get_next_task(now)
+				if task is None:
+					self.condition.wait(self.get_wait_time(now))
+					continue
+				if task.deadline is not None and now - task.due > task.deadline:
+					task.skipped += 1
+					self.local.add_log("Scheduler: skip {name}, it is {late} sec late".format(name=task.name, late=int(now - task.due)), "debug")
+					task.skip_missed(now)
+					continue
+				task.running = True
+				self.running[task.priority] += 1
+				self.executor.submit(self.run_task, task)
+		self.executor.shutdown(wait=False)
+	#end define
+
+	def get_next_task(self, now):
+		running = sum(self.running)
+		due_tasks = [task for task in self.tasks if not task.running and task.next_run <= now]
+		for task in sorted(due_tasks, key=lambda task: (task.priority, task.next_run)):
+			if task.priority == CRITICAL:
+				if running < self.max_workers:
+					return task
+				continue
+			if running >= self.max_workers - self.reserved_workers:
+				continue
+			if task.priority == BACKGROUND and self.running[CRITICAL] > 0:
+				continue
+			return task
+		return None
+	#end define
+
+	def get_wait_time(self, now):
+		times = [task.next_run for task in self.tasks if not task.running and task.next_run > now]
+		if not times:
+			return None # the next task is waiting for a worker
+		return min(times) - now
+	#end define
+
+	def run_task(self, task):
+		start = time.time()
+		failed = False
+		try:
+			task.func(*task.args)
+		except Exception as ex:
+			failed = True
+			task.errors += 1
+			self.local.add_log("{name} error: {ex}".format(name=task.name, ex=ex), "error")
+		end = time.time()
+		with self.condition:
+			task.add_time(end - start)
+			task.running = False
+			self.running[task.priority] -= 1
+			task.skip_missed(end, failed)
+			self.condition.notify()
+	#end define
+
+	def get_stats(self):
+		with self.condition:
+			return {task.name: task.get_stats() for task in self.tasks}
+	#end define
+
+	def stop(self):
+		with self.condition:
+			self.stopped = True
+			self.condition.notify()
+	#end define
+#end class
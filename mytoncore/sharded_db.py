@@ -0,0 +1,301 @@
+import atexit
+import json
+import os
+import re
+import signal
+import tempfile
+import threading
+import time
+
+from mypylib.mypylib import Dict
+
+
+def read_db_files(path):
+	"""Read the db file and its sections from <path>.d/, raises if any of them is broken"""
+	return read_layout(path)[0]
+#end define
+
+
+def read_layout(path):
+	"""Returns the data and texts of the sections kept in their own files"""
+	with open(path, 'r') as file:
+		data = json.load(file)
+	texts = dict()
+	shards_dir = path + ".d"
+	if not os.path.isdir(shards_dir):
+		return data, texts
+	for file_name in sorted(os.listdir(shards_dir)):
+		name, ext = os.path.splitext(file_name)
+		if ext != ".json" or name in data:
+			continue # a temporary file or a section written to the db file by an older version
+		with open(os.path.join(shards_dir, file_name), 'r') as file:
+			texts[name] = file.read()
+		data[name] = json.loads(texts[name])
+	return data, texts
+#end define
+
+
+def write_file(path, data):
+	"""
+	Replace the file atomically: a reader sees either the old data or the new one.
+	Every writer has its own temporary file, so concurrent writers do not mix
+	"""
+	if isinstance(data, str):
+		data = data.encode()
+	fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix=os.path.basename(path) + ".", suffix=".tmp")
+	try:
+		with os.fdopen(fd, 'wb') as file:
+			file.write(data)
+			file.flush()
+			os.fsync(file.fileno())
+		os.chmod(tmp_path, 0o644)
+		os.replace(tmp_path, path)
+	except Exception:
+		if os.path.exists(tmp_path):
+			os.remove(tmp_path)
+		raise
+	fsync_dir(os.path.dirname(path))
+#end define
+
+
+def remove_file(path):
+	if os.path.isfile(path):
+		os.remove(path)
+		fsync_dir(os.path.dirname(path))
+#end define
+
+
+def fsync_dir(path):
+	fd = os.open(path or '.', os.O_RDONLY)
+	try:
+		os.fsync(fd)
+	finally:
+		os.close(fd)
+#end define
+
+
+class TrackedDb(Dict):
+	"""
+	local.db which remembers the sections assigned or deleted since the last
+	write. A change inside a section is not seen, code which changes a section
+	in place assigns it back: local.db["bookmarks"] = bookmarks
+	"""
+
+	@classmethod
+	def track(cls, db):
+		"""Turn a mypylib Dict into TrackedDb in place, all its sections count as changed"""
+		# attributes go around Dict.__setattr__, which sets items
+		object.__setattr__(db, "changed_lock", threading.Lock())
+		object.__setattr__(db, "changed", set(db.keys()))
+		object.__setattr__(db, "__class__", cls)
+		return db
+	#end define
+
+	def __setitem__(self, key, value):
+		super().__setitem__(key, value)
+		self.mark_changed(key)
+	#end define
+
+	def __delitem__(self, key):
+		super().__delitem__(key)
+		self.mark_changed(key)
+	#end define
+
+	def pop(self, key, *args):
+		result = super().pop(key, *args)
+		self.mark_changed(key)
+		return result
+	#end define
+
+	def popitem(self):
+		key, value = super().popitem()
+		self.mark_changed(key)
+		return key, value
+	#end define
+
+	def setdefault(self, key, default=None):
+		if key not in self:
+			self[key] = default
+		return self[key]
+	#end define
+
+	def update(self, *args, **kwargs):
+		for key, value in dict(*args, **kwargs).items():
+			self[key] = value
+	#end define
+
+	def clear(self):
+		keys = list(self.keys())
+		super().clear()
+		with self.changed_lock:
+			self.changed.update(keys)
+	#end define
+
+	def mark_changed(self, key):
+		# marked after the change, so a write which took the mark sees the new value
+		with self.changed_lock:
+			self.changed.add(key)
+	#end define
+
+	def pop_changed(self):
+		with self.changed_lock:
+			changed = self.changed
+			object.__setattr__(self, "changed", set())
+		return changed
+	#end define
+#end class
+
+
+class ShardedDb:
+	"""
+	Incremental persistence of local.db. Sections larger than `shard_size`
+	bytes of JSON are kept in their own files <db_path>.d/<section>.json,
+	small ones stay in the db file which the installer and scripts read
+	directly. local.db is tracked (TrackedDb), a write serializes only the
+	sections changed since the previous one and rewrites only their files.
+	Writes within `window` seconds after the previous one are coalesced into
+	a single write. install() replaces read_db() and write_db() of the
+	MyPyClass, so merging of local.db with the file on local.save() works
+	as before.
+	"""
+
+	shard_size = 1024
+	window = 1.0 # seconds
+	name_pattern = re.compile(r"^[\w-]+$")
+
+	def __init__(self, local):
+		self.local = local
+		self.path = local.buffer.db_path
+		self.shards_dir = self.path + ".d"
+		self.lock = threading.RLock()
+		self.written = dict() # section name -> JSON text in the files
+		self.sharded = set() # sections in self.shards_dir
+		self.pending = None # texts of sections waiting for the write
+		self.last_write = 0
+		self.timer = None
+		self.previous_handler = None
+	#end define
+
+	def install(self):
+		if os.path.isfile(self.path):
+			data = self.read_db(self.path)
+			for name in self.sharded:
+				if name not in self.local.db:
+					self.local.db[name] = data[name]
+		self.track(self.local.db)
+		self.local.read_db = self.read_db
+		self.local.write_db = self.write_db
+		self.local.buffer.sharded_db = self
+
+		# a coalesced write must not be lost when the process stops
+		atexit.register(self.flush)
+		local_exit = self.local.exit
+		def exit(*args, **kwargs):
+			self.flush()
+			return local_exit(*args, **kwargs)
+		self.local.exit = exit
+		if threading.current_thread() is threading.main_thread():
+			self.previous_handler = signal.getsignal(signal.SIGTERM)
+			signal.signal(signal.SIGTERM, self.handle_signal)
+	#end define
+
+	def handle_signal(self, signum, frame):
+		self.flush()
+		previous = self.previous_handler
+		if callable(previous):
+			previous(signum, frame)
+			return
+		# restore the default action and stop as if the handler was not set
+		signal.signal(signum, previous if previous is not None else signal.SIG_DFL)
+		os.kill(os.getpid(), signum)
+	#end define
+
+	def read_db(self, path):
+		if path != self.path:
+			return read_db_files(path)
+		with self.lock:
+			if self.pending is not None:
+				# the files are behind, merge local.db with the data to be written
+				return {name: json.loads(text) for name, text in self.pending.items()}
+			data, texts = read_layout(path)
+			# sections of the db file are small, serializing them is cheap
+			self.written = {name: texts.get(name) or self.dumps(value) for name, value in data.items()}
+			self.sharded = set(texts)
+		return data
+	#end define
+
+	def write_db(self, data):
+		with self.lock:
+			texts = dict(self.pending if self.pending is not None else self.written)
+			for name in self.get_changed(data, texts):
+				if name in data:
+					texts[name] = self.dumps(data[name])
+				else:
+					texts.pop(name, None)
+			self.pending = texts
+			delay = self.last_write + self.window - time.time()
+			if delay > 0:
+				if self.timer is None:
+					self.timer = threading.Timer(delay, self.flush)
+					self.timer.start()
+				return
+			self.flush()
+	#end define
+
+	def flush(self):
+		with self.lock:
+			if self.timer is not None:
+				self.timer.cancel()
+				self.timer = None
+			texts = self.pending
+			if texts is None:
+				return
+			sharded = {name for name, text in texts.items() if self.is_shard(name, text)}
+			changed = {name for name, text in texts.items() if text != self.written.get(name)}
+			removed = {name for name in self.written if name not in texts}
+			if not os.path.isdir(self.shards_dir):
+				os.makedirs(self.shards_dir, exist_ok=True)
+			for name in sharded:
+				if name in changed or name not in self.sharded:
+					write_file(self.get_shard_path(name), texts[name])
+			if (changed | removed) - (sharded | self.sharded) or sharded != self.sharded:
+				main = {name: json.loads(text) for name, text in texts.items() if name not in sharded}
+				write_file(self.path, json.dumps(main, indent=4))
+			for name in self.sharded - sharded:
+				remove_file(self.get_shard_path(name))
+			self.written = texts
+			self.sharded = sharded
+			self.pending = None
+			self.last_write = time.time()
+	#end define
+
+	def get_changed(self, data, texts):
+		"""Names of the sections of `data` which may differ from `texts`"""
+		if data is self.local.db:
+			self.track(data) # mypylib replaces local.db on load
+		if isinstance(data, TrackedDb):
+			changed = data.pop_changed()
+		else:
+			changed = set(data.keys())
+		return changed | (set(data.keys()) ^ set(texts))
+	#end define
+
+	def track(self, db):
+		if type(db) is Dict:
+			TrackedDb.track(db)
+	#end define
+
+	def is_shard(self, name, text):
+		if name in self.sharded:
+			return True
+		return len(text) > self.shard_size and self.name_pattern.match(name) is not None
+	#end define
+
+	def get_shard_path(self, name):
+		return os.path.join(self.shards_dir, name + ".json")
+	#end define
+
+	def dumps(self, value):
+		return json.dumps(value, indent=4)
+	#end define
+#end class
@@ -0,0 +1,153 @@
+import json
+import os
+import sqlite3
+import threading
+from collections.abc import MutableMapping
+
+
+class StateStore:
+	"""
+	State of MyTonCore which changes often (SQLite in WAL mode): voted
+	offers, wallet versions, alerts and statistics. Every domain is a table
+	of (key, JSON value) rows, a write changes only its row instead of
+	serializing the whole local.db.
+	Tables are named after the local.db sections they replace, migrate()
+	moves these sections from local.db to the store once. Saved rounds
+	(elections, complaints, validators load) pass through their tables on
+	the way to RoundArchive.
+	"""
+
+	tables = {
+		"walletsVersionList": "wallet_versions",
+		"saveElections": "elections",
+		"saveComplaints": "complaints",
+		"saveValidatorsLoad": "validators_load",
+		"saveOffers": "offers",
+		"alerts": "alerts",
+		"statistics": "statistics"
+	}
+
+	def __init__(self, path):
+		self.path = path
+		self.lock = threading.Lock()
+		self.connection = None
+	#end define
+
+	def connect(self):
+		if self.connection is None:
+			os.makedirs(os.path.dirname(self.path), exist_ok=True)
+			self.connection = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+			self.connection.execute("PRAGMA journal_mode=WAL")
+			self.connection.execute("PRAGMA synchronous=NORMAL")
+			for table in self.tables.values():
+				self.connection.execute("CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value TEXT)".format(table=table))
+			self.connection.commit()
+		return self.connection
+	#end define
+
+	def get_table(self, name):
+		return StateTable(self, self.tables[name])
+	#end define
+
+	def execute(self, query, args=(), commit=False):
+		with self.lock:
+			connection = self.connect()
+			rows = connection.execute(query, args).fetchall()
+			if commit:
+				connection.commit()
+		return rows
+	#end define
+
+	def migrate(self, db):
+		"""Move the sections of local.db to their tables, returns True if something was moved"""
+		moved = False
+		for name, table in self.tables.items():
+			if name not in db:
+				continue
+			data = db.pop(name)
+			moved = True
+			if not isinstance(data, dict):
+				continue # old format of saveOffers
+			rows = [(str(key), json.dumps(value)) for key, value in data.items()]
+			with self.lock:
+				connection = self.connect()
+				# rows already in the store are newer than the ones of local.db
+				connection.executemany("INSERT OR IGNORE INTO {table} VALUES (?, ?)".format(table=table), rows)
+				connection.commit()
+		return moved
+	#end define
+
+	def close(self):
+		with self.lock:
+			if self.connection is not None:
+				self.connection.close()
+				self.connection = None
+	#end define
+#end class
+
+
+class StateTable(MutableMapping):
+	"""
+	Dict view of a StateStore table for the code which used the local.db
+	section. Values are decoded copies: a changed value must be assigned
+	back to be saved.
+	"""
+
+	def __init__(self, store, table):
+		self.store = store
+		self.table = table
+	#end define
+
+	def __getitem__(self, key):
+		rows = self.store.execute("SELECT value FROM {table} WHERE key = ?".format(table=self.table), (str(key),))
+		if not rows:
+			raise KeyError(key)
+		return json.loads(rows[0][0])
+	#end define
+
+	def __setitem__(self, key, value):
+		query = "INSERT INTO {table} VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value".format(table=self.table)
+		self.store.execute(query, (str(key), json.dumps(value)), commit=True)
+	#end define
+
+	def __delitem__(self, key):
+		if key not in self:
+			raise KeyError(key)
+		self.store.execute("DELETE FROM {table} WHERE key = ?".format(table=self.table), (str(key),), commit=True)
+	#end define
+
+	def __contains__(self, key):
+		rows = self.store.execute("SELECT 1 FROM {table} WHERE key = ?".format(table=self.table), (str(key),))
+		return len(rows) > 0
+	#end define
+
+	def __iter__(self):
+		rows = self.store.execute("SELECT key FROM {table}".format(table=self.table))
+		return iter([row[0] for row in rows])
+	#end define
+
+	def __len__(self):
+		return self.store.execute("SELECT COUNT(*) FROM {table}".format(table=self.table))[0][0]
+	#end define
+
+	def items(self):
+		rows = self.store.execute("SELECT key, value FROM {table}".format(table=self.table))
+		return [(key, json.loads(value)) for key, value in rows]
+	#end define
+
+	def values(self):
+		return [value for _, value in self.items()]
+	#end define
+
+	def clear(self):
+		self.store.execute("DELETE FROM {table}".format(table=self.table), commit=True)
+	#end define
+
+	def copy(self):
+		return dict(self.items())
+	#end define
+
+	def __repr__(self):
+		return repr(self.copy())
+	#end define
+#end class
@@ -3,8 +3,8 @@ import subprocess
 
 import psutil
 
-from mytoncore.utils import parse_db_stats
-from mypylib.mypylib import get_service_pid
+from mytoncore.utils import parse_db_stats, parse_diskstats, parse_net_dev
+from mypylib.mypylib import b2mb, get_service_pid
 
 
 def GetUname():
@@ -36,6 +36,63 @@ def GetSwapInfo():
 # end define
 
 
+def read_proc_file(path):
+    # the whole file in one read, counters of all devices are from the same moment
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return os.read(fd, 1 << 20).decode()
+    finally:
+        os.close(fd)
+# end define
+
+
+def read_disks_counters():
+    return parse_diskstats(read_proc_file("/proc/diskstats"))
+# end define
+
+
+def read_network_counters():
+    return parse_net_dev(read_proc_file("/proc/net/dev"))
+# end define
+
+
+DISK_COUNTERS = ["busyTime", "readBytes", "writeBytes", "readCount", "writeCount"]
+NETWORK_COUNTERS = ["bytesRecv", "bytesSent", "packetsSent", "packetsRecv"]
+
+
+def CalculateDiskStatistics(diff, offset):
+    if diff is None:
+        return None, None, None
+    timeDiff, values = diff
+    busyTimeDiff, diskReadDiff, diskWriteDiff, diskReadCountDiff, diskWriteCountDiff = values[offset:offset+len(DISK_COUNTERS)]
+    diskLoadPercent = busyTimeDiff / 1000 / timeDiff * \
+        100  # /1000 - to second, *100 - to percent
+    diskLoadPercent = round(diskLoadPercent, 2)
+    diskRead = diskReadDiff / timeDiff
+    diskWrite = diskWriteDiff / timeDiff
+    diskReadCount = diskReadCountDiff / timeDiff
+    diskWriteCount = diskWriteCountDiff / timeDiff
+    diskLoad = b2mb(diskRead + diskWrite)
+    iops = round(diskReadCount + diskWriteCount, 2)
+    return diskLoad, diskLoadPercent, iops
+# end define
+
+
+def CalculateNetworkStatistics(diff):
+    if diff is None:
+        return None, None
+    timeDiff, values = diff
+    bytesRecvDiff, bytesSentDiff, packetsSentDiff, packetsRecvDiff = values
+    bitesRecvAvg = bytesRecvDiff / timeDiff * 8
+    bitesSentAvg = bytesSentDiff / timeDiff * 8
+    packetsRecvAvg = packetsRecvDiff / timeDiff
+    packetsSentAvg = packetsSentDiff / timeDiff
+    netLoadAvg = b2mb(bitesRecvAvg + bitesSentAvg)
+    ppsAvg = round(packetsRecvAvg + packetsSentAvg, 2)
+    return netLoadAvg, ppsAvg
+# end define
+
+
 def GetValidatorProcessInfo():
     pid = get_service_pid("validator")
     if not pid:
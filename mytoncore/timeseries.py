@@ -0,0 +1,257 @@
+import os
+import mmap
+from array import array
+import struct
+import threading
+import time
+
+
+RING_HEADER = struct.Struct("<8sqq") # magic, capacity, number of written records
+RING_RECORD = struct.Struct("<qd") # timestamp, value
+RING_MAGIC = b"MTCRING1"
+
+
+class RingFile:
+	"""
+	Fixed size memory-mapped file with the last `capacity` (timestamp, value)
+	records of one metric. Records are appended in timestamp order, the oldest
+	one is overwritten when the file is full. The file is written by one
+	process (mytoncore) and may be read by others (mytonctrl).
+	"""
+
+	def __init__(self, path, capacity=8640, writable=False):
+		self.path = path
+		self.writable = writable
+		if writable and not os.path.isfile(path):
+			self.create(path, capacity)
+		with open(path, "r+b" if writable else "rb") as file:
+			access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+			self.mm = mmap.mmap(file.fileno(), 0, access=access)
+		magic, self.capacity, _ = RING_HEADER.unpack_from(self.mm, 0)
+		if magic != RING_MAGIC:
+			raise Exception("RingFile error: {path} is not a ring file".format(path=path))
+	#end define
+
+	@staticmethod
+	def create(path, capacity):
+		tmp_path = path + ".tmp"
+		with open(tmp_path, "wb") as file:
+			file.write(RING_HEADER.pack(RING_MAGIC, capacity, 0))
+			file.truncate(RING_HEADER.size + capacity * RING_RECORD.size)
+		os.rename(tmp_path, path)
+	#end define
+
+	def get_written(self):
+		return RING_HEADER.unpack_from(self.mm, 0)[2]
+	#end define
+
+	def __len__(self):
+		return min(self.get_written(), self.capacity)
+	#end define
+
+	def append(self, timestamp, value):
+		written = self.get_written()
+		if written > 0 and timestamp < self.get(len(self) - 1)[0]:
+			return # clock went back, records must stay ordered
+		slot = written % self.capacity
+		RING_RECORD.pack_into(self.mm, RING_HEADER.size + slot * RING_RECORD.size, int(timestamp), value)
+		# the record is complete before readers can see it
+		RING_HEADER.pack_into(self.mm, 0, RING_MAGIC, self.capacity, written + 1)
+	#end define
+
+	def get(self, index, written=None):
+		"""Record `index` counting from the oldest one"""
+		if written is None:
+			written = self.get_written()
+		start = written - min(written, self.capacity)
+		slot = (start + index) % self.capacity
+		return RING_RECORD.unpack_from(self.mm, RING_HEADER.size + slot * RING_RECORD.size)
+	#end define
+
+	def find(self, timestamp, written=None):
+		"""Index of the first record newer than timestamp"""
+		if written is None:
+			written = self.get_written()
+		low, high = 0, min(written, self.capacity)
+		while low < high:
+			middle = (low + high) // 2
+			if self.get(middle, written)[0] <= timestamp:
+				low = middle + 1
+			else:
+				high = middle
+		return low
+	#end define
+
+	def close(self):
+		self.mm.close()
+	#end define
+#end class
+
+
+class TimeSeriesStore:
+	"""
+	Directory of RingFile per metric (`<name>.ring`).
+	Counters (bytes, blocks, queries) are stored as they are read,
+	rates and history of any window are computed on read.
+	"""
+
+	def __init__(self, path, capacity=8640, writable=False):
+		self.path = path
+		self.capacity = capacity
+		self.writable = writable
+		self.rings = dict()
+		self.lock = threading.Lock()
+		if writable:
+			os.makedirs(path, exist_ok=True)
+	#end define
+
+	def get_ring(self, name, create=False):
+		"""RingFile of the metric, None if it has no file and is not created"""
+		ring = self.rings.get(name)
+		if ring is not None:
+			return ring
+		with self.lock:
+			ring = self.rings.get(name)
+			if ring is None:
+				path = os.path.join(self.path, name + ".ring")
+				if not (self.writable and create) and not os.path.isfile(path):
+					return None
+				ring = RingFile(path, self.capacity, self.writable)
+				self.rings[name] = ring
+		return ring
+	#end define
+
+	def add(self, name, value, timestamp=None):
+		if timestamp is None:
+			timestamp = time.time()
+		self.get_ring(name, create=True).append(timestamp, value)
+	#end define
+
+	def add_many(self, values, timestamp=None):
+		if timestamp is None:
+			timestamp = time.time()
+		for name, value in values.items():
+			self.add(name, value, timestamp)
+	#end define
+
+	def get_names(self):
+		if not os.path.isdir(self.path):
+			return list()
+		return sorted(name[:-5] for name in os.listdir(self.path) if name.endswith(".ring"))
+	#end define
+
+	def get_last(self, name):
+		"""Last (timestamp, value) of the metric or None"""
+		ring = self.get_ring(name)
+		if ring is None or len(ring) == 0:
+			return None
+		return ring.get(len(ring) - 1)
+	#end define
+
+	def get_value(self, name, timestamp):
+		"""Last (timestamp, value) not newer than timestamp or None"""
+		ring = self.get_ring(name)
+		if ring is None:
+			return None
+		written = ring.get_written()
+		index = ring.find(timestamp, written) - 1
+		if index < 0:
+			return None
+		return ring.get(index, written)
+	#end define
+
+	def get_diff(self, name, window, end=None):
+		"""
+		Increase of a counter over the last `window` seconds before end,
+		returns (value diff, time diff) or None if there is no data
+		or the counter was reset (restart of the node) inside the window
+		"""
+		if end is None:
+			last = self.get_last(name)
+		else:
+			last = self.get_value(name, end)
+		if last is None:
+			return None
+		first = self.get_value(name, last[0] - window)
+		if first is None or first[0] == last[0] or last[1] < first[1]:
+			return None
+		return last[1] - first[1], last[0] - first[0]
+	#end define
+
+	def get_rate(self, name, window, end=None):
+		"""Average increase of a counter per second over the last `window` seconds"""
+		diff = self.get_diff(name, window, end)
+		if diff is None:
+			return None
+		return diff[0] / diff[1]
+	#end define
+
+	def get_history(self, name, start, end, step):
+		"""List of (timestamp, value) of the last records in each `step` seconds of [start, end]"""
+		ring = self.get_ring(name)
+		if ring is None:
+			return list()
+		written = ring.get_written()
+		result = list()
+		for bucket in range(int(start), int(end) + 1, step):
+			index = ring.find(min(bucket + step - 1, end), written) - 1
+			if index < 0:
+				continue
+			timestamp, value = ring.get(index, written)
+			if timestamp >= bucket:
+				result.append((bucket, value))
+		return result
+	#end define
+#end class
+
+
+class CounterRing:
+	"""
+	Preallocated in-memory ring of counter samples: slot x row x column
+	(e.g. disk x counter), stored flat in one array. get_diff() returns
+	differences of all counters between the newest and an older sample.
+	"""
+
+	def __init__(self, slots, rows, columns):
+		self.slots = slots
+		self.rows = list(rows)
+		self.columns = list(columns)
+		self.width = len(self.rows) * len(self.columns)
+		self.times = array('d', [0]) * slots
+		self.values = array('d', [0]) * (slots * self.width)
+		self.written = 0
+	#end define
+
+	def append(self, timestamp, values):
+		"""values is a flat list of row-major counters"""
+		slot = self.written % self.slots
+		self.times[slot] = timestamp
+		self.values[slot*self.width:(slot+1)*self.width] = array('d', values)
+		self.written += 1
+	#end define
+
+	def get_slot(self, age):
+		# slot of the sample which is `age` samples older than the newest one
+		if age >= min(self.written, self.slots):
+			return None
+		return (self.written - 1 - age) % self.slots
+	#end define
+
+	def get_latest(self):
+		slot = self.get_slot(0)
+		if slot is None:
+			return None
+		return self.values[slot*self.width:(slot+1)*self.width]
+	#end define
+
+	def get_diff(self, age):
+		"""(time diff, flat list of counter diffs) between the newest sample and `age` samples before it"""
+		old = self.get_slot(age)
+		if old is None:
+			return None
+		new = self.get_slot(0)
+		new_values = self.values[new*self.width:(new+1)*self.width]
+		old_values = self.values[old*self.width:(old+1)*self.width]
+		return self.times[new] - self.times[old], [a - b for a, b in zip(new_values, old_values)]
+	#end define
+#end class
@@ -0,0 +1,224 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from mytoncore.models import Block, Message, Trans
+
+
+class TransactionCache:
+	"""
+	On-disk cache of parsed account transactions (SQLite). Transactions are
+	immutable, so an address keeps one contiguous chain of them from the head
+	(the newest cached transaction) back to the tail. A history request
+	fetches only transactions newer than the head, serves the chain from the
+	database and fetches older ones after the tail.
+	Addresses keep at most `max_transactions` newest transactions, least
+	recently used addresses are evicted when the file grows over `max_size`.
+	"""
+
+	commit_interval = 50 # transactions
+
+	def __init__(self, path, max_size=64*1024*1024, max_transactions=10000):
+		self.path = path
+		self.max_size = max_size
+		self.max_transactions = max_transactions
+		self.lock = threading.Lock()
+		self.connection = None
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+	#end define
+
+	def connect(self):
+		if self.connection is None:
+			os.makedirs(os.path.dirname(self.path), exist_ok=True)
+			self.connection = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+			self.connection.execute("PRAGMA journal_mode=WAL")
+			self.connection.execute("CREATE TABLE IF NOT EXISTS transactions (address TEXT, lt INTEGER, hash TEXT, prev_lt INTEGER, prev_hash TEXT, block TEXT, messages TEXT, PRIMARY KEY (address, lt))")
+			self.connection.execute("CREATE TABLE IF NOT EXISTS accounts (address TEXT PRIMARY KEY, head_lt INTEGER, tail_lt INTEGER, used REAL)")
+			self.connection.commit()
+		return self.connection
+	#end define
+
+	def iter_transactions(self, address, lt, hash, fetch):
+		"""
+		Yield transactions of the address from (lt, hash) back, as
+		get_last_transactions() dicts. fetch(lt, hash) is a generator of
+		the transactions from the lite-server.
+		"""
+		head_lt, tail_lt = self.get_segment(address)
+		# transactions newer than the head, they are stored when the chain reaches it
+		new = list()
+		source = None
+		try:
+			if lt != head_lt:
+				source = fetch(lt, hash)
+				joined = False
+				for transaction in source:
+					if transaction["lt"] == head_lt:
+						joined = True
+						break
+					self.misses += 1
+					new.append(transaction)
+					yield transaction
+				source.close()
+				source = None
+				self.add_new(address, new, joined)
+				new = list()
+				if not joined:
+					return # the whole history is fetched
+			#end if
+
+			last = None
+			for transaction in self.iter_cached(address, head_lt, tail_lt):
+				self.hits += 1
+				last = transaction
+				yield transaction
+			if last is None or last["prev_lt"] is None:
+				return
+
+			# the cached chain ends, continue from the lite-server
+			source = fetch(last["prev_lt"], last["prev_hash"])
+			added = 0
+			for transaction in source:
+				self.misses += 1
+				self.add_old(address, transaction)
+				added += 1
+				if added % self.commit_interval == 0:
+					self.commit()
+				yield transaction
+		finally:
+			if source is not None:
+				source.close()
+			if new:
+				# the caller stopped before the chain reached the cached head
+				self.add_new(address, new, False)
+			self.commit()
+			self.trim()
+	#end define
+
+	def get_segment(self, address):
+		with self.lock:
+			row = self.connect().execute("SELECT head_lt, tail_lt FROM accounts WHERE address = ?", (address,)).fetchone()
+		if row is None:
+			return None, None
+		return row
+	#end define
+
+	def iter_cached(self, address, head_lt, tail_lt, page_size=100):
+		lt = head_lt + 1
+		while True:
+			with self.lock:
+				connection = self.connect()
+				connection.execute("UPDATE accounts SET used = ? WHERE address = ?", (time.time(), address))
+				rows = connection.execute("SELECT lt, hash, prev_lt, prev_hash, block, messages FROM transactions WHERE address = ? AND lt < ? AND lt >= ? ORDER BY lt DESC LIMIT ?", (address, lt, tail_lt, page_size)).fetchall()
+			for row in rows:
+				yield self.from_row(row)
+			if len(rows) < page_size:
+				return
+			lt = rows[-1][0]
+	#end define
+
+	def add_new(self, address, transactions, joined):
+		"""Store transactions newer than the cached head, the old chain is dropped if they do not reach it"""
+		if not transactions:
+			return
+		rows = [self.to_row(address, transaction) for transaction in transactions]
+		with self.lock:
+			connection = self.connect()
+			if joined:
+				connection.execute("UPDATE accounts SET head_lt = ?, used = ? WHERE address = ?", (rows[0][1], time.time(), address))
+			else:
+				connection.execute("DELETE FROM transactions WHERE address = ?", (address,))
+				connection.execute("INSERT OR REPLACE INTO accounts VALUES (?, ?, ?, ?)", (address, rows[0][1], rows[-1][1], time.time()))
+			connection.executemany("INSERT OR REPLACE INTO transactions VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+	#end define
+
+	def add_old(self, address, transaction):
+		"""Store transaction older than the cached tail"""
+		row = self.to_row(address, transaction)
+		with self.lock:
+			connection = self.connect()
+			connection.execute("INSERT OR REPLACE INTO transactions VALUES (?, ?, ?, ?, ?, ?, ?)", row)
+			connection.execute("UPDATE accounts SET tail_lt = ? WHERE address = ?", (row[1], address))
+	#end define
+
+	def commit(self):
+		with self.lock:
+			if self.connection is not None:
+				self.connection.commit()
+	#end define
+
+	def trim(self):
+		with self.lock:
+			connection = self.connect()
+			# the oldest transactions of long histories
+			rows = connection.execute("SELECT address FROM transactions GROUP BY address HAVING COUNT(*) > ?", (self.max_transactions,)).fetchall()
+			for (address,) in rows:
+				tail_lt = connection.execute("SELECT lt FROM transactions WHERE address = ? ORDER BY lt DESC LIMIT 1 OFFSET ?", (address, self.max_transactions - 1)).fetchone()[0]
+				connection.execute("DELETE FROM transactions WHERE address = ? AND lt < ?", (address, tail_lt))
+				connection.execute("UPDATE accounts SET tail_lt = ? WHERE address = ?", (tail_lt, address))
+				self.evictions += 1
+			# least recently used addresses
+			while self.get_size(connection) > self.max_size:
+				row = connection.execute("SELECT address FROM accounts ORDER BY used LIMIT 1").fetchone()
+				if row is None:
+					break
+				connection.execute("DELETE FROM transactions WHERE address = ?", row)
+				connection.execute("DELETE FROM accounts WHERE address = ?", row)
+				self.evictions += 1
+			connection.commit()
+	#end define
+
+	def get_size(self, connection):
+		# size of the stored data, the file itself does not shrink
+		return connection.execute("SELECT COALESCE(SUM(LENGTH(messages)), 0) FROM transactions").fetchone()[0]
+	#end define
+
+	def to_row(self, address, transaction):
+		block = transaction["block"]
+		block = str(block) if block is not None and block.rootHash is not None else None
+		messages = list()
+		for message in transaction["messages"]:
+			item = dict(message.__dict__)
+			item.pop("trans")
+			messages.append(item)
+		return address, transaction["lt"], transaction["hash"], transaction["prev_lt"], transaction["prev_hash"], block, json.dumps(messages)
+	#end define
+
+	def from_row(self, row):
+		lt, hash, prev_lt, prev_hash, block, messages = row
+		trans = Trans(Block(block), lt=str(lt))
+		transaction = {"lt": lt, "hash": hash, "prev_lt": prev_lt, "prev_hash": prev_hash, "block": trans.block, "messages": list()}
+		for item in json.loads(messages):
+			message = Message()
+			message.__dict__.update(item)
+			message.trans = trans
+			transaction["messages"].append(message)
+		return transaction
+	#end define
+
+	def get_stats(self):
+		with self.lock:
+			connection = self.connect()
+			result = dict()
+			result["addresses"] = connection.execute("SELECT COUNT(*) FROM accounts").fetchone()[0]
+			result["transactions"] = connection.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+			result["size"] = self.get_size(connection)
+			result["max_size"] = self.max_size
+			result["hits"] = self.hits
+			result["misses"] = self.misses
+			result["evictions"] = self.evictions
+		return result
+	#end define
+
+	def clear(self):
+		with self.lock:
+			connection = self.connect()
+			connection.execute("DELETE FROM transactions")
+			connection.execute("DELETE FROM accounts")
+			connection.commit()
+	#end define
+#end class
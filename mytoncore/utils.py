@@ -105,6 +105,38 @@ def parse_db_stats(path: str):
     return result
 # end define
 
+def parse_diskstats(text: str) -> dict:
+    """
+    Parse /proc/diskstats to {disk: [busy time ms, read bytes, write bytes, read count, write count]},
+    the same counters as psutil.disk_io_counters
+    """
+    result = {}
+    for line in text.splitlines():
+        fields = line.split()
+        if len(fields) < 14:
+            continue
+        # sectors are always 512 bytes in /proc/diskstats
+        result[fields[2]] = [int(fields[12]), int(fields[5]) * 512, int(fields[9]) * 512, int(fields[3]), int(fields[7])]
+    return result
+# end define
+
+
+def parse_net_dev(text: str) -> dict:
+    """
+    Parse /proc/net/dev to {interface: [bytes recv, bytes sent, packets sent, packets recv]},
+    the same counters as psutil.net_io_counters
+    """
+    result = {}
+    for line in text.splitlines()[2:]:
+        name, _, data = line.partition(':')
+        fields = data.split()
+        if len(fields) < 16:
+            continue
+        result[name.strip()] = [int(fields[0]), int(fields[8]), int(fields[9]), int(fields[1])]
+    return result
+# end define
+
+
 def get_hostname():
     return subprocess.run(["hostname"], stdout=subprocess.PIPE).stdout.decode().strip()
 
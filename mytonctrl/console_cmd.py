@@ -43,6 +43,7 @@ USAGES = {
     "vl": "[past] [fast] [offline] [--json] [adnl] [pubkey] [wallet]",
     "cl": "[past] [--json] [adnl]",
     "get_pool_data": "<pool_name|pool_addr>",
+    "cache_stats": "[--json]",
     "delete_pool": "<pool_name>",
     "import_pool": "<pool_name> <pool_addr>",
     "new_pool": "<pool_name> <validator_reward_share_percent> <max_nominators_count> <min_validator_stake> <min_nominator_stake>",
@@ -44,6 +44,7 @@ from mytoncore.utils import get_package_resource_path
 from mytoncore.telemetry import is_host_virtual
 from mytonctrl.console_cmd import add_command, check_usage_one_arg, check_usage_args_min_max_len
 from mytonctrl.migrate import run_migrations
+from mytonctrl.status_collector import StatusCollector
 from mytonctrl.utils import GetItemFromList, timestamp2utcdatetime, fix_git_config, is_hex, GetColorInt, \
 	pop_user_from_args, pop_arg_from_args, get_clang_major_version, get_os_version
 from mytoninstaller.archive_blocks import download_blocks
@@ -583,73 +584,77 @@ def PrintStatus(local, ton, args):
 
 	# Local status
 	validator_status = ton.GetValidatorStatus()
-	adnl_addr = ton.GetAdnlAddr()
-	validator_index = None
-	onlineValidators = None
-	validator_efficiency = None
-	validator_wallet = ton.GetValidatorWallet()
-	validator_account = Dict()
-	db_size = ton.GetDbSize()
-	db_usage = ton.GetDbUsage()
-	memory_info = GetMemoryInfo()
-	swap_info = GetSwapInfo()
-	statistics = ton.GetSettings("statistics")
+	statistics = ton.get_state("statistics")
 	net_load_avg = ton.GetStatistics("netLoadAvg", statistics)
 	disks_load_avg = ton.GetStatistics("disksLoadAvg", statistics)
 	disks_load_percent_avg = ton.GetStatistics("disksLoadPercentAvg", statistics)
+	validator_efficiency = None
 
 	all_status = validator_status.is_working and validator_status.out_of_sync < 20
 
-	try:
-		vconfig = ton.GetValidatorConfig()
-		fullnode_adnl = base64.b64decode(vconfig.fullnode).hex().upper()
-	except Exception:
-		fullnode_adnl = 'n/a'
+	# Independent getters are collected concurrently, slow ones do not hold up the rest
+	collector = StatusCollector(local)
+	collector.add("adnl_addr", ton.GetAdnlAddr)
+	collector.add("validator_wallet", ton.GetValidatorWallet)
+	collector.add("db_size", ton.GetDbSize)
+	collector.add("db_usage", ton.GetDbUsage)
+	collector.add("memory_info", GetMemoryInfo, default=dict())
+	collector.add("swap_info", GetSwapInfo, default=dict())
+	collector.add("fullnode_adnl", lambda: base64.b64decode(ton.GetValidatorConfig().fullnode).hex().upper(), default='n/a')
 
 	if all_status:
-		network_name = ton.GetNetworkName()
-		rootWorkchainEnabledTime_int = local.try_function(ton.GetRootWorkchainEnabledTime)
-		config34 = ton.GetConfig34()
-		config36 = ton.GetConfig36()
-		totalValidators = config34["totalValidators"]
-
+		collector.add("configs", lambda: ton.prefetch_configs([12, 15, 17, 34, 36]))
+		collector.add("network_name", ton.GetNetworkName)
+		collector.add("root_workchain_enabled_time", ton.GetRootWorkchainEnabledTime, after=["configs"])
+		collector.add("config15", ton.GetConfig15, after=["configs"])
+		collector.add("config17", ton.GetConfig17, after=["configs"])
+		collector.add("config34", ton.GetConfig34, after=["configs"], default=dict())
+		collector.add("config36", ton.GetConfig36, after=["configs"], default=dict())
 		if opt != "fast":
-			try:
-				onlineValidators = ton.GetOnlineValidators()
-			except Exception as e:
-				local.add_log(f"Failed to get online validators: {e}", "warning")
-			# validator_efficiency = ton.GetValidatorEfficiency()
+			collector.add("online_validators", ton.GetOnlineValidators, timeout=40)
+			# collector.add("validator_efficiency", ton.GetValidatorEfficiency, timeout=40)
+		collector.add("shards_number", ton.GetShardsNumber)
+		collector.add("full_config_addr", ton.GetFullConfigAddr)
+		collector.add("full_elector_addr", ton.GetFullElectorAddr)
+		collector.add("start_work_time", ton.GetActiveElectionId, deps=["full_elector_addr"])
+		collector.add("validator_index", ton.GetValidatorIndex)
+		collector.add("offers_number", ton.GetOffersNumber)
+		collector.add("complaints_number", ton.GetComplaintsNumber)
+		collector.add("validator_account", lambda wallet: ton.GetAccount(wallet.addrB64) if wallet is not None else Dict(), deps=["validator_wallet"], default=Dict())
+	#end if
+	result = collector.run()
+
+	adnl_addr = result["adnl_addr"]
+	validator_wallet = result["validator_wallet"]
+	db_size = result["db_size"]
+	db_usage = result["db_usage"]
+	memory_info = result["memory_info"]
+	swap_info = result["swap_info"]
+	fullnode_adnl = result["fullnode_adnl"]
+	validator_index = result.get("validator_index")
+	validator_account = result.get("validator_account", Dict())
+
+	if all_status:
+		config34 = result["config34"]
+		config36 = result["config36"]
+		config15 = result["config15"]
+		totalValidators = config34.get("totalValidators")
+		onlineValidators = result.get("online_validators")
 		if onlineValidators:
 			onlineValidators = len(onlineValidators)
-
 		oldStartWorkTime = config36.get("startWorkTime")
 		if oldStartWorkTime is None:
 			oldStartWorkTime = config34.get("startWorkTime")
-		shardsNumber = ton.GetShardsNumber()
-
-		config15 = ton.GetConfig15()
-		config17 = ton.GetConfig17()
-		fullConfigAddr = ton.GetFullConfigAddr()
-		fullElectorAddr = ton.GetFullElectorAddr()
-		startWorkTime = ton.GetActiveElectionId(fullElectorAddr)
-		validator_index = ton.GetValidatorIndex()
-
-		offersNumber = local.try_function(ton.GetOffersNumber)
-		complaintsNumber = local.try_function(ton.GetComplaintsNumber)
-
+		startWorkTime = result["start_work_time"]
 		tpsAvg = ton.GetStatistics("tpsAvg", statistics)
-
-		if validator_wallet is not None:
-			validator_account = ton.GetAccount(validator_wallet.addrB64)
-	#end if
-
-	if all_status:
-		PrintTonStatus(local, network_name, startWorkTime, totalValidators, onlineValidators, shardsNumber, offersNumber, complaintsNumber, tpsAvg)
+		PrintTonStatus(local, result["network_name"], startWorkTime, totalValidators, onlineValidators, result["shards_number"], result["offers_number"], result["complaints_number"], tpsAvg)
 	PrintLocalStatus(local, ton, adnl_addr, validator_index, validator_efficiency, validator_wallet, validator_account, validator_status,
 		db_size, db_usage, memory_info, swap_info, net_load_avg, disks_load_avg, disks_load_percent_avg, fullnode_adnl)
 	if all_status and ton.using_validator():
-		PrintTonConfig(local, fullConfigAddr, fullElectorAddr, config15, config17)
-		PrintTimes(local, rootWorkchainEnabledTime_int, startWorkTime, oldStartWorkTime, config15)
+		if config15 and result["config17"]:
+			PrintTonConfig(local, result["full_config_addr"], result["full_elector_addr"], config15, result["config17"])
+		if config15 and startWorkTime is not None:
+			PrintTimes(local, result["root_workchain_enabled_time"], startWorkTime, oldStartWorkTime, config15)
 #end define
 
 def PrintTonStatus(local, network_name, startWorkTime, totalValidators, onlineValidators, shardsNumber, offersNumber, complaintsNumber, tpsAvg):
@@ -668,7 +673,7 @@ def PrintTonStatus(local, network_name, startWorkTime, totalValidators, onlineVa
 	color_network_name = bcolors.green_text(network_name) if network_name == "mainnet" else bcolors.yellow_text(network_name)
 	network_name_text = local.translate("ton_status_network_name").format(color_network_name)
 	#tps_text = local.translate("ton_status_tps").format(tps1_text, tps5_text, tps15_text)
-	onlineValidators_text = GetColorInt(onlineValidators, border=allValidators*2/3, logic="more")
+	onlineValidators_text = GetColorInt(onlineValidators, border=allValidators*2/3 if allValidators else 0, logic="more")
 	allValidators_text = bcolors.yellow_text(allValidators)
 	validators_text = local.translate("ton_status_validators").format(onlineValidators_text, allValidators_text)
 	shards_text = local.translate("ton_status_shards").format(bcolors.green_text(shardsNumber))
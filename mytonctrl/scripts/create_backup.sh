@@ -33,6 +33,10 @@ cp -r $mtc_dir $tmp_dir
 
 python3 -c "import json;f=open('${tmp_dir}/db/config.json');json.load(f);f.close()" || exit 1  # Check if config.json is copied correctly
 python3 -c "import json;f=open('${tmp_dir}/mytoncore/mytoncore.db');json.load(f);f.close()" || exit 2  # Check if mytoncore.db is copied correctly
+for section in ${tmp_dir}/mytoncore/mytoncore.db.d/*.json; do
+	[ -f "$section" ] || continue
+	python3 -c "import json;f=open('${section}');json.load(f);f.close()" || exit 2  # Check if mytoncore.db sections are copied correctly
+done
 
 echo -e "${COLOR}[1/2]${ENDC} Copied files to ${tmp_dir}"
 
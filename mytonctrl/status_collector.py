@@ -0,0 +1,93 @@
+import time
+import typing
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from mypylib import MyPyClass
+
+
+class StatusItem:
+    def __init__(self, name: str, func: typing.Callable, deps: list, after: list, timeout: float, default: typing.Any):
+        self.name = name
+        self.func = func
+        self.deps = deps  # results of deps are passed to func as positional args
+        self.after = after  # run after these items, results are not passed
+        self.timeout = timeout
+        self.default = default
+        self.future = None
+        self.started = None
+
+
+class StatusCollector:
+    """
+    Runs independent status getters on a bounded thread pool.
+    An item starts as soon as the items it depends on are ready. Items that
+    fail, time out or depend on such items get their default value, so
+    the status can be rendered from whatever was collected.
+    """
+
+    def __init__(self, local: MyPyClass, max_workers: int = 8, timeout: float = 10):
+        self.local = local
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.items = {}
+        self.results = {}
+        self.failed = set()
+
+    def add(self, name: str, func: typing.Callable, deps: list = None, after: list = None, timeout: float = None, default: typing.Any = None):
+        self.items[name] = StatusItem(name, func, deps or [], after or [], timeout or self.timeout, default)
+
+    def run(self) -> dict:
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="status")
+        pending = dict(self.items)
+        running = {}
+        try:
+            while pending or running:
+                self.start_ready_items(executor, pending, running)
+                if not running:
+                    # the rest depends on unknown items
+                    for item in pending.values():
+                        self.set_failed(item)
+                    break
+                now = time.time()
+                deadline = min(item.started + item.timeout for item in running.values())
+                done, _ = wait([item.future for item in running.values()], timeout=max(deadline - now, 0), return_when=FIRST_COMPLETED)
+                for name, item in list(running.items()):
+                    if item.future in done:
+                        self.set_result(item)
+                        del running[name]
+                    elif time.time() - item.started > item.timeout:
+                        self.local.add_log(f"status item `{name}` timed out after {item.timeout} sec", "warning")
+                        self.set_failed(item)
+                        del running[name]
+        finally:
+            # do not wait for items that timed out
+            executor.shutdown(wait=False)
+        return self.results
+
+    def start_ready_items(self, executor: ThreadPoolExecutor, pending: dict, running: dict):
+        changed = True
+        while changed:
+            changed = False
+            for name, item in list(pending.items()):
+                if any(dep in self.failed for dep in item.deps):
+                    self.set_failed(item)
+                elif all(dep in self.results for dep in item.deps + item.after):
+                    args = [self.results[dep] for dep in item.deps]
+                    item.started = time.time()
+                    item.future = executor.submit(item.func, *args)
+                    running[name] = item
+                else:
+                    continue
+                del pending[name]
+                changed = True
+
+    def set_result(self, item: StatusItem):
+        try:
+            self.results[item.name] = item.future.result()
+        except Exception as ex:
+            self.local.add_log(f"status item `{item.name}` error: {ex}", "warning")
+            self.set_failed(item)
+
+    def set_failed(self, item: StatusItem):
+        self.failed.add(item.name)
+        self.results[item.name] = item.default
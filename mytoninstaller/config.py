@@ -1,3 +1,4 @@
+import os
 import json
 import re
 import subprocess
@@ -47,6 +48,10 @@ def BackupMconfig(local):
 	backupPath = mconfig_path + ".backup"
 	args = ["cp", mconfig_path, backupPath]
 	subprocess.run(args)
+	# sections of the db in separate files must be of the same generation
+	subprocess.run(["rm", "-rf", backupPath + ".d"])
+	if os.path.isdir(mconfig_path + ".d"):
+		subprocess.run(["cp", "-r", mconfig_path + ".d", backupPath + ".d"])
 #end define
 
 
@@ -49,8 +49,10 @@ rm -rf /usr/src/pytonv3
 rm -rf /tmp/myton*
 rm -rf /usr/local/bin/mytoninstaller/
 rm -rf /usr/local/bin/mytoncore/mytoncore.db
+rm -rf /usr/local/bin/mytoncore/mytoncore.db.d
 rm -rf /home/${user}/.local/share/mytonctrl
 rm -rf /home/${user}/.local/share/mytoncore/mytoncore.db
+rm -rf /home/${user}/.local/share/mytoncore/mytoncore.db.d
 
 # Удаление ссылок
 if $full; then
@@ -245,6 +245,7 @@ def test_status(cli, monkeypatch, mocker: MockerFixture):
     status_mocker.out_of_sync = 10
 
     monkeypatch.setattr(MyTonCore, "GetNetworkName", lambda *_: 'mainnet')
+    monkeypatch.setattr(MyTonCore, "prefetch_configs", lambda *_: None)
     monkeypatch.setattr(MyTonCore, "GetOnlineValidators", lambda *_: [1, 2, 3, 4, 5, 6, 7, 8, 9, 10])
     monkeypatch.setattr(MyTonCore, "get_root_workchain_enabled_time", lambda *_: 1234, raising=False)
     monkeypatch.setattr(MyTonCore, "GetRootWorkchainEnabledTime", lambda *_: 1234, raising=False)
@@ -0,0 +1,134 @@
+import threading
+import time
+
+from mytoncore.block_fetcher import BlockRangeFetcher
+from mytoncore.block_scanner import BlockScanner
+from mytoncore.models import Block
+from mytoncore.timeseries import TimeSeriesStore
+
+
+SHARD = "0:8000000000000000"
+
+
+def make_block(workchain, shardchain, seqno):
+    return Block("({},{},{}):{}:{}".format(workchain, shardchain, seqno, "A" * 64, "B" * 64))
+
+
+class Chain:
+    # every masterchain block commits two blocks of the only shard,
+    # blocks have as many transactions as their workchain + 2
+    def __init__(self, last_seqno, delay=0):
+        self.last_seqno = last_seqno
+        self.delay = delay
+        self.requested = list()
+        self.servers = list()
+        self.running = dict()
+        self.max_running = dict()
+        self.lock = threading.Lock()
+
+    def request(self, kwargs):
+        # lite-client request to the server of kwargs["index"]
+        server = kwargs.get("index")
+        with self.lock:
+            self.servers.append(server)
+            self.running[server] = self.running.get(server, 0) + 1
+            self.max_running[server] = max(self.max_running.get(server, 0), self.running[server])
+        time.sleep(self.delay)
+        with self.lock:
+            self.running[server] -= 1
+
+    def get_last_block(self):
+        return make_block(-1, "8000000000000000", self.last_seqno)
+
+    def get_block(self, workchain, shardchain, seqno, **kwargs):
+        self.request(kwargs)
+        self.requested.append((workchain, seqno))
+        return make_block(workchain, shardchain, seqno)
+
+    def get_shards(self, block, **kwargs):
+        self.request(kwargs)
+        return [{"id": SHARD, "block": make_block(0, "8000000000000000", block.seqno * 2)}]
+
+    def get_transactions(self, block, **kwargs):
+        self.request(kwargs)
+        return [(block.seqno, i) for i in range(block.workchain + 2)]
+
+    def get_trans(self, trans, **kwargs):
+        self.request(kwargs)
+        return ["message {}:{}".format(*trans)]
+
+
+def patch_chain(ton, monkeypatch, chain):
+    monkeypatch.setattr(ton, "GetLastBlock", chain.get_last_block)
+    monkeypatch.setattr(ton, "GetBlock", chain.get_block)
+    monkeypatch.setattr(ton, "GetShards", chain.get_shards)
+    monkeypatch.setattr(ton, "GetTransactions", chain.get_transactions)
+    monkeypatch.setattr(ton, "GetTrans", chain.get_trans)
+
+
+def test_block_scanner(ton, monkeypatch, tmp_path):
+    store = TimeSeriesStore(str(tmp_path / "statistics"), writable=True)
+    ton.local.buffer.statistics_store = store
+    chain = Chain(100)
+    patch_chain(ton, monkeypatch, chain)
+    timestamp = [1000]
+    monkeypatch.setattr("mytoncore.block_scanner.get_timestamp", lambda: timestamp[0])
+
+    scanner = BlockScanner(ton, batch_size=4)
+    scanner.scan()  # starts from the last block and its shard top block
+    assert (scanner.blocks, scanner.transactions) == (2, 3)
+
+    chain.last_seqno = 110
+    timestamp[0] = 1060
+    scanner.scan()
+    # 10 masterchain blocks, 20 shardchain blocks
+    assert (scanner.blocks, scanner.transactions) == (2 + 30, 3 + 10 + 40)
+    assert sorted(seqno for workchain, seqno in chain.requested if workchain == 0) == list(range(201, 220, 2))
+    assert store.get_rate("scanner.blocks", 60) == 0.5
+    assert store.get_diff("scanner.transactions", 60) == (50, 60)
+
+    # the scan resumes from the last counted block
+    chain.requested.clear()
+    chain.last_seqno = 112
+    scanner = BlockScanner(ton)
+    scanner.scan()
+    assert scanner.blocks == 32 + 6
+    assert sorted(seqno for workchain, seqno in chain.requested if workchain == -1) == [111, 112]
+
+
+def test_block_scanner_skips_old_blocks(ton, monkeypatch, tmp_path):
+    ton.local.buffer.statistics_store = TimeSeriesStore(str(tmp_path / "statistics"), writable=True)
+    chain = Chain(100)
+    patch_chain(ton, monkeypatch, chain)
+    scanner = BlockScanner(ton, max_gap=50)
+    scanner.scan()
+    chain.requested.clear()
+    chain.last_seqno = 1000
+    scanner.scan()
+    assert [seqno for workchain, seqno in chain.requested if workchain == -1] == [1000]
+    assert ton.local.db["blockScannerState"]["seqno"] == 1000
+
+
+def get_key(data):
+    return data["block"].workchain, data["block"].seqno
+
+
+def test_block_range_fetcher(ton, monkeypatch):
+    ton.local.db["liteServers"] = [0, 3]
+    chain = Chain(100, delay=0.005)
+    patch_chain(ton, monkeypatch, chain)
+    fetcher = BlockRangeFetcher(ton, per_server=2)
+    result = list(fetcher.fetch(11, 20))
+    # masterchain block is followed by the shardchain blocks it commits
+    assert [(data["block"].workchain, data["block"].seqno) for data in result[:3]] == [(-1, 11), (0, 21), (0, 22)]
+    assert [data["seqno"] for data in result] == [seqno for seqno in range(11, 21) for _ in range(3)]
+    assert result[0]["shards"] == {SHARD: 22}
+    assert "shards" not in result[1]
+    assert result[1]["messages"] == ["message 21:0", "message 21:1"]
+    assert set(chain.servers) == {"0", "3"}
+    assert max(chain.max_running.values()) <= 2
+
+    unordered = list(fetcher.fetch(11, 20, messages=False, ordered=False, shards={SHARD: 20}))
+    assert "messages" not in unordered[0]
+    assert sorted(map(get_key, unordered)) == sorted(map(get_key, result))
+    fetcher.close()
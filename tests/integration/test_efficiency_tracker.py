@@ -0,0 +1,99 @@
+import os
+
+import pytest
+
+from mytoncore.functions import track_efficiency
+from mytoncore.models import ValidatorsLoad
+
+
+ELECTION_ID = 1706011792
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def make_load(created):
+    load = ValidatorsLoad()
+    for vid, (master, work) in enumerate(created):
+        load.add(vid, "pubkey", master, work, 1 if vid == 0 else 0, 10 if vid == 0 else 20)
+    return load
+
+
+def test_tracker_windows(ton):
+    tracker = ton.efficiency_tracker
+    assert tracker.get_last_time(ELECTION_ID) is None
+    assert tracker.get_load(ELECTION_ID, ELECTION_ID, ELECTION_ID + 600) is None
+
+    start = ELECTION_ID
+    for i in range(1, 11):
+        end = ELECTION_ID + i * 120
+        tracker.add(ELECTION_ID, 2, start, end, make_load([(1, 10), (0, 20)]))
+        start = end
+    assert tracker.get_last_time(ELECTION_ID) == ELECTION_ID + 1200
+
+    load = tracker.get_load(ELECTION_ID, ELECTION_ID, ELECTION_ID + 1200)
+    assert load[0]["masterBlocksCreated"] == 10
+    assert load[0]["efficiency"] == 100
+    assert load[1]["workBlocksCreated"] == 200
+    assert load[1]["efficiency"] == 50  # masterchain blocks are not expected
+
+    # counters are merged into checkpoints, a window starts at the nearest one
+    load = tracker.get_load(ELECTION_ID, ELECTION_ID + 600, ELECTION_ID + 1200)
+    assert 0 < load[1]["workBlocksCreated"] <= 120
+
+    # counters are too old for the window
+    assert tracker.get_load(ELECTION_ID, ELECTION_ID, ELECTION_ID + 3600) is None
+
+    with pytest.raises(Exception):
+        tracker.add(ELECTION_ID, 2, ELECTION_ID, ELECTION_ID + 1300, make_load([(1, 10), (0, 20)]))
+
+
+def test_tracker_keeps_last_rounds(ton):
+    tracker = ton.efficiency_tracker
+    for i in range(5):
+        election_id = ELECTION_ID + i * 65536
+        tracker.add(election_id, 2, election_id, election_id + 120, make_load([(1, 10), (0, 20)]))
+    assert sorted(os.listdir(tracker.get_dir())) == [f"{ELECTION_ID + i * 65536}.bin" for i in range(2, 5)]
+
+
+def test_validators_list_from_tracker(ton, monkeypatch):
+    with open(os.path.join(FIXTURES_DIR, "liteclient", "checkloadall.txt")) as f:
+        text = f.read()
+    validators = [{"adnlAddr": str(i)} for i in range(8)]
+    config = {"validators": validators, "mainValidators": 5, "startWorkTime": ELECTION_ID}
+    monkeypatch.setattr(ton, "GetConfig34", lambda *args, **kwargs: config)
+    monkeypatch.setattr(ton, "GetSaveElectionEntries", lambda *args, **kwargs: None)
+    monkeypatch.setattr("mytoncore.mytoncore.get_timestamp", lambda: ELECTION_ID + 3660)
+    commands = list()
+
+    def checkloadall(cmd, **kwargs):
+        commands.append(cmd)
+        return text
+    monkeypatch.setattr(ton.liteClient, "Run", checkloadall)
+    ton.update_efficiency_tracker()
+    assert ton.efficiency_tracker.get_last_time(ELECTION_ID) == ELECTION_ID + 3600
+    # the next update fetches only the time passed since the previous one
+    ton.update_efficiency_tracker()
+    assert commands == [f"checkloadall {ELECTION_ID} {ELECTION_ID + 3600} "]
+    monkeypatch.setattr("mytoncore.mytoncore.get_timestamp", lambda: ELECTION_ID + 3780)
+    ton.update_efficiency_tracker()
+    assert commands[1] == f"checkloadall {ELECTION_ID + 3600} {ELECTION_ID + 3720} "
+    assert ton.efficiency_tracker.get_last_time(ELECTION_ID) == ELECTION_ID + 3720
+
+    def run(*args, **kwargs):
+        raise Exception("checkloadall must not be called")
+    monkeypatch.setattr(ton.liteClient, "Run", run)
+    result = ton.GetValidatorsList(start=ELECTION_ID, end=ELECTION_ID + 3600)
+    assert result[0]["blocks_created"] == 84 + 1205
+    assert result[0]["online"] is True
+    assert result[2]["online"] is False
+    assert result[5]["efficiency"] == round(1610 / 1587.5 * 100, 2)
+
+
+def test_track_efficiency_only_validator(ton, monkeypatch):
+    updates = list()
+    monkeypatch.setattr(ton, "update_efficiency_tracker", lambda: updates.append(True))
+    monkeypatch.setattr(ton, "using_validator", lambda: False)
+    track_efficiency(ton.local, ton)
+    assert updates == []
+    monkeypatch.setattr(ton, "using_validator", lambda: True)
+    track_efficiency(ton.local, ton)
+    assert updates == [True]
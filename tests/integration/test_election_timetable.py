@@ -0,0 +1,74 @@
+import threading
+import time
+
+from mytoncore.election_timetable import ElectionTimetable, ELECTIONS, FREEZE, BOUNDARY_DELAY
+from mytoncore.scheduler import Scheduler
+
+
+CONFIG15 = {"validatorsElectedFor": 65536, "electionsStartBefore": 32768, "electionsEndBefore": 8192, "stakeHeldFor": 32768}
+
+
+def make_timetable(start, participate_before_end=None):
+    timetable = ElectionTimetable()
+    timetable.update(CONFIG15, {"startWorkTime": start, "endWorkTime": start + 65536}, participate_before_end)
+    return timetable
+
+
+def test_election_timetable():
+    start = 1_700_000_000
+    end = start + 65536
+    timetable = ElectionTimetable()
+    assert timetable.get_next_run(ELECTIONS, start, 600) is None
+    timetable = make_timetable(start)
+
+    # freeze of the previous round: complaints poll, elections sleep until they open
+    now = start + 100
+    assert timetable.get_next_run(FREEZE, now, 60) == now + 60
+    assert timetable.get_next_run(ELECTIONS, now, 600) == end - 32768 + BOUNDARY_DELAY
+
+    # elections are open
+    now = end - 20000
+    assert timetable.get_next_run(ELECTIONS, now, 600) == now + 600
+    assert timetable.get_next_run(FREEZE, now, 60) == end + BOUNDARY_DELAY
+
+    # elections are closed, everything sleeps until the next round
+    now = end - 8000
+    assert timetable.get_next_run(ELECTIONS, now, 600) == end + BOUNDARY_DELAY
+    assert timetable.get_next_run(FREEZE, now, 60) == end + BOUNDARY_DELAY
+    assert timetable.get_next_refresh(now, 3600) == now + 3600
+    assert timetable.get_next_refresh(end - 100, 3600) == end + BOUNDARY_DELAY
+
+    # wake to participate at the configured time before the end
+    timetable = make_timetable(start, participate_before_end=10000)
+    assert timetable.get_next_run(ELECTIONS, end - 20000, 20000) == end - 10000 + BOUNDARY_DELAY
+
+    # the timetable is outdated after the estimated next round
+    assert timetable.get_next_run(FREEZE, end + 65536 * 2, 60) is None
+
+
+def test_scheduler_planner(local):
+    scheduler = Scheduler(local, max_workers=2)
+    runs = list()
+    planned = scheduler.add(runs.append, 0.05, args=("planned",), name="planned", jitter=0, planner=lambda now, period: now + 10)
+    scheduler.add(runs.append, 0.05, args=("periodic",), name="periodic", jitter=0)
+    thread = threading.Thread(target=scheduler.run)
+    thread.start()
+    time.sleep(0.2)
+    assert runs.count("planned") == 1
+    # a woken task runs before its planned time
+    scheduler.wake(planned, time.time())
+    time.sleep(0.1)
+    scheduler.stop()
+    thread.join()
+    assert runs.count("planned") == 2
+    assert runs.count("periodic") >= 3
+
+
+def test_scheduler_planner_retry(local):
+    scheduler = Scheduler(local)
+    task = scheduler.add(print, 600, jitter=0, planner=lambda now, period: now + 32768)
+    task.skip_missed(1000)
+    assert task.next_run == 1000 + 32768
+    # a failed run is retried within the period, not at the next boundary
+    task.skip_missed(1000, failed=True)
+    assert task.next_run == 1000 + 600
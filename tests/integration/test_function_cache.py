@@ -0,0 +1,115 @@
+import threading
+
+import pytest
+
+from mytoncore.function_cache import FunctionCache
+
+
+class SlowFetch:
+    """Fetch which blocks until released, counts its calls"""
+
+    def __init__(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        assert self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def run_concurrently(cache, fetch, count):
+    """Start a leader and `count` callers which wait for its flight, returns their results"""
+    arrived = threading.Semaphore(0)
+    wait_flight = cache.wait_flight
+
+    def counted_wait_flight(*args):
+        arrived.release()
+        return wait_flight(*args)
+    cache.wait_flight = counted_wait_flight
+
+    results = [None] * (count + 1)
+
+    def call(i):
+        try:
+            results[i] = cache.fetch("config34", fetch, 10, seqno=1)
+        except Exception as ex:
+            results[i] = ex
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(count + 1)]
+    threads[0].start()
+    assert fetch.started.wait(5)
+    for thr in threads[1:]:
+        thr.start()
+    for _ in range(count):
+        assert arrived.acquire(timeout=5)
+    fetch.release.set()
+    for thr in threads:
+        thr.join()
+    return results
+
+
+def test_single_flight():
+    cache = FunctionCache()
+    fetch = SlowFetch(result={"startWorkTime": 1})
+    results = run_concurrently(cache, fetch, 4)
+    assert fetch.calls == 1
+    assert all(result is fetch.result for result in results)
+    stats = cache.get_stats()["keys"]["config34"]
+    assert stats["fetches"] == 1 and stats["waits"] == 4
+    # the fetched data is cached
+    assert cache.fetch("config34", fetch, 10, seqno=1) is fetch.result
+    assert fetch.calls == 1
+
+
+def test_single_flight_error():
+    cache = FunctionCache()
+    error = Exception("lite-client timeout")
+    fetch = SlowFetch(error=error)
+    results = run_concurrently(cache, fetch, 3)
+    assert fetch.calls == 1
+    assert all(result is error for result in results)
+    # a failed fetch is not cached
+    fetch.error = None
+    fetch.result = 5
+    assert cache.fetch("config34", fetch, 10, seqno=1) == 5
+    assert fetch.calls == 2
+
+
+def test_seqno_invalidation():
+    cache = FunctionCache()
+    calls = list()
+
+    def fetch():
+        calls.append(True)
+        return len(calls)
+    assert cache.fetch("config15", fetch, 10, seqno=100) == 1
+    assert cache.fetch("config15", fetch, 10, seqno=100) == 1
+    # a new key block invalidates the entry
+    assert cache.fetch("config15", fetch, 10, seqno=101) == 2
+    # an entry of the same seqno still expires by max_age
+    cache.max_age = -1
+    assert cache.fetch("config15", fetch, 10, seqno=101) == 3
+    cache.max_age = 600
+    cache.invalidate("config15")
+    assert cache.fetch("config15", fetch, 10, seqno=101) == 4
+    # without seqno the entry expires by timeout
+    assert cache.fetch("config15", fetch, 10) == 4
+    assert cache.fetch("config15", fetch, -1) == 5
+
+
+def test_nested_fetch_of_same_key():
+    # a getter which calls itself does not wait for its own flight
+    cache = FunctionCache()
+
+    def outer():
+        return cache.fetch("key", lambda: "inner", 10) + "-outer"
+    assert cache.fetch("key", outer, 10) == "inner-outer"
+    with pytest.raises(ZeroDivisionError):
+        cache.fetch("other", lambda: 1 / 0, 10)
+    assert cache.flights == {}
@@ -0,0 +1,274 @@
+import base64
+import json
+import os
+import subprocess
+
+import pytest
+
+from mytoncore.parsers import parse_tvm_stack, parse_tlb, parse_dump, parse_account_state, split_config_params
+from mytoncore.models import ValidatorsLoad, ValidatorConfig
+
+
+# Fixtures are lite-client outputs written by hand in its output format,
+# they are not captured from a node. Expected .json results of runmethod
+# and getconfig were produced by the previous parsers.
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def read_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, name)) as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("method", [
+    "participant_list_extended",
+    "list_proposals",
+    "list_complaints",
+    "get_pool_data",
+    "has_withdraw_requests",
+])
+def test_result2list_fixtures(ton, method):
+    text = read_fixture(f"runmethod/{method}.txt")
+    expected = json.loads(read_fixture(f"runmethod/{method}.json"))
+    assert ton.Result2List(text) == expected
+
+
+@pytest.mark.parametrize("config_id", [8, 15, 17, 31, 34])
+def test_tlb2json_fixtures(ton, config_id):
+    text = read_fixture(f"getconfig/{config_id}.txt")
+    expected = json.loads(read_fixture(f"getconfig/{config_id}.json"))
+    assert ton.Tlb2Json(text) == expected
+
+
+def test_tlb2json_parse_config(ton):
+    text = "[ 1][ 2024-01-01 00:00:00][ 123] conn ready\n" + read_fixture("getconfig/15.txt")
+    assert ton.parse_config(text)["stake_held_for"] == 32768
+
+
+def test_prefetch_configs(ton, monkeypatch):
+    text = "[ 1][ 2024-01-01 00:00:00][ 123] conn ready\n" + "".join(read_fixture(f"getconfig/{config_id}.txt") for config_id in (15, 17, 34))
+    assert list(split_config_params(text)) == [15, 17, 34]
+    calls = list()
+
+    def run(args, **kwargs):
+        calls.append(args)
+        return subprocess.CompletedProcess(args, 0, text.encode(), b"")
+    monkeypatch.setattr("mytoncore.liteclient.subprocess.run", run)
+    monkeypatch.setattr(ton.liteClient, "get_args", lambda *args: ["lite-client"])
+    monkeypatch.setattr(ton, "get_cache_seqno", lambda scope: None)
+    ton.prefetch_configs([15, 17, 34, 36])
+    # one lite-client process runs all commands
+    assert calls == [["lite-client", "--cmd", "getconfig 15", "--cmd", "getconfig 17", "--cmd", "getconfig 34", "--cmd", "getconfig 36"]]
+    assert ton.GetConfig(15) == json.loads(read_fixture("getconfig/15.json"))
+    assert ton.GetConfig17()["maxStakeFactor"] == 196608
+    assert ton.GetConfig34()["startWorkTime"] == 1706011792
+    assert len(calls) == 1
+    # a param missing from the output is not cached
+    assert ton.GetFunctionBuffer("config36", scope="key") is None
+
+
+def test_result2list_error(ton):
+    assert ton.Result2List("arguments:  [ 1 ] \n") is None
+    assert ton.Result2List("result: error 11\n") is None
+
+
+def test_parse_tvm_stack():
+    assert parse_tvm_stack(" [ ] ") == []
+    assert parse_tvm_stack(" [ 1 -2 ( ) [ C{AB12} x{F_} ] null ] ") == [1, -2, [], ["C{AB12}", "x{F_}"], None]
+    with pytest.raises(ValueError):
+        parse_tvm_stack(" [ 1 [ 2 ] ")
+    with pytest.raises(ValueError):
+        parse_tvm_stack(" [ 1 ] ] ")
+
+
+def test_parse_tlb():
+    assert parse_tlb("ConfigParam(1) = (\n  config_addr:x5555)") == {"config_addr": "x5555"}
+    assert parse_tlb("ConfigParam(8) = ((capabilities version:11 capabilities:494))") == {"_": {"_": "capabilities", "version": 11, "capabilities": 494}}
+    assert parse_tlb("ConfigParam(9) = ( value:1 2)") == {"value": 1, "_": 2}
+    with pytest.raises(ValueError):
+        parse_tlb("ConfigParam(1) = (a:(b:1)")
+    with pytest.raises(ValueError):
+        parse_tlb("ConfigParam(1) = (a b)")
+
+
+def test_last_trans_dump(ton, monkeypatch):
+    text = read_fixture("liteclient/lasttransdump.txt")
+    monkeypatch.setattr(ton.liteClient, "Run", lambda *args, **kwargs: text)
+    history, prev_lt, prev_hash = ton.LastTransDump("0:" + "5E3C8A4C1F62C7D5E4FB2E95D0A1BC0B1A1F0B6F2E2A2C1D6A4C7E9B1F2D3A4B", 46360000001, "hash")
+    assert prev_lt == "46340000001"
+    assert prev_hash == "9A8B7C6D5E4F30211203F4E5D6C7B8A99A8B7C6D5E4F30211203F4E5D6C7B8A9"
+    assert len(history) == 3
+
+    # messages of a transaction are listed from the last one
+    outbound, inbound = history[0], history[1]
+    assert inbound.type == "ord"
+    assert inbound.time == 1706000100
+    assert inbound.total_fees == 0.004
+    assert inbound.srcWorkchain == -1
+    assert inbound.srcAddr == "3333333333333333333333333333333333333333333333333333333333333333"
+    assert inbound.destWorkchain == 0
+    assert inbound.value == 1.5
+    assert inbound.fwd_fee == 0.000666672
+    assert inbound.comment == "hello"
+    assert inbound.trans.block.seqno == 41963210
+    assert inbound.trans.lt == "46360000001"
+
+    assert outbound.srcWorkchain == 0
+    assert outbound.value == 0.001
+    assert outbound.body is None
+    assert history[2].time == 1706000000
+
+    transactions, prev_lt, prev_hash = ton.get_last_transactions("0:5E3C", 46360000001, "hash")
+    assert [transaction["lt"] for transaction in transactions] == [46360000001, 46350000001]
+    assert transactions[0]["hash"] == "hash"
+    assert len(transactions[0]["messages"]) == 2
+    assert transactions[1]["prev_lt"] == prev_lt == 46340000001
+
+
+def test_parse_dump():
+    data = parse_dump("a\n  b:1 c:2\n    x{AB}\n  d\n    value:(raw@Any\n      x{CD}\n      )\ne")
+    assert list(data) == ["a", "e"]
+    assert list(data["a"]) == ["b:1 c:2", "d"]
+    assert data["a"].find("c:") == "b:1 c:2"
+    assert data["a"].find("missing") is None
+    assert list(data["a"]["d"]["value:(raw@Any"]) == ["x{CD}", ")"]
+
+
+# hand-written accounts, their addresses and hashes are placeholders
+@pytest.mark.parametrize("name,addr,status,balance,lt,code_hash", [
+    ("active", "0:83DFD552E63729B472FCBCC8C45EBCC6691702558B68EC7527E1BA403A0F31A8", "active", 1520.394211356, "46360000003",
+     "8a6d73bdd8704894f17d8c76ce6139034b8a51b1802907ca36283417798a219b"),
+    ("frozen", "0:4B7E1C2D3A4F5E6D7C8B9A0F1E2D3C4B5A69788796A5B4C3D2E1F0A9B8C7D6E5",
+     "frozen state_hash:x9D4E2A1B3C5F6E7D8C9BA0F1E2D3C4B5A6978897A6B5C4D3E2F1A0B9C8D7E6F5)", 0, "41207000001", None),
+    ("uninit", "-1:D2A1F0E9C8B7A6958473625140F3E2D1C0B9A8F7E6D5C4B3A2F1E0D9C8B7A6F5", "uninit", 50, "46361000002", None),
+])
+def test_get_account(ton, monkeypatch, name, addr, status, balance, lt, code_hash):
+    text = read_fixture(f"liteclient/getaccount_{name}.txt")
+    monkeypatch.setattr(ton.liteClient, "Run", lambda *args, **kwargs: text)
+    account = ton.GetAccount(addr)
+    assert account.status == status
+    assert account.balance == balance
+    assert account.lt == lt
+    assert account.codeHash == code_hash
+    assert account.workchain == int(addr.split(':')[0])
+    assert account.addrFull == addr.lower()
+    assert len(account.hash) == 64
+
+
+def test_get_account_nonexistent(ton, monkeypatch):
+    text = read_fixture("liteclient/getaccount_nonexistent.txt")
+    monkeypatch.setattr(ton.liteClient, "Run", lambda *args, **kwargs: text)
+    account = ton.GetAccount("0:" + "0" * 63 + "1")
+    assert account.status == "empty"
+    assert account.balance == 0
+    assert account.lt is None
+    assert parse_account_state(text) is None
+
+
+def test_parse_account_state():
+    text = "(a\n  addr:(x y:1)\n  storage:(s b:2\n    balance:(c grams:(n value:5))\n    state:u))\nlt = 7 hash = AB\n"
+    fields = parse_account_state(text)
+    assert fields["addr"] == "(x y:1)"
+    assert fields["value"] == "5"
+    assert fields["state"] == "u"
+    assert fields["code"] is None
+    assert fields["lt"] == "7"
+    assert fields["hash"] == "AB"
+
+
+def test_validators_load(ton, monkeypatch):
+    text = read_fixture("liteclient/checkloadall.txt")
+    monkeypatch.setattr(ton.liteClient, "Run", lambda *args, **kwargs: text)
+    load = ton.GetValidatorsLoad(1706011792, 1706040000)
+    assert len(load) == 8
+    assert list(load) == list(range(8))
+    assert load[0]["masterBlocksCreated"] == 84
+    assert load[0]["efficiency"] == round(84 / 82.3077 * 100, 2)
+    assert load[0]["online"] is True
+    assert load[5]["efficiency"] == round(1610 / 1587.5 * 50, 2)  # no masterchain blocks expected
+    assert load[6]["online"] is False
+    complaints = [item for item in load.values() if "fileName" in item]
+    assert [item["id"] for item in complaints] == [2, 6]
+    assert complaints[0]["var1"] == "2265541136"
+    assert complaints[0]["fileName"].endswith("complaint-2.boc")
+    assert load.get_online_count() == 6
+    assert load.get_efficiency_percentile(0) == 0
+    assert load.get_efficiency_percentile(100) == max(load.efficiency)
+
+
+def test_validators_list_join(ton, monkeypatch):
+    text = read_fixture("liteclient/checkloadall.txt")
+    monkeypatch.setattr(ton.liteClient, "Run", lambda *args, **kwargs: text)
+    validators = [{"adnlAddr": str(i)} for i in range(8)]
+    config = {"validators": validators, "mainValidators": 5, "startWorkTime": 1706011792}
+    monkeypatch.setattr(ton, "GetConfig34", lambda *args, **kwargs: config)
+    monkeypatch.setattr(ton, "GetSaveElectionEntries", lambda *args, **kwargs: None)
+    result = ton.GetValidatorsList(start=1706011792, end=1706040000)
+    assert result[0]["is_masterchain"] is True
+    assert result[0]["blocks_created"] == 84 + 1205
+    assert result[2]["online"] is False
+    assert result[5]["is_masterchain"] is False
+    assert result[5]["efficiency"] == round(1610 / 1587.5 * 100, 2)
+    assert result[7]["master_blocks_expected"] == 0
+
+
+def test_valid_complaints(ton, monkeypatch):
+    text = read_fixture("liteclient/checkloadall.txt")
+    load = ValidatorsLoad(text)
+    election_id = 1706011792
+    commands = list()
+
+    def run(cmd, **kwargs):
+        commands.append(cmd)
+        if cmd.startswith("loadproofcheck"):
+            return "COMPLAINT_VOTE_FOR\t2265541136\tYES\n"
+        return text
+    monkeypatch.setattr(ton.liteClient, "Run", run)
+    monkeypatch.setattr(ton, "GetConfig32", lambda: {"startWorkTime": election_id, "endWorkTime": 1706040060, "mainValidators": 5})
+    monkeypatch.setattr(ton, "GetValidatorIndex", lambda: 1)
+
+    def make_complaint(vid, **kwargs):
+        pubkey = load.pubkeys[load.positions[vid]]
+        complaint = {"hash_hex": str(vid), "electionId": election_id, "pseudohash": pubkey + str(election_id),
+                     "suggestedFine": 101, "suggestedFinePart": 0, "votedValidators": []}
+        complaint.update(kwargs)
+        return complaint
+    complaints = {
+        "fine": make_complaint(2, hash_hex="fine", suggestedFine=1000),
+        "valid": make_complaint(2),
+        "voted": make_complaint(2, hash_hex="voted", votedValidators=[1]),
+        "no_file": make_complaint(0),
+        "not_masterchain": make_complaint(6),
+    }
+    # the voted complaint has the same pseudohash as the valid one
+    assert ton.get_valid_complaints(complaints, election_id) == {}
+    del complaints["voted"]
+    result = ton.get_valid_complaints(complaints, election_id)
+    assert list(result.values()) == [complaints["valid"]]
+    assert commands[0].startswith("checkloadall 1706011792 1706040000 ")
+    assert ton.CheckComplaint("complaint-2.boc") is True
+
+
+def test_validators_load_percentile():
+    load = ValidatorsLoad()
+    assert load.get_efficiency_percentile(50) is None
+    for vid, created in enumerate([0, 50, 100, 100]):
+        load.add(vid, "pubkey", created, 0, 100, 0)
+    assert load.get_efficiency_percentile(50) == 75
+    assert load.get_efficiency_percentile(25) == 37.5
+    assert load.get_online_count() == 3
+
+
+def test_validator_config_keys():
+    def key(byte, election_date, expire_at):
+        return {"id": base64.b64encode(bytes([byte]) * 32).decode(), "election_date": election_date, "expire_at": expire_at}
+    validators = [key(1, 200, 300), key(2, 100, 400), key(3, 200, 500), key(4, None, None)]
+    vconfig = ValidatorConfig(json.dumps({"validators": validators}))
+    assert [item["id"][:2] for item in vconfig.validator_keys] == ["04", "02", "01", "03"]
+    # keys of the same election date are all kept, the one valid longer goes first
+    assert vconfig.get_active_validator_key(250) == "03" * 32
+    assert vconfig.get_active_validator_key(450) == "03" * 32
+    assert vconfig.get_active_validator_key(150) == "02" * 32
+    assert vconfig.get_active_validator_key(600) is None
+    assert vconfig.get_validator_key(200) == "01" * 32
+    assert vconfig.get_validator_key(300) is None
@@ -0,0 +1,111 @@
+import os
+import threading
+import time
+
+import pytest
+
+from mytoncore.round_archive import RoundArchive, ElectionsArchive, ValidatorsLoadArchive, ComplaintsArchive
+
+
+WALLET = "Ef_v7-_v7-_v7-_v7-_v7-_v7-_v7-_v7-_v7-_v7-_v7xI0"
+
+
+def make_validator(i, load=True):
+    validator = {"adnlAddr": "{:064X}".format(i + 1), "pubkey": "{:064X}".format(i + 1000), "weight": 2**50 + i}
+    if load:
+        validator.update({
+            "mr": 0.5, "wr": 1.0, "efficiency": 50.0, "online": True,
+            "master_blocks_created": 10.0, "master_blocks_expected": 20.0,
+            "blocks_created": 110.0, "blocks_expected": 120.5, "is_masterchain": i == 0
+        })
+    return validator
+
+
+def test_validators_load_archive(tmp_path):
+    archive = ValidatorsLoadArchive(str(tmp_path / "validators_load"), 86400)
+    validators = [make_validator(i) for i in range(3)] + [make_validator(3, load=False)]
+    validators[0].update({"walletAddr": WALLET, "stake": 350000})
+    validators[1].update({"walletAddr": WALLET, "stake": None})
+    election_id = int(time.time())
+    archive[str(election_id)] = validators
+    assert archive[str(election_id)] == validators
+    assert archive[str(election_id)][0].is_masterchain is True
+    assert list(archive) == [str(election_id)]
+    assert archive.get("123") is None and archive.get("unknown") is None
+    # records are fixed size, much smaller than JSON
+    assert os.path.getsize(archive.get_path(election_id)) == 20 + 4 * archive.record.size
+
+
+def test_elections_and_complaints_archive(tmp_path):
+    now = int(time.time())
+    elections = ElectionsArchive(str(tmp_path / "elections"), 86400)
+    entry = {"adnlAddr": "AB" * 32, "pubkey": "CD" * 32, "stake": 10000.123456789, "maxFactor": 3.0, "walletAddr_hex": "EF" * 32, "walletAddr": WALLET}
+    elections[now] = {entry["adnlAddr"]: entry}
+    elections[now - 90000] = {}
+    assert dict(elections) == {str(now - 90000): {}, str(now): {entry["adnlAddr"]: entry}}
+    elections.purge()
+    assert list(elections) == [str(now)]
+
+    complaints = ComplaintsArchive(str(tmp_path / "complaints"), 86400)
+    complaint = {
+        "electionId": now, "hash": 2**255 + 1, "pubkey": "CD" * 32, "adnl": None,
+        "description": "", "createdTime": now + 10, "severity": 2, "rewardAddr": WALLET,
+        "paid": 0, "suggestedFine": 101.5, "suggestedFinePart": 50.0, "votedValidators": [0, 5],
+        "vsetId": 2**200, "weightRemaining": -12.5, "approvedPercent": 70.5, "isPassed": True,
+        "pseudohash": "CD" * 32 + str(now)
+    }
+    complaints[str(now)] = {str(complaint["hash"]): complaint}
+    saved = complaints[str(now)][str(complaint["hash"])]
+    assert {key: value for key, value in saved.items() if key != "hash_hex"} == complaint
+    assert int(saved["hash_hex"], 16) == complaint["hash"]
+    # suggested fine part is stored as the integer field of the complaint
+    with open(complaints.get_path(now), "rb") as file:
+        fields = complaints.record.unpack_from(file.read(), 20)
+    assert fields[9] == 128
+    with pytest.raises(TypeError):
+        RoundArchive(str(tmp_path / "rounds"), 86400)
+
+
+def test_archive_damaged_and_concurrent_writes(tmp_path):
+    archive = ElectionsArchive(str(tmp_path / "elections"), 86400)
+    now = int(time.time())
+    entry = {"adnlAddr": "AB" * 32, "pubkey": "CD" * 32, "stake": 10000.0, "maxFactor": 3.0, "walletAddr_hex": "EF" * 32, "walletAddr": WALLET}
+    archive[now] = {entry["adnlAddr"]: entry}
+    path = archive.get_path(now)
+
+    # an empty or truncated file is a missing round
+    with open(path, "r+b") as file:
+        file.truncate(os.path.getsize(path) - 10)
+    assert archive.get(str(now)) is None
+    open(path, "wb").close()
+    assert archive.get(str(now)) is None
+
+    errors = list()
+
+    def write(i):
+        try:
+            for _ in range(20):
+                archive[now] = {entry["adnlAddr"]: dict(entry, stake=float(i))}
+        except Exception as ex:
+            errors.append(ex)
+    threads = [threading.Thread(target=write, args=(i,)) for i in range(8)]
+    for thr in threads:
+        thr.start()
+    for thr in threads:
+        thr.join()
+    assert errors == []
+    assert archive[str(now)][entry["adnlAddr"]]["stake"] in range(8)
+    assert os.listdir(archive.path) == [f"{now}.bin"]
+
+
+def test_migrate_keeps_failed_rows(ton):
+    now = int(time.time())
+    entry = {"adnlAddr": "AB" * 32, "pubkey": "CD" * 32, "stake": 10000.0, "maxFactor": 3.0, "walletAddr_hex": "EF" * 32, "walletAddr": WALLET}
+    old_entry = {key: value for key, value in entry.items() if key != "maxFactor"}
+    table = ton.get_state("saveElections")
+    table[str(now)] = {entry["adnlAddr"]: entry}
+    table[str(now - 100)] = {entry["adnlAddr"]: old_entry}
+    ton.migrate_round_archives()
+    assert ton.GetSaveElectionEntries(now)[entry["adnlAddr"]]["stake"] == 10000.0
+    # a row which could not be archived is kept for the next start
+    assert list(table) == [str(now - 100)]
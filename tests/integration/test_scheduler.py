@@ -0,0 +1,134 @@
+import threading
+import time
+
+from mytoncore.scheduler import Scheduler, NORMAL, CRITICAL, BACKGROUND, HISTOGRAM_BUCKETS
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.time() + timeout
+    while not predicate():
+        assert time.time() < deadline, "condition was not met in time"
+        time.sleep(0.005)
+
+
+def start(scheduler):
+    thread = threading.Thread(target=scheduler.run)
+    thread.start()
+    return thread
+
+
+def stop(scheduler, thread):
+    scheduler.stop()
+    thread.join()
+
+
+def test_skip_missed(local):
+    scheduler = Scheduler(local)
+    task = scheduler.add(print, 10, jitter=0)
+    task.set_due(100)
+    task.skip_missed(105)
+    assert task.next_run == 110
+    # runs missed while the task was running are not repeated
+    task.skip_missed(145)
+    assert task.next_run == 150
+    task.add_time(0.05)
+    task.add_time(7)
+    task.add_time(1000)
+    stats = task.get_stats()
+    assert stats["runs"] == 3 and stats["max_time"] == 1000
+    assert len(stats["buckets"]) == len(HISTOGRAM_BUCKETS) + 1
+    assert stats["buckets"][0] == stats["buckets"][4] == stats["buckets"][-1] == 1
+
+
+def test_next_task_priorities(local):
+    # fake clock: tasks are due at 0 and picked at 1
+    scheduler = Scheduler(local, max_workers=3, reserved_workers=1)
+    tasks = dict()
+    for name, priority in (("normal", NORMAL), ("background", BACKGROUND), ("critical", CRITICAL)):
+        tasks[name] = scheduler.add(print, 10, name=name, priority=priority, jitter=0)
+        tasks[name].set_due(0)
+    assert scheduler.get_next_task(1) is tasks["critical"]
+
+    tasks["critical"].running = True
+    scheduler.running = [1, 0, 0]
+    # background tasks give way to a running critical one
+    assert scheduler.get_next_task(1) is tasks["normal"]
+    tasks["normal"].running = True
+    scheduler.running = [1, 1, 0]
+    assert scheduler.get_next_task(1) is None
+
+    # the reserved worker is kept for critical tasks
+    tasks["critical"].running = False
+    scheduler.running = [0, 2, 0]
+    assert scheduler.get_next_task(1) is tasks["critical"]
+    scheduler.running = [0, 1, 0]
+    tasks["critical"].set_due(5)
+    assert scheduler.get_next_task(1) is tasks["background"]
+    assert scheduler.get_wait_time(1) == 4
+
+
+def test_scheduler_runs_tasks(local):
+    scheduler = Scheduler(local, max_workers=3, reserved_workers=1)
+    release = threading.Event()
+    runs = list()
+
+    def critical():
+        runs.append("critical")
+        release.wait(5)
+
+    def fail():
+        raise Exception("failed")
+    scheduler.add(critical, 60, priority=CRITICAL, jitter=0)
+    thread = start(scheduler)
+    try:
+        wait_for(lambda: "critical" in runs)
+        # a background task cannot start while the critical one runs, normal tasks can
+        scheduler.add(runs.append, 0.05, args=("background",), name="background", priority=BACKGROUND, jitter=0, deadline=0.01)
+        scheduler.add(fail, 0.01, jitter=0)
+        wait_for(lambda: scheduler.get_stats()["fail"]["errors"] >= 2)
+        assert "background" not in runs
+        # then the late run is skipped, the next one is on time
+        release.set()
+        wait_for(lambda: "background" in runs)
+        assert scheduler.get_stats()["background"]["skipped"] >= 1
+    finally:
+        release.set()
+        stop(scheduler, thread)
+    stats = scheduler.get_stats()
+    assert stats["fail"]["errors"] == stats["fail"]["runs"]
+    assert stats["critical"]["runs"] == 1
+
+
+def test_scheduler_task_does_not_overlap(local):
+    scheduler = Scheduler(local, max_workers=4)
+    state = {"running": 0, "max_running": 0, "runs": 0}
+    lock = threading.Lock()
+
+    def slow():
+        with lock:
+            state["running"] += 1
+            state["max_running"] = max(state["max_running"], state["running"])
+        time.sleep(0.02)
+        with lock:
+            state["running"] -= 1
+            state["runs"] += 1
+    scheduler.add(slow, 0.001, jitter=0)
+    thread = start(scheduler)
+    try:
+        wait_for(lambda: state["runs"] >= 5)
+    finally:
+        stop(scheduler, thread)
+    assert state["max_running"] == 1
+
+
+def test_scheduler_workers_clamped(local):
+    # a single worker would be reserved for critical tasks only
+    scheduler = Scheduler(local, max_workers=1)
+    assert scheduler.max_workers == 2
+    ran = threading.Event()
+    scheduler.add(ran.set, 10, jitter=0)
+    thread = start(scheduler)
+    try:
+        assert ran.wait(5)
+    finally:
+        stop(scheduler, thread)
@@ -0,0 +1,141 @@
+import json
+import os
+import signal
+import time
+
+from mypylib.mypylib import Dict
+
+from mytoncore.sharded_db import ShardedDb, read_db_files
+
+
+def test_sharded_db(local):
+    db_path = local.buffer.db_path
+    db = ShardedDb(local)
+    db.install()
+    assert local.buffer.sharded_db is db
+    db.window = 0
+
+    big = {str(i): i for i in range(200)}
+    db.write_db({"nodeName": "node", "bookmarks": big})
+    with open(db_path) as file:
+        assert json.load(file) == {"nodeName": "node"}
+    shard_path = db_path + ".d/bookmarks.json"
+    with open(shard_path) as file:
+        assert json.load(file) == big
+    assert read_db_files(db_path) == {"nodeName": "node", "bookmarks": big}
+
+    # only files of changed sections are written
+    shard_inode = os.stat(shard_path).st_ino
+    db.write_db({"nodeName": "node2", "bookmarks": big})
+    assert os.stat(shard_path).st_ino == shard_inode
+    main_inode = os.stat(db_path).st_ino
+    db.write_db({"nodeName": "node2", "bookmarks": dict(big, new=1)})
+    assert os.stat(db_path).st_ino == main_inode
+    assert os.stat(shard_path).st_ino != shard_inode
+
+    # a section once sharded stays in its file, a deleted one is removed
+    db.write_db({"nodeName": "node2", "bookmarks": [], "liteServers": [0, 1]})
+    assert read_db_files(db_path) == {"nodeName": "node2", "bookmarks": [], "liteServers": [0, 1]}
+    db.write_db({"nodeName": "node2"})
+    assert not os.path.exists(shard_path)
+    assert db.read_db(db_path) == {"nodeName": "node2"}
+
+
+def test_sharded_db_serializes_changed_sections(local, monkeypatch):
+    db_path = local.buffer.db_path
+    db = ShardedDb(local)
+    db.install()
+    db.window = 0
+    big = {str(i): i for i in range(200)}
+    local.db["bookmarks"] = big
+    local.db["nodeName"] = "node"
+    local.save()
+    dumped = list()
+    dumps = db.dumps
+    monkeypatch.setattr(db, "dumps", lambda value: dumped.append(value) or dumps(value))
+
+    local.db["nodeName"] = "node2"
+    local.save()
+    assert dumped == ["node2"]
+    assert read_db_files(db_path)["nodeName"] == "node2"
+
+    # a section changed in place is written when it is assigned back
+    bookmarks = local.db["bookmarks"]
+    bookmarks["new"] = 1
+    local.save()
+    assert "new" not in read_db_files(db_path)["bookmarks"]
+    local.db["bookmarks"] = bookmarks
+    local.save()
+    assert read_db_files(db_path)["bookmarks"]["new"] == 1
+    local.db.pop("nodeName")
+    local.save()
+    assert "nodeName" not in read_db_files(db_path)
+
+    # a dict loaded by mypylib is serialized once, then tracked
+    local.db = Dict(read_db_files(db_path))
+    dumped.clear()
+    local.save()
+    assert len(dumped) == len(local.db)
+    dumped.clear()
+    local.save()
+    assert dumped == []
+
+
+def test_sharded_db_coalesces_writes(local):
+    db_path = local.buffer.db_path
+    db = ShardedDb(local)
+    db.install()
+    db.window = 0.2
+    db.write_db({"nodeName": "node1"})
+    db.write_db({"nodeName": "node2"})
+    db.write_db({"nodeName": "node3"})
+    with open(db_path) as file:
+        assert json.load(file) == {"nodeName": "node1"}
+    # merge of local.save() sees the data to be written
+    assert local.read_db(db_path) == {"nodeName": "node3"}
+    time.sleep(0.3)
+    with open(db_path) as file:
+        assert json.load(file) == {"nodeName": "node3"}
+
+
+def test_sharded_db_reads_old_layout(local):
+    db_path = local.buffer.db_path
+    os.makedirs(db_path + ".d", exist_ok=True)
+    with open(db_path + ".d/bookmarks.json", "w") as file:
+        json.dump(["stale"], file)
+    with open(db_path + ".d/liteServers.json", "w") as file:
+        json.dump([0], file)
+    with open(db_path, "w") as file:
+        json.dump({"bookmarks": ["new"]}, file)  # written by an older version
+    local.db.pop("liteServers", None)
+    ShardedDb(local).install()
+    assert local.db["liteServers"] == [0]
+    assert local.read_db(db_path) == {"bookmarks": ["new"], "liteServers": [0]}
+
+
+def test_sharded_db_flushes_on_stop(local, monkeypatch):
+    db_path = local.buffer.db_path
+    exits = list()
+    monkeypatch.setattr(local, "exit", lambda: exits.append(True), raising=False)
+    signals = list()
+    previous = signal.signal(signal.SIGTERM, lambda signum, frame: signals.append(signum))
+    try:
+        db = ShardedDb(local)
+        db.install()
+        db.window = 60
+        db.write_db({"nodeName": "node1"})
+        db.write_db({"nodeName": "node2"})
+        local.exit()
+        assert exits == [True]
+        with open(db_path) as file:
+            assert json.load(file) == {"nodeName": "node2"}
+
+        # SIGTERM writes pending data before the previous handler runs
+        db.write_db({"nodeName": "node3"})
+        signal.getsignal(signal.SIGTERM)(signal.SIGTERM, None)
+        assert signals == [signal.SIGTERM]
+        with open(db_path) as file:
+            assert json.load(file) == {"nodeName": "node3"}
+        assert db.timer is None
+    finally:
+        signal.signal(signal.SIGTERM, previous)
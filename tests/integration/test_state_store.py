@@ -0,0 +1,60 @@
+import time
+
+from mytoncore.mytoncore import MyTonCore
+from mytoncore.state_store import StateStore
+
+
+def test_state_table(tmp_path):
+    store = StateStore(str(tmp_path / "state.db"))
+    offers = store.get_table("saveOffers")
+    assert not offers
+    offers["hash1"] = ["pseudohash", 17]
+    offers["hash2"] = ["pseudohash", None]
+    offers["hash1"] = ["pseudohash2", 17]
+    assert offers["hash1"] == ["pseudohash2", 17]
+    assert "hash2" in offers and "hash3" not in offers
+    assert sorted(offers) == ["hash1", "hash2"]
+    assert offers.pop("hash2") == ["pseudohash", None]
+    assert offers.get("hash2") is None
+    assert dict(offers.items()) == {"hash1": ["pseudohash2", 17]}
+
+    # rows are saved once they are written
+    store.close()
+    assert StateStore(str(tmp_path / "state.db")).get_table("saveOffers").copy() == {"hash1": ["pseudohash2", 17]}
+
+
+def test_state_migration(local, monkeypatch):
+    now = int(time.time())
+    entry = {
+        "adnlAddr": "AB" * 32,
+        "pubkey": "CD" * 32,
+        "stake": 10000.5,
+        "maxFactor": 3.0,
+        "walletAddr_hex": "EF" * 32,
+        "walletAddr": "Ef_v7-_v7-_v7-_v7-_v7-_v7-_v7-_v7-_v7-_v7-_v7xI0"
+    }
+    local.db["saveElections"] = {str(now - 100): {entry["adnlAddr"]: entry}, str(now - 40 * 86400): {}}
+    local.db["saveOffers"] = ["old format"]
+    local.db["statistics"] = {"netLoadAvg": [1, 2, 3]}
+    local.db["bookmarks"] = [{"name": "wallet"}]
+    saved = list()
+    monkeypatch.setattr(MyTonCore, "create_self_db_backup", lambda self: None)
+    monkeypatch.setattr(type(local), "save", lambda self: saved.append(True))
+    ton = MyTonCore(local)
+
+    assert "saveElections" not in local.db and "statistics" not in local.db and "saveOffers" not in local.db
+    assert local.db["bookmarks"] == [{"name": "wallet"}]
+    assert saved == [True]
+    assert ton.GetStatistics("netLoadAvg") == [1, 2, 3]
+    assert ton.GetSaveOffers().copy() == {}
+    # outdated elections are purged on read
+    assert dict(ton.GetSaveElections()) == {str(now - 100): {entry["adnlAddr"]: entry}}
+    assert ton.GetSaveElectionEntries(now - 100)[entry["adnlAddr"]]["stake"] == 10000.5
+
+    # the next start has nothing to migrate
+    MyTonCore(local)
+    assert saved == [True]
+
+    ton.SetWalletVersion("EQ_wallet", "v4")
+    assert ton.GetWalletsVersionList()["EQ_wallet"] == "v4"
+    assert "walletsVersionList" not in local.db
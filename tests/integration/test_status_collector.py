@@ -0,0 +1,77 @@
+import threading
+
+import pytest
+
+from mytonctrl.status_collector import StatusCollector
+
+
+@pytest.fixture()
+def logs(local, monkeypatch):
+    logs = list()
+    monkeypatch.setattr(local, "add_log", lambda text, mode="info": logs.append((mode, text)))
+    return logs
+
+
+def test_status_dependencies(local, logs):
+    collector = StatusCollector(local, max_workers=4)
+    order = list()
+    lock = threading.Lock()
+    first, second = threading.Event(), threading.Event()
+
+    def record(name, result=None):
+        with lock:
+            order.append(name)
+        return result
+
+    def parallel(own, other):
+        # both items must run at the same time to finish
+        own.set()
+        assert other.wait(5)
+        return record("parallel")
+    collector.add("config", lambda: record("config", {"validators": 3}))
+    collector.add("validators", lambda config: record("validators", config["validators"]), deps=["config"])
+    collector.add("totals", lambda config, count: record("totals", count * 2), deps=["config", "validators"])
+    collector.add("render", lambda: record("render", "ok"), after=["totals"])
+    collector.add("first", lambda: parallel(first, second))
+    collector.add("second", lambda: parallel(second, first))
+    results = collector.run()
+    assert results == {"config": {"validators": 3}, "validators": 3, "totals": 6, "render": "ok", "first": None, "second": None}
+    core = [name for name in order if name != "parallel"]
+    assert core == ["config", "validators", "totals", "render"]
+    assert collector.failed == set()
+    assert logs == []
+
+
+def test_status_timeout(local, logs):
+    collector = StatusCollector(local, max_workers=4, timeout=5)
+    release = threading.Event()
+    calls = list()
+    collector.add("stuck", lambda: release.wait(5), timeout=0.1, default="n/a")
+    collector.add("uses_stuck", lambda value: calls.append("uses_stuck"), deps=["stuck"], default="n/a")
+    collector.add("after_stuck", lambda: "ok", after=["stuck"])
+    collector.add("fast", lambda: "fast")
+    try:
+        results = collector.run()
+    finally:
+        release.set()
+    assert results == {"stuck": "n/a", "uses_stuck": "n/a", "after_stuck": "ok", "fast": "fast"}
+    assert calls == []
+    assert collector.failed == {"stuck", "uses_stuck"}
+    assert logs == [("warning", "status item `stuck` timed out after 0.1 sec")]
+
+
+def test_status_errors(local, logs):
+    collector = StatusCollector(local, max_workers=2)
+    calls = list()
+
+    def fail():
+        raise Exception("lite-client failed")
+    collector.add("broken", fail, default=0)
+    collector.add("uses_broken", lambda value: calls.append(value), deps=["broken"], default=-1)
+    collector.add("uses_unknown", lambda value: calls.append(value), deps=["unknown"], default=-2)
+    collector.add("fine", lambda: "fine")
+    results = collector.run()
+    assert results == {"broken": 0, "uses_broken": -1, "uses_unknown": -2, "fine": "fine"}
+    assert calls == []
+    assert collector.failed == {"broken", "uses_broken", "uses_unknown"}
+    assert logs == [("warning", "status item `broken` error: lite-client failed")]
@@ -0,0 +1,142 @@
+import time
+
+from mypylib.mypylib import b2mb
+
+from mytoncore.timeseries import TimeSeriesStore, CounterRing
+from mytoncore.utils import parse_diskstats, parse_net_dev
+
+
+def test_ring_wraps(tmp_path):
+    store = TimeSeriesStore(str(tmp_path), capacity=10, writable=True)
+    for i in range(25):
+        store.add("counter", i * 100, timestamp=1000 + i * 10)
+    assert store.get_names() == ["counter"]
+    assert store.get_last("counter") == (1240, 2400)
+    assert store.get_value("counter", 1155) == (1150, 1500)
+    # only the last 10 records are kept
+    assert store.get_value("counter", 1145) is None
+
+    # records written by one process are seen by readers of the files
+    reader = TimeSeriesStore(str(tmp_path), capacity=10)
+    assert reader.get_last("counter") == (1240, 2400)
+    assert reader.get_rate("counter", 60) == 10
+    assert reader.get_last("missing") is None
+    store.add("counter", 2500, timestamp=1250)
+    assert reader.get_last("counter") == (1250, 2500)
+
+
+def test_rate_and_history(tmp_path):
+    store = TimeSeriesStore(str(tmp_path), writable=True)
+    for i in range(60):
+        store.add("bytes", i * 1000, timestamp=1000 + i * 10)
+    assert store.get_rate("bytes", 60) == 100
+    assert store.get_rate("bytes", 60, end=1300) == 100
+    assert store.get_diff("bytes", 300) == (30000, 300)
+    assert store.get_rate("bytes", 3600) is None  # window is longer than the history
+
+    history = store.get_history("bytes", 1000, 1590, 120)
+    assert history[0] == (1000, 11000)
+    assert history[-1] == (1480, 59000)
+    assert len(history) == 5
+
+    # counter is reset by a node restart
+    store.add("bytes", 10, timestamp=1600)
+    assert store.get_rate("bytes", 60) is None
+    # clock went back
+    store.add("bytes", 20, timestamp=1500)
+    assert store.get_last("bytes") == (1600, 10)
+
+
+def test_node_statistics_ls_queries(ton, tmp_path):
+    store = TimeSeriesStore(str(tmp_path), writable=True)
+    ton.statistics_store = store
+    store.add_many({"node.ls_queries.ok": 100, "node.ls_queries.error": 1}, timestamp=1000)
+    store.add_many({"node.ls_queries.ok": 160, "node.ls_queries.error": 3}, timestamp=1060)
+    stats = ton.get_node_statistics()
+    assert stats["ls_queries"] == {"ok": 60, "error": 2, "time": 60}
+
+
+def test_status_statistics_from_store(ton, tmp_path, monkeypatch):
+    store = TimeSeriesStore(str(tmp_path), writable=True)
+    ton.statistics_store = store
+    now = int(time.time())
+    for i in range(91):  # 15 minutes of samples every 10 sec
+        store.add_many({
+            "net.bytesRecv": i * 1250000, "net.bytesSent": i * 1250000, "net.packetsSent": i * 100, "net.packetsRecv": i * 100,
+            "disk.sda.busyTime": i * 5000, "disk.sda.readBytes": i * 10**7, "disk.sda.writeBytes": 0, "disk.sda.readCount": i * 30, "disk.sda.writeCount": i * 20,
+            "disk.sdb.busyTime": 0, "disk.sdb.readBytes": 0, "disk.sdb.writeBytes": 0, "disk.sdb.readCount": 0, "disk.sdb.writeCount": 0,
+        }, timestamp=now - 900 + i * 10)
+    saved = {"netLoadAvg": [1, 2, 3], "tpsAvg": [4, 5, 6]}
+    assert ton.GetStatistics("netLoadAvg", saved) == [b2mb(250000 * 8)] * 3
+    assert ton.GetStatistics("ppsAvg", saved) == [20] * 3
+    # idle disks are skipped
+    assert ton.GetStatistics("disksLoadAvg", saved) == {"sda": [b2mb(10**6)] * 3}
+    assert ton.GetStatistics("disksLoadPercentAvg", saved) == {"sda": [50] * 3}
+    assert ton.GetStatistics("iopsAvg", saved) == {"sda": [5] * 3}
+    # TPS are not sampled, the saved averages are used
+    assert ton.GetStatistics("tpsAvg", saved) == [4, 5, 6]
+    assert ton.GetNetLoadAvg(saved) == [b2mb(250000 * 8)] * 3
+    # readers do not create files of metrics
+    assert "scanner.transactions" not in store.get_names()
+
+
+def test_status_statistics_short_or_stale(ton, tmp_path):
+    store = TimeSeriesStore(str(tmp_path), writable=True)
+    ton.statistics_store = store
+    now = int(time.time())
+    for i in range(13):  # 2 minutes of samples, then twice as fast
+        value = i * 1250000 if i <= 6 else 6 * 1250000 + (i - 6) * 2500000
+        store.add_many({"net.bytesRecv": value, "net.bytesSent": 0, "net.packetsSent": 0, "net.packetsRecv": 0}, timestamp=now - 120 + i * 10)
+    # 5 and 15 minute windows fall back to the longest known one
+    assert ton.GetStatistics("netLoadAvg") == [b2mb(250000 * 8)] * 3
+
+    store.add_many({"net.bytesRecv": 0, "net.bytesSent": 0, "net.packetsSent": 0, "net.packetsRecv": 0}, timestamp=now + 1)
+    assert ton.GetStatistics("netLoadAvg", {"netLoadAvg": [1, 2, 3]}) == [1, 2, 3]  # counters were reset
+    ton.statistics_store = TimeSeriesStore(str(tmp_path / "old"), writable=True)
+    ton.statistics_store.add_many({"net.bytesRecv": 0, "net.bytesSent": 0, "net.packetsSent": 0, "net.packetsRecv": 0}, timestamp=now - 3600)
+    ton.statistics_store.add_many({"net.bytesRecv": 10, "net.bytesSent": 0, "net.packetsSent": 0, "net.packetsRecv": 0}, timestamp=now - 3590)
+    assert ton.GetStatistics("netLoadAvg", {"netLoadAvg": [1, 2, 3]}) == [1, 2, 3]  # the daemon is not sampling
+
+
+def test_node_statistics_round_blocks(ton, tmp_path, monkeypatch):
+    store = TimeSeriesStore(str(tmp_path), writable=True)
+    ton.statistics_store = store
+    now = int(time.time())
+    monkeypatch.setattr(ton, "GetConfig34", lambda *args, **kwargs: {"startWorkTime": now - 600})
+    names = [f"node.{name}_blocks.{chain}.{key}" for name in ("collated", "validated") for chain in ("master", "shard") for key in ("ok", "error")]
+    for i, timestamp in enumerate([now - 720, now - 660, now - 60, now]):
+        store.add_many({name: 100 + i * (index + 1) for index, name in enumerate(names)}, timestamp=timestamp)
+    stats = ton.get_node_statistics()
+    # counted from the last record before the round start
+    assert stats["collated"]["master"] == {"ok": 2, "error": 4}
+    assert stats["collated"]["shard"] == {"ok": 6, "error": 8}
+    assert stats["collated"]["ok"] == 8 and stats["validated"]["error"] == 12 + 16
+    # the round started before the first record
+    monkeypatch.setattr(ton, "GetConfig34", lambda *args, **kwargs: {"startWorkTime": now - 3600})
+    assert "collated" not in ton.get_node_statistics()
+
+
+def test_counter_ring():
+    ring = CounterRing(3, ["sda", "sdb"], ["read", "write"])
+    assert ring.get_latest() is None
+    ring.append(10, [1, 2, 3, 4])
+    assert ring.get_diff(1) is None
+    for i in range(2, 6):
+        ring.append(i * 10, [i, 2 * i, 3 * i, 4 * i])
+    assert list(ring.get_latest()) == [5, 10, 15, 20]
+    assert ring.get_diff(2) == (20, [2, 4, 6, 8])
+    assert ring.get_diff(3) is None  # older samples are overwritten
+
+
+def test_parse_proc_counters():
+    diskstats = (
+        "   7       0 loop0 10 0 20 0 0 0 0 0 0 4 0 0 0 0 0 0 0\n"
+        " 259       0 nvme0n1 1000 10 8000 500 2000 20 16000 700 0 1234 1300 0 0 0 0 0 0\n"
+    )
+    assert parse_diskstats(diskstats)["nvme0n1"] == [1234, 8000 * 512, 16000 * 512, 1000, 2000]
+    net_dev = (
+        "Inter-|   Receive                                                |  Transmit\n"
+        " face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed\n"
+        "  eth0: 12213116     653    0    0    0     0          0         0    61710     566    0    0    0     0       0          0\n"
+    )
+    assert parse_net_dev(net_dev) == {"eth0": [12213116, 61710, 566, 653]}
@@ -0,0 +1,97 @@
+from mytoncore.models import Account, Block, Message, Trans
+from mytoncore.transaction_cache import TransactionCache
+
+
+class History:
+    # transactions lt 1..last with one message each, hash of lt is "h<lt>"
+    def __init__(self, last):
+        self.last = last
+        self.requests = list()
+
+    def get_last_transactions(self, addr, lt, trans_hash, count=10):
+        assert trans_hash == "h{}".format(lt)
+        self.requests.append((lt, count))
+        transactions = list()
+        for item in range(lt, max(lt - count, 0), -1):
+            message = Message()
+            message.trans = Trans(Block(), lt=str(item))
+            message.time = item
+            message.value = item / 10
+            prev_lt = item - 1 or None
+            transactions.append({"lt": item, "hash": "h{}".format(item), "prev_lt": prev_lt,
+                                 "prev_hash": prev_lt and "h{}".format(prev_lt), "block": None, "messages": [message]})
+        prev_lt = transactions[-1]["prev_lt"]
+        return transactions, prev_lt, prev_lt and "h{}".format(prev_lt)
+
+    def get_account(self):
+        account = Account(0, "5E3C")
+        account.lt, account.hash = str(self.last), "h{}".format(self.last)
+        return account
+
+
+def get_lts(messages):
+    return [int(message.trans.lt) for message in messages]
+
+
+def test_iter_account_history(ton, monkeypatch):
+    ton.local.db["transaction_cache_size"] = 0
+    history = History(100)
+    monkeypatch.setattr(ton, "get_last_transactions", history.get_last_transactions)
+    account = history.get_account()
+
+    messages = ton.iter_account_history(account, page_size=30)
+    assert int(next(messages).trans.lt) == 100
+    # the next page is requested while the first one is consumed
+    assert get_lts(messages) == list(range(99, 0, -1))
+    assert history.requests == [(100, 30), (70, 30), (40, 30), (10, 30)]
+
+    assert len(list(ton.iter_account_history(account, since_lt=55, page_size=30))) == 45
+    assert min(message.time for message in ton.iter_account_history(account, until_time=80)) == 80
+    # messages of whole pages of 10 transactions are returned
+    assert get_lts(ton.GetAccountHistory(account, 5)) == list(range(100, 90, -1))
+    assert len(ton.GetAccountHistory(account, 11)) == 20
+    assert len(ton.GetAccountHistory(History(7).get_account(), 10)) == 7
+
+
+def test_history_from_cache(ton, monkeypatch):
+    history = History(100)
+    monkeypatch.setattr(ton, "get_last_transactions", history.get_last_transactions)
+    assert get_lts(ton.GetAccountHistory(history.get_account(), 20)) == list(range(100, 80, -1))
+
+    # only new transactions are fetched, older ones are served from the cache and then fetched after its tail
+    history.last = 105
+    history.requests.clear()
+    messages = ton.GetAccountHistory(history.get_account(), 40)
+    assert get_lts(messages) == list(range(105, 65, -1))
+    assert messages[10].value == 9.5
+    assert [lt for lt, count in history.requests] == [105, 80]
+    stats = ton.get_transaction_cache().get_stats()
+    assert stats["addresses"] == 1
+    assert stats["transactions"] == 40
+    assert stats["hits"] == 20
+
+    # new transactions which do not reach the cached head replace it
+    history.last = 200
+    ton.GetAccountHistory(history.get_account(), 10)
+    stats = ton.get_transaction_cache().get_stats()
+    assert stats["transactions"] == 10
+
+
+def test_cache_limits(tmp_path):
+    history = History(100)
+    cache = TransactionCache(str(tmp_path / "transactions.db"), max_transactions=30)
+
+    def fetch(lt, trans_hash):
+        while lt is not None:
+            transactions, lt, trans_hash = history.get_last_transactions("0:5E3C", lt, trans_hash)
+            yield from transactions
+    assert len(list(cache.iter_transactions("0:5E3C", 100, "h100", fetch))) == 100
+    assert cache.get_stats()["transactions"] == 30
+
+    # the least recently used address is evicted
+    list(cache.iter_transactions("0:AAAA", 100, "h100", fetch))
+    cache.max_size = cache.get_stats()["size"] - 1
+    list(cache.iter_transactions("0:AAAA", 100, "h100", fetch))
+    assert cache.get_stats()["addresses"] == 1
+    assert cache.get_segment("0:5E3C") == (None, None)
+    assert cache.get_segment("0:AAAA") == (100, 71)
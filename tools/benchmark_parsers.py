@@ -0,0 +1,341 @@
+"""
+Micro-benchmark of lite-client output parsers.
+Compares the current parsers with the previous implementations on
+synthetic responses of the given size and checks that results are equal.
+Config params are taken from test fixtures and from the directory given
+by -c, which may hold `getconfig <N>` outputs saved as <N>.txt, e.g.:
+for i in $(seq 0 81); do lite-client ... -c "getconfig $i" > configs/$i.txt; done
+
+Usage: python3 tools/benchmark_parsers.py [-n <repeat>] [-s <size>] [-c <configs_dir>]
+"""
+
+import argparse
+import glob
+import json
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mytoncore.parsers import parse_tvm_stack, parse_tlb, parse_dump, parse_account_state  # noqa: E402
+from mytoncore.models import ValidatorsLoad  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "integration", "fixtures")
+
+
+def legacy_result2list(buff):
+    buff = buff.replace(')', ']')
+    buff = buff.replace('(', '[')
+    buff = buff.replace(']', ' ] ')
+    buff = buff.replace('[', ' [ ')
+    buff = buff.replace('bits:', '')
+    buff = buff.replace('refs:', '')
+    buff = buff.replace('.', '')
+    buff = buff.replace(';', '')
+    arr = buff.split()
+
+    output = ""
+    arr_len = len(arr)
+    for i in range(arr_len):
+        item = arr[i]
+        if '{' in item or '}' in item:
+            item = f"\"{item}\""
+        next_item = arr[i+1] if i+1 < arr_len else None
+        if item == '[':
+            output += item
+        elif next_item == ']':
+            output += item
+        elif i+1 == arr_len:
+            output += item
+        else:
+            output += item + ', '
+    return json.loads(output)
+
+
+def legacy_tlb2json(text):
+    start = 0
+    end = len(text)
+    if '=' in text:
+        start = text.find('=')+1
+    if text[start:].startswith(' x{'):
+        end = text.rfind('}')+1
+        return {'_': text[start:end].strip()}
+    if "x{" in text:
+        end = text.find("x{")
+    text = text[start:end]
+    text = text.strip()
+    text = text.replace('(', '{')
+    text = text.replace(')', '}')
+
+    buff = text
+    for char in ['\r', '\n', '\t', '{', '}', ':']:
+        buff = buff.replace(char, ' ')
+    buff2 = ""
+    item_list = list()
+    for item in list(buff):
+        if item == ' ':
+            if len(buff2) > 0:
+                item_list.append(buff2)
+                buff2 = ""
+            item_list.append(item)
+        else:
+            buff2 += item
+
+    i = 0
+    for item in item_list:
+        length = len(item)
+        if item == ' ':
+            pass
+        elif item.isdigit() is False:
+            text = text[:i] + '"' + item + '"' + text[i+length:]
+            i += 2
+        i += length
+
+    text = text.replace('{"', '{"_":"')
+    while True:
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError as err:
+            if "Expecting ',' delimiter" in err.msg:
+                text = text[:err.pos] + ',' + text[err.pos:]
+            elif "Expecting property name enclosed in double quotes" in err.msg:
+                text = text[:err.pos] + '"_":' + text[err.pos:]
+            else:
+                raise err
+
+
+def legacy_result2dict(result):
+    raw_any = False
+    data = dict()
+    paren_elements_list = list()
+    for line in result.split('\n'):
+        first_spaces_count = 0
+        for item in line:
+            if item != ' ':
+                break
+            first_spaces_count += 1
+        deep = first_spaces_count // 2
+        line = line.lstrip()
+        if "raw@Any" in line:
+            raw_any = True
+        if raw_any and ')' in line:
+            raw_any = False
+        if line[:2] == "x{" and not raw_any:
+            continue
+        if deep == 0:
+            data[line] = dict()
+            paren_elements_list = [line]
+        else:
+            buff = data
+            paren_elements_list = paren_elements_list[:deep]
+            for item in paren_elements_list:
+                buff = buff[item]
+            buff[line] = dict()
+            paren_elements_list.append(line)
+    return data
+
+
+def legacy_get_var_from_worker_output(text, search):
+    if ':' not in search:
+        search += ':'
+    if search is None or text is None:
+        return None
+    if search not in text:
+        return None
+    start = text.find(search) + len(search)
+    count = 0
+    bcount = 0
+    text_len = len(text)
+    end = text_len
+    for i in range(start, text_len):
+        letter = text[i]
+        if letter == '(':
+            count += 1
+            bcount += 1
+        elif letter == ')':
+            count -= 1
+        if letter == ')' and count < 1:
+            end = i + 1
+            break
+        elif letter == '\n' and count < 1:
+            end = i
+            break
+    result = text[start:end]
+    if count != 0 and bcount == 0:
+        result = result.replace(')', '')
+    return result
+
+
+def legacy_parse(text, search, search2):
+    if search not in text:
+        return None
+    text = text[text.find(search) + len(search):]
+    if search2 in text:
+        text = text[:text.find(search2)]
+    return text
+
+
+def legacy_account_state(result):
+    get = legacy_get_var_from_worker_output
+    storage = get(result, "storage")
+    if storage is None:
+        return None
+    balance = get(storage, "balance")
+    grams = get(balance, "grams")
+    state = get(storage, "state")
+    data = dict()
+    data["storage"] = storage
+    data["addr"] = get(result, "addr")
+    data["value"] = get(grams, "value")
+    data["state"] = state
+    data["code"] = get(get(state, "code"), "value")
+    data["data"] = get(get(state, "data"), "value")
+    data["lt"] = legacy_parse(result, "lt = ", ' ')
+    data["hash"] = legacy_parse(result, "hash = ", '\n')
+    return data
+
+
+def legacy_validators_load(result):
+    lines = result.split('\n')
+    data = dict()
+    for line in lines:
+        if "val" in line and "pubkey" in line:
+            buff = line.split(' ')
+            vid = int(buff[1].replace('#', '').replace(':', ''))
+            created = buff[6].replace('(', '').replace(')', '').split(',')
+            expected = buff[8].replace('(', '').replace(')', '').split(',')
+            master_created, work_created = float(created[0]), float(created[1])
+            master_expected, work_expected = float(expected[0]), float(expected[1])
+            mr = master_created / master_expected if master_expected != 0 else 0
+            wr = work_created / work_expected if work_expected != 0 else 0
+            r = mr if master_expected > 0 else (mr + wr) / 2
+            efficiency = round(r * 100, 2)
+            item = dict()
+            item["id"] = vid
+            item["pubkey"] = buff[3].replace(',', '')
+            item["masterBlocksCreated"] = master_created
+            item["workBlocksCreated"] = work_created
+            item["masterBlocksExpected"] = master_expected
+            item["workBlocksExpected"] = work_expected
+            item["mr"] = mr
+            item["wr"] = wr
+            item["efficiency"] = efficiency
+            item["online"] = efficiency > 10
+            next_index = lines.index(line) + 2
+            if next_index < len(lines) and "COMPLAINT_SAVED" in lines[next_index]:
+                buff = lines[next_index].split('\t')
+                item["var1"] = buff[1]
+                item["var2"] = buff[2]
+                item["fileName"] = buff[3]
+            data[vid] = item
+    return data
+
+
+def make_checkloadall(size):
+    lines = list()
+    for i in range(size):
+        lines.append("val #{i}: pubkey {pubkey:064X}, blocks created ({master},{work}) expected (82.3077,1190.25)".format(
+            i=i, pubkey=random.getrandbits(256), master=random.randint(0, 90), work=random.randint(0, 1300)))
+        lines.append("  chance of such a low rate is 0.5")
+    return "\n".join(lines) + "\n"
+
+
+def make_participant_list(size):
+    entries = list()
+    for _ in range(size):
+        entries.append("[ {pubkey} [ {stake} 196608 {wallet} {adnl} ] ]".format(
+            pubkey=random.getrandbits(256), stake=random.randint(10**14, 10**15),
+            wallet=random.getrandbits(256), adnl=random.getrandbits(256)))
+    return " [ 1706011792 1706003600 300000000000000 5173520395283914 [ " + " ".join(entries) + " ] 0 0 ] "
+
+
+def make_complaints(size):
+    entries = list()
+    for _ in range(size):
+        entries.append("[ {hash} [ [ {pubkey} C{{{cell}}} 1706000000 0 {addr} 1000000000 1500000000 ] [ 1 3 ] 1 0 ] ]".format(
+            hash=random.getrandbits(256), pubkey=random.getrandbits(256),
+            cell="%0256X" % random.getrandbits(1024), addr=random.getrandbits(256)))
+    return " [ [ " + " ".join(entries) + " ] ] "
+
+
+def make_hashmap(items, bits, indent):
+    nl = "\n" + "  " * indent
+    if len(items) == 1:
+        return "(hm_edge label:(hml_long n:{bits} s:x{label}) node:(hmn_leaf{nl}value:{value}))".format(
+            bits=bits, label="0" * max(bits // 4, 1), nl=nl, value=items[0])
+    half = len(items) // 2
+    return "(hm_edge label:(hml_same v:0 n:0) node:(hmn_fork{nl}left:{left}{nl}right:{right}))".format(
+        nl=nl, left=make_hashmap(items[:half], bits-1, indent+1), right=make_hashmap(items[half:], bits-1, indent+1))
+
+
+def make_validator_set(size):
+    validators = list()
+    for _ in range(size):
+        validators.append("(validator_addr public_key:(ed25519_pubkey pubkey:x{pubkey:064X}) weight:{weight} adnl_addr:x{adnl:064X})".format(
+            pubkey=random.getrandbits(256), weight=random.randint(10**15, 10**17), adnl=random.getrandbits(256)))
+    text = "ConfigParam(34) = (\n  cur_validators:(validators_ext utime_since:1706011792 utime_until:1706077328 total:{total} main:{main} total_weight:1152921504606846976\n    list:{list}))\nx{{1200000000}}\n"
+    return text.format(total=size, main=min(size, 100), list=make_hashmap(validators, 16, 3))
+
+
+def make_trans_dump(size):
+    with open(os.path.join(FIXTURES_DIR, "liteclient", "lasttransdump.txt")) as f:
+        text = f.read()
+    text = text[:text.find("previous transaction")]
+    return "".join(text.replace("transaction #", f"transaction #{i}_") for i in range(size // 2))
+
+
+def make_account_state(size):
+    with open(os.path.join(FIXTURES_DIR, "liteclient", "getaccount_active.txt")) as f:
+        text = f.read()
+    # contract with a large data cell tree
+    cells = "".join("\n             x{{{cell:0256X}}}".format(cell=random.getrandbits(1024)) for _ in range(size))
+    return text.replace("\n            ))\n        library", cells + "\n            ))\n        library")
+
+
+def get_config_dumps(configs_dir):
+    paths = glob.glob(os.path.join(FIXTURES_DIR, "getconfig", "*.txt"))
+    if configs_dir:
+        paths += glob.glob(os.path.join(configs_dir, "*.txt"))
+    for path in sorted(paths):
+        with open(path) as f:
+            text = f.read()
+        start = text.find("ConfigParam")
+        if start < 0:
+            continue
+        yield os.path.basename(path), text[start:]
+
+
+def run_benchmark(name, old, new, data, repeat):
+    if old(data) != new(data):
+        raise Exception(f"{name}: results are not equal")
+    old_time = min(timeit.repeat(lambda: old(data), number=1, repeat=repeat))
+    new_time = min(timeit.repeat(lambda: new(data), number=1, repeat=repeat))
+    print(f"{name:<40} {len(data):>10} {old_time*1000:>10.2f} {new_time*1000:>10.2f} {old_time/new_time:>8.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', type=int, default=5, help='repeat count')
+    parser.add_argument('-s', type=int, default=400, help='number of entries in responses')
+    parser.add_argument('-c', help='directory with saved getconfig outputs')
+    args = parser.parse_args()
+    random.seed(0)
+
+    print(f"{'benchmark':<40} {'bytes':>10} {'old, ms':>10} {'new, ms':>10} {'gain':>9}")
+    run_benchmark("Result2List participant_list_extended", legacy_result2list, parse_tvm_stack, make_participant_list(args.s), args.n)
+    run_benchmark("Result2List list_complaints", legacy_result2list, parse_tvm_stack, make_complaints(args.s), args.n)
+    for name in ["active", "frozen", "uninit"]:
+        with open(os.path.join(FIXTURES_DIR, "liteclient", f"getaccount_{name}.txt")) as f:
+            run_benchmark(f"GetAccount {name}", legacy_account_state, parse_account_state, f.read(), args.n * 100)
+    run_benchmark(f"GetAccount large data ({args.s})", legacy_account_state, parse_account_state, make_account_state(args.s), args.n)
+    run_benchmark(f"GetValidatorsLoad ({args.s})", legacy_validators_load, ValidatorsLoad, make_checkloadall(args.s), args.n)
+    run_benchmark(f"Result2Dict lasttransdump ({args.s})", legacy_result2dict, parse_dump, make_trans_dump(args.s), args.n)
+    for name, text in get_config_dumps(args.c):
+        run_benchmark(f"Tlb2Json {name}", legacy_tlb2json, parse_tlb, text, args.n)
+    run_benchmark(f"Tlb2Json validator set ({args.s})", legacy_tlb2json, parse_tlb, make_validator_set(args.s), args.n)
+
+
+if __name__ == '__main__':
+    main()